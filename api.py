@@ -0,0 +1,277 @@
+"""헤드리스 JSON API.
+
+Gradio UI 옆에 붙는 가벼운 HTTP JSON API입니다. 스크립트, 부하 테스트, 다른 프런트엔드가
+UI 이벤트(큰 출력 묶음, 탭 간 갱신) 없이 문제 출제/채점/오답노트/즐겨찾기 로직을 바로 씁니다.
+채점은 UI와 같은 채점 작업 저장소(GRADING_JOBS)와 채점 한도(GRADING_LANE)를 공유합니다.
+
+    GET  /api/v1/problems/pick?difficulty=&language=&problem_type=&source_file=
+    GET  /api/v1/problems/{source_file}/{pid}
+    POST /api/v1/grade                      {"source_file", "pid", "code", "mode"?} → SSE
+    GET  /api/v1/grade/{job_id}             작업 상태 (JSON)
+    GET  /api/v1/grade/{job_id}/events      실행 중인 작업에 다시 붙기 (SSE)
+    GET  /api/v1/notes?q=&page=             오답노트 문제 목록 (검색, 페이지)
+    GET  /api/v1/notes/{source_file}/{pid}  해당 문제의 오답 기록
+    POST /api/v1/notes                      {"job_id", "nickname", "rechallenge_hint"?}
+    GET  /api/v1/favorites
+    POST /api/v1/favorites                  {"source_file", "pid"}
+
+SSE 이벤트: job(작업 ID) → update(상태, 판정, 해설 증가분) ... → done(최종 작업).
+해설은 스트리밍 중 누적 텍스트이므로 update에는 지난 이벤트 뒤에 늘어난 부분(delta)만 보내고,
+앞부분이 바뀐 경우(생각 태그 제거 등)에만 전체(detail)를 보냅니다.
+
+HEADLESS_API=0이면 붙이지 않고 예전처럼 Gradio만 띄웁니다.
+
+사용법 (저장소 루트에서):
+    python app.py
+    curl "http://127.0.0.1:7860/api/v1/problems/pick?difficulty=Lv2%20초급"
+    curl -N -X POST http://127.0.0.1:7860/api/v1/grade \\
+         -H "Content-Type: application/json" \\
+         -d '{"source_file": "problems.json", "pid": "...", "code": "SELECT 1"}'
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import gradio as gr
+from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+import app as core
+from grading_jobs import DONE, GRADING_JOBS, GradingJob
+from llm_client import CASCADE_MODES, LM_STUDIO_ENDPOINT, resolve_cascade_mode
+from problem_bank import (
+    DEFAULT_PROBLEM_FILE, Problem, find_problem, get_available_problem_files, get_problem_bank,
+)
+from review_scheduler import attempt_note_key
+from scheduling import GRADING_LANE
+from wrong_notes import load_attempts_for
+
+HEADLESS_API_ENABLED = os.getenv("HEADLESS_API", "1") != "0"
+API_PREFIX = "/api/v1"
+
+@dataclass
+class GradeRequest:
+    source_file: str
+    pid: str
+    code: str
+    mode: Optional[str] = None  # 없으면 문제 유형/난이도로 정함 (resolve_cascade_mode)
+
+
+@dataclass
+class NoteRequest:
+    job_id: str  # 끝난 채점 작업 (코드와 피드백을 여기서 가져옴)
+    nickname: str = ""
+    rechallenge_hint: str = ""  # 없으면 UI처럼 LLM으로 요약
+
+
+@dataclass
+class FavoriteRequest:
+    source_file: str
+    pid: str
+
+
+def problem_json(problem: Problem, source_file: str) -> Dict[str, object]:
+    """API 응답용 문제 데이터입니다. 참고 답안(reference)은 채점 프롬프트 전용이라 보내지 않습니다."""
+    data = asdict(problem)
+    data.pop("reference", None)
+    data.update(source_file=source_file, language=problem.language, library=problem.library)
+    return data
+
+
+def job_json(job: GradingJob) -> Dict[str, object]:
+    data = asdict(job)
+    data["feedback"] = core.compose_feedback(job.verdict, job.detail)
+    return data
+
+
+def _bank_or_404(source_file: str) -> List[Problem]:
+    """클라이언트가 보낸 문제 파일명을 data 폴더의 문제 파일 목록으로 확인한 뒤 문제 목록을 반환합니다.
+
+    목록에 없는 이름(경로 포함, 사용량 로그 등)은 404, 읽을 수 없는 문제 파일은 422입니다.
+    """
+    if source_file not in get_available_problem_files():
+        raise HTTPException(404, f"문제 파일을 찾을 수 없습니다: {source_file}")
+    try:
+        return get_problem_bank(source_file)
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(422, f"문제 파일을 읽을 수 없습니다 ({source_file}): {exc}")
+
+
+def _problem_or_404(source_file: str, pid: str) -> Problem:
+    _bank_or_404(source_file)
+    problem = find_problem(source_file, pid)
+    if problem is None:
+        raise HTTPException(404, f"문제를 찾을 수 없습니다: {source_file}:{pid}")
+    return problem
+
+
+def _job_or_404(job_id: str) -> GradingJob:
+    job = GRADING_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"채점 작업을 찾을 수 없습니다: {job_id} (만료되었을 수 있음)")
+    return job
+
+
+def _sse(event: str, data: Dict[str, object]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def job_events(job: GradingJob) -> AsyncIterator[str]:
+    """채점 작업을 따라가며 SSE 이벤트 문자열을 yield합니다."""
+    yield _sse("job", {"job_id": job.job_id})
+    sent = ""
+    async for job in GRADING_JOBS.follow(job.job_id):
+        if job.finished:
+            break
+        update: Dict[str, object] = {"status": job.status, "phase": job.phase, "verdict": job.verdict}
+        if job.detail.startswith(sent):
+            update["delta"] = job.detail[len(sent):]
+        else:
+            update["detail"] = job.detail
+        sent = job.detail
+        yield _sse("update", update)
+    yield _sse("done", job_json(job))
+
+
+def _event_stream(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+router = APIRouter(prefix=API_PREFIX)
+
+
+# ----- 문제 -----
+@router.get("/problems/pick")
+def pick(difficulty: Optional[str] = None,
+         language: Optional[str] = None,
+         problem_type: List[str] = Query(default=[]),
+         source_file: str = DEFAULT_PROBLEM_FILE) -> Dict[str, object]:
+    """필터에 맞는 문제 하나를 무작위로 출제합니다. (UI의 pick_problem과 같은 규칙)"""
+    bank = _bank_or_404(source_file)
+    problem, _, _, _ = core.pick_problem(difficulty, language, problem_type, bank=bank)
+    if problem is None:
+        raise HTTPException(404, "조건에 맞는 문제가 없습니다.")
+    return problem_json(problem, source_file)
+
+
+@router.get("/problems/{source_file}/{pid}")
+def get_problem(source_file: str, pid: str) -> Dict[str, object]:
+    return problem_json(_problem_or_404(source_file, pid), source_file)
+
+
+# ----- 채점 -----
+@router.post("/grade")
+async def grade(request: GradeRequest) -> StreamingResponse:
+    """채점 작업을 시작(같은 제출이 있으면 재사용)하고 진행 상황을 SSE로 보냅니다.
+
+    연결이 끊겨도 작업은 계속되며, job 이벤트의 작업 ID로 다시 붙을 수 있습니다.
+    """
+    problem = _problem_or_404(request.source_file, request.pid)
+    mode = request.mode or resolve_cascade_mode(problem.problem_type, problem.difficulty)
+    if mode not in CASCADE_MODES:
+        raise HTTPException(422, f"mode는 {', '.join(CASCADE_MODES)} 중 하나여야 합니다.")
+    job = GRADING_JOBS.find(request.source_file, problem.pid, request.code, mode)
+    if job is None:
+        job = GRADING_JOBS.start(request.source_file, problem.pid, request.code, mode, False,
+                                 core.run_grading_job)
+    return _event_stream(job_events(job))
+
+
+@router.get("/grade/{job_id}")
+def get_job(job_id: str) -> Dict[str, object]:
+    return job_json(_job_or_404(job_id))
+
+
+@router.get("/grade/{job_id}/events")
+async def follow_job(job_id: str) -> StreamingResponse:
+    return _event_stream(job_events(_job_or_404(job_id)))
+
+
+# ----- 오답노트 -----
+@router.get("/notes")
+def list_notes(q: str = "", page: int = 0) -> Dict[str, object]:
+    """오답노트에 기록이 있는 문제 목록입니다. 드롭다운과 같은 검색 인덱스를 씁니다."""
+    result = core.note_pid_index().search(q, page)
+    return {
+        "items": [{"key": value, "label": label} for label, value in result.choices],
+        "page": result.page,
+        "pages": result.pages,
+        "total": result.total,
+    }
+
+
+@router.get("/notes/{source_file}/{pid}")
+def list_attempts(source_file: str, pid: str) -> List[Dict[str, object]]:
+    """해당 문제의 오답 기록입니다. (오래된 순, blob으로 옮긴 텍스트도 풀어서 보냄)"""
+    return [
+        {
+            "key": attempt_note_key(attempt),
+            "nickname": attempt.nickname,
+            "timestamp": attempt.timestamp,
+            "score": attempt.score,
+            "status": attempt.status,
+            "rechallenge_hint": attempt.rechallenge_hint,
+            "submitted": attempt.text("submitted"),
+            "feedback": attempt.text("feedback"),
+        }
+        for attempt in core.failed_attempts(load_attempts_for(source_file, pid))
+    ]
+
+
+@router.post("/notes", status_code=201)
+async def append_note(request: NoteRequest) -> Dict[str, str]:
+    """끝난 채점 작업의 코드와 피드백을 오답노트에 추가합니다. (UI의 '오답노트에 추가'와 같은 규칙)"""
+    job = _job_or_404(request.job_id)
+    if job.status != DONE:
+        raise HTTPException(409, "채점이 끝난 작업만 오답노트에 추가할 수 있습니다.")
+    problem = _problem_or_404(job.source_file, job.pid)
+
+    existing = await asyncio.to_thread(load_attempts_for, job.source_file, job.pid)
+    if any(attempt.nickname == request.nickname for attempt in existing):
+        raise HTTPException(409, "같은 별명으로 이미 저장된 문제입니다.")
+
+    feedback = core.compose_feedback(job.verdict, job.detail)
+    hint = request.rechallenge_hint
+    if not hint:
+        async with GRADING_LANE.slot():
+            hint = await core.generate_hint_summary(problem, job.code, feedback, LM_STUDIO_ENDPOINT)
+
+    message = await asyncio.to_thread(
+        core.save_to_wrong_notes, problem, job.code, feedback, request.nickname, hint, job.source_file)
+    if message.startswith("❌"):
+        raise HTTPException(500, message)
+    return {"message": message, "rechallenge_hint": hint}
+
+
+# ----- 즐겨찾기 -----
+@router.get("/favorites")
+def list_favorites() -> List[Dict]:
+    return core.load_favorites()
+
+
+@router.post("/favorites", status_code=201)
+def add_favorite(request: FavoriteRequest) -> Dict:
+    """즐겨찾기에 추가합니다. 이미 있으면 그대로 둡니다."""
+    problem = _problem_or_404(request.source_file, request.pid)
+
+    def add(favorites: List[Dict]) -> Dict:
+        for fav in favorites:
+            if fav.get("pid") == problem.pid and fav.get("source_file", DEFAULT_PROBLEM_FILE) == request.source_file:
+                return fav
+        entry = core.favorite_entry(problem, request.source_file)
+        favorites.append(entry)
+        return entry
+
+    return core.update_favorites(add)
+
+
+def create_server(blocks, **gradio_kwargs) -> FastAPI:
+    """API 라우터를 붙인 FastAPI 앱에 Gradio UI를 "/"로 올려 반환합니다. (uvicorn으로 실행)"""
+    server = FastAPI(title="CodeDojo API")
+    server.include_router(router)
+    return gr.mount_gradio_app(server, blocks, path="/", **gradio_kwargs)
@@ -1,35 +1,84 @@
+import asyncio
 import inspect
 import json
-import os
 import random
-import re
-from dataclasses import dataclass, asdict
+import sys
+import threading
+import time
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from dotenv import load_dotenv
 import gradio as gr
-import requests
 import problem_bank
 from problem_bank import (
-    DIFFICULTY_OPTIONS,
-    PROBLEM_BANK,
     Problem,
-    unique_preserve_order,
     get_available_problem_files,
     reload_problem_bank,
+    find_problem,
     DEFAULT_PROBLEM_FILE,
 )
+from llm_client import (
+    FAST_MODEL,
+    FAST_MODEL_ENDPOINT,
+    LM_STUDIO_ENDPOINT,
+    LM_STUDIO_MODEL,
+    acall_llm,
+    astream_llm,
+    format_usage_report,
+    resolve_cascade_mode,
+)
+from scheduling import GRADING_LANE, UI_LANE, format_lane_metrics
+from session_store import FEEDBACK_STORE, discard_session_state, format_session_memory_report
+from search_index import forget_search_index, get_search_index
+from bank_watcher import BANK_WATCHER, BankChanges, start_bank_watcher
+from bank_editor import compact_changed_banks
+from choice_cache import ChoiceCache
+from picker_index import PickerIndex
+from embeddings import BUILD_STATUS, forget_embedding_index, get_embedding_index
+from facets import (
+    difficulty_choices,
+    facet_matches,
+    forget_facet_cube,
+    get_facet_cube,
+    language_choices,
+    problem_type_choices,
+)
+from warmup import MODEL_WARMER, start_model_warmer
+from wrong_notes import (
+    Attempt,
+    append_attempt,
+    ensure_note_file,
+    PASS_SCORE,
+    load_attempts_for,
+    manifest_path,
+    NOTE_PATH,
+    scan_attempt_fields,
+)
+from review_scheduler import REVIEW_QUEUE, format_due
+from learner_stats import LEARNER_STATS, format_dashboard
+from grading_jobs import (
+    DONE, ERROR, GRADING_JOB_SECRET, GRADING_JOBS, INTERRUPTED, QUEUED, RUNNING, GradingJob,
+)
+from prompts import (
+    build_feedback_prompts,
+    build_hint_summary_prompts,
+    build_verdict_prompts,
+    format_verdict,
+)
 
-NOTE_PATH = Path("data/wrong_notes.md")
-NOTE_PATH.parent.mkdir(parents=True, exist_ok=True)
-FAVORITES_PATH = Path("data/favorites.json")
+FAVORITES_PATH = Path("data/favorites/favorites.json")
 FAVORITES_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-# .env 파일에서 환경변수 로드
-load_dotenv()
-LM_STUDIO_ENDPOINT = os.getenv("LM_STUDIO_ENDPOINT", "http://127.0.0.1:1234/v1/chat/completions")
+_LEGACY_FAVORITES_PATH = Path("data/favorites.json")  # data 바로 아래는 문제 파일 자리라 옮김
+if _LEGACY_FAVORITES_PATH.exists() and not FAVORITES_PATH.exists():
+    _LEGACY_FAVORITES_PATH.replace(FAVORITES_PATH)
+SEARCH_RESULT_LIMIT = 30  # 검색 결과 드롭다운에 표시할 최대 개수
+SIMILAR_RESULT_LIMIT = 10  # 비슷한 문제 추천 개수
+PROBLEM_TYPE_OPTIONS = ["코딩", "개념문제", "빈칸채우기"]  # 문제 유형 체크박스 옵션
+# 드롭다운 선택지 캐시 (저장 시 generation 증가, 파일이 밖에서 바뀌어도 증가)
+NOTE_CHOICES = ChoiceCache(lambda: (NOTE_PATH, manifest_path()))
+FAVORITE_CHOICES = ChoiceCache(lambda: (FAVORITES_PATH,))
 
 def build_theme() -> gr.themes.Base:
     # 색상/토큰 중복만 제거 (값/디테일 유지)
@@ -414,276 +463,70 @@ function() {
 }
 """
 
+# ===== 클라이언트 전용 UI 상태 JavaScript =====
+# 화면 상태만 바꾸는 이벤트는 서버 왕복 없이 브라우저에서 처리합니다.
+# 필요한 데이터는 문제를 불러올 때 탭별 view(JSON, client_view_data)로 함께 내려보냅니다.
+HINT_TOGGLE_JS = """
+function(result, label, view) {
+    // 힌트 블록을 피드백 아래에 붙이거나 떼어냅니다.
+    if (!view || !view.key) {
+        return ["문제가 선택되지 않았습니다.", "💡 힌트 보기"];
+    }
+    const hint = view.hint;
+    const current = result || "";
+    if (label === "💡 힌트 숨기기") {
+        let rest = current.endsWith(hint) ? current.slice(0, current.length - hint.length) : current;
+        rest = rest.replace(/\\n\\n$/, "");
+        return [rest, "💡 힌트 보기"];
+    }
+    return [current ? current + "\\n\\n" + hint : hint, "💡 힌트 숨기기"];
+}
+"""
 
-@dataclass
-class Attempt:
-    """오답노트에 저장되는 단일 채점 시도 레코드입니다.
-
-    Attributes:
-        pid: 문제 ID (problem_bank에서의 고유 식별자)
-        title: 문제 제목
-        difficulty: 난이도 (Lv1 입문 등)
-        score: 채점 점수 (0-100)
-        status: 상태 (통과/재도전)
-        submitted: 제출된 코드
-        feedback: LLM 피드백
-        improvement: 보완 포인트
-        reasoning: 해설/의도 추측
-        question: 문제 내용
-        code: 제출 코드
-        kind: 프로그래밍 언어 (sql/python, Gradio Code 컴포넌트 지원 언어)
-        timestamp: 제출 시간 (형식: "YYYY-MM-DD HH:MM (요일)")
-        rechallenge_hint: 재도전 시 참고할 힌트
-        nickname: 문제 별명 (사용자 지정)
-        source_file: 문제 출처 파일 (예: "problems.json")
-    """
-    pid: str
-    title: str
-    difficulty: str
-    score: int
-    status: str
-    submitted: str
-    feedback: str
-    improvement: str
-    reasoning: str
-    question: str
-    code: str
-    kind: str
-    timestamp: str
-    rechallenge_hint: str = ""
-    nickname: str = ""
-    source_file: str = "problems.json"  # 하위 호환성을 위한 기본값
+FAVORITE_SYNC_JS = """
+function(label, view, otherView1, otherView2, otherLabel1, otherLabel2) {
+    // 같은 문제를 보고 있는 다른 탭의 즐겨찾기 버튼만 새 레이블로 맞추고 메시지는 지웁니다.
+    const key = view && view.key;
+    const sync = (other, otherLabel) => (key && other && other.key === key) ? label : otherLabel;
+    return [sync(otherView1, otherLabel1), "", sync(otherView2, otherLabel2), ""];
+}
+"""
 
 
 def ensure_state(state: Optional[Dict]) -> Dict:
+    """탭 state의 기본값을 채웁니다.
+
+    state에는 문제 핸들(source_file, pid)과 작은 값만 두고, 피드백/제출 코드는
+    ref를 키로 FEEDBACK_STORE에 보관합니다.
+    """
     if state is None:
         state = {}
 
     state.setdefault("in_progress", False)
-    state.setdefault("last_feedback", "")
     state.setdefault("filters", normalize_filters(None, None, None))
-    state.setdefault("hint_visible", False)
+    state.setdefault("ref", FEEDBACK_STORE.new_ref())
     return state
 
 
+def state_problem(state: Optional[Dict]) -> Optional[Problem]:
+    """탭 state의 (source_file, pid) 핸들을 공유 문제 캐시에서 Problem으로 바꿉니다."""
+    if not state or "pid" not in state:
+        return None
+    return find_problem(state.get("source_file", DEFAULT_PROBLEM_FILE), state["pid"])
 
-def ensure_note_file() -> None:
-    """오답노트 파일을 초기화합니다.
-
-    JSON Lines 형식: 각 라인이 독립적인 JSON 객체
-    """
-    if not NOTE_PATH.exists():
-        NOTE_PATH.write_text("")  # 빈 파일로 시작 (헤더 없음)
-
-
-def serialize_attempt(attempt: Attempt) -> str:
-    """Attempt를 JSON Lines 형식으로 직렬화합니다.
-
-    각 Attempt는 한 줄의 JSON으로 저장되어 강건한 파싱이 가능합니다.
-    - 멀티라인 텍스트는 JSON이 자동으로 이스케이프
-    - 마크다운 syntax 충돌 없음
-    - 손상된 한 줄만 무시, 나머지는 안전
-    """
-    meta = json.dumps(
-        asdict(attempt),
-        ensure_ascii=False,  # 한글 유지
-        separators=(',', ':')  # 공백 제거해서 한 줄 유지
-    )
-
-    # JSON이 유효한지 검증
-    try:
-        json.loads(meta)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"JSON 직렬화 오류: {e}\n{meta[:200]}...")
-
-    return meta  # 순수 JSON 한 줄만 반환
-
-
-def safe_read_file(path: Path) -> str:
-    """다중 인코딩 시도로 안전하게 파일 읽기
-
-    Args:
-        path: 읽을 파일 경로
-
-    Returns:
-        str: 파일 내용 (UTF-8 BOM 제거됨)
-    """
-    encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
-
-    for encoding in encodings:
-        try:
-            text = path.read_text(encoding=encoding, errors='ignore')
-            # UTF-8 BOM 제거 (utf-8-sig가 실패한 경우 대비)
-            if text.startswith('\ufeff'):
-                text = text[1:]
-            return text
-        except Exception:
-            continue
-
-    # 최후의 수단: 바이너리 읽기 후 디코드
-    return path.read_bytes().decode('utf-8', errors='replace')
-
-
-def sanitize_line(line: str) -> str:
-    """JSON 파싱 전 라인 정제
-
-    Args:
-        line: 정제할 라인
-
-    Returns:
-        str: 정제된 라인
-    """
-    import unicodedata
-
-    # 제어 문자 제거 (탭/개행 제외)
-    line = ''.join(c for c in line if c >= ' ' or c in '\t\n')
-
-    # NULL 바이트 제거
-    line = line.replace('\x00', '')
-
-    # 유니코드 정규화 (NFKC)
-    line = unicodedata.normalize('NFKC', line)
-
-    # 양쪽 공백 제거
-    return line.strip()
-
-
-def is_likely_json(line: str) -> bool:
-    """라인이 JSON 객체일 가능성이 있는지 빠르게 체크
-
-    Args:
-        line: 체크할 라인
-
-    Returns:
-        bool: JSON 객체일 가능성이 있으면 True
-    """
-    line = line.strip()
-    # JSON 객체는 { 로 시작하고 } 로 끝남
-    return line.startswith('{') and line.endswith('}')
-
-
-def robust_json_parse(line: str) -> Optional[Dict]:
-    """여러 방법으로 JSON 파싱 시도
-
-    Args:
-        line: 파싱할 JSON 라인
-
-    Returns:
-        Optional[Dict]: 파싱된 딕셔너리 또는 None
-    """
-    # 1차: 기본 파싱
-    try:
-        return json.loads(line)
-    except json.JSONDecodeError:
-        pass
-
-    # 2차: 손상된 이스케이프 시퀀스 복구
-    try:
-        # 백슬래시가 과도하게 이스케이프된 경우
-        fixed = line.replace('\\\\', '\\')
-        return json.loads(fixed)
-    except json.JSONDecodeError:
-        pass
-
-    # 3차: 중괄호 매칭으로 JSON 추출
-    try:
-        start = line.find('{')
-        end = line.rfind('}') + 1
-        if start >= 0 and end > start:
-            return json.loads(line[start:end])
-    except (json.JSONDecodeError, ValueError):
-        pass
-
-    return None
-
-
-def log_parse_error(line_idx: int, line: str, error: Exception) -> None:
-    """파싱 실패 시 상세 정보 출력
-
-    Args:
-        line_idx: 라인 번호
-        line: 실패한 라인 내용
-        error: 발생한 예외
-    """
-    import sys
 
-    # 라인 미리보기 (첫 100자)
-    preview = line[:100] + ('...' if len(line) > 100 else '')
+def session_feedback(state: Dict) -> Dict[str, str]:
+    """탭 state에 딸린 last_feedback/last_verdict/last_code를 반환합니다."""
+    return FEEDBACK_STORE.get(state.get("ref"))
 
-    # 에러 메시지
-    error_msg = str(error)[:80]
 
-    print(
-        f"[경고] 라인 {line_idx} 파싱 실패\n"
-        f"  오류: {error_msg}\n"
-        f"  내용: {repr(preview)}",
-        file=sys.stderr
-    )
+def save_session_feedback(state: Dict, **values: str) -> None:
+    FEEDBACK_STORE.update(state["ref"], values, state=state)
 
 
-def load_attempts() -> List[Attempt]:
-    """오답노트 파일에서 모든 Attempt를 로드합니다.
-
-    JSON Lines 형식: 각 라인이 하나의 JSON 객체
-    - 손상된 라인은 무시하고 나머지 계속 파싱
-    - 라인 단위 오류 로깅으로 문제 진단 용이
-    - 다중 인코딩 지원, 제어 문자 제거, 다단계 파싱 시도
-    """
-    ensure_note_file()
-
-    # 강건한 파일 읽기 (다중 인코딩, BOM 처리)
-    text = safe_read_file(NOTE_PATH)
-    entries: List[Attempt] = []
-
-    # 빈 파일 처리
-    if not text.strip():
-        return entries
-
-    # 각 라인을 독립적으로 파싱
-    for line_idx, line in enumerate(text.split("\n"), 1):
-        # 라인 정제 (제어 문자, NULL 바이트 제거)
-        line = sanitize_line(line)
-
-        # 빈 라인 무시
-        if not line:
-            continue
-
-        # JSON이 아닌 라인 건너뛰기 (마크다운 헤더, 주석 등)
-        if not is_likely_json(line):
-            continue
-
-        try:
-            # 강건한 JSON 파싱 (다단계 재시도)
-            data = robust_json_parse(line)
-
-            if data is None:
-                # 모든 파싱 방법 실패
-                log_parse_error(line_idx, line, ValueError("JSON 파싱 불가"))
-                continue
-
-            # 하위 호환성: source_file 필드가 없으면 기본값 추가
-            if "source_file" not in data:
-                data["source_file"] = DEFAULT_PROBLEM_FILE
-
-            # Attempt 객체 생성
-            entry = Attempt(**data)
-            entries.append(entry)
-
-        except TypeError as e:
-            # Attempt 필드 부족: 해당 라인 무시, 계속 진행
-            log_parse_error(line_idx, line, e)
-            continue
-
-        except Exception as e:
-            # 예상 외의 오류
-            log_parse_error(line_idx, line, e)
-            continue
-
-    return entries
-
 
 def failed_attempts(entries: List[Attempt]) -> List[Attempt]:
-    return [a for a in entries if a.score < 80]
+    return [a for a in entries if a.score < PASS_SCORE]
 
 
 def matches_filters(
@@ -701,23 +544,30 @@ def matches_filters(
     - "Python.Pandas": Python.Pandas만 포함
     - "Python.NumPy": Python.NumPy만 포함
     - "SQL": SQL만 포함
+
+    필터 드롭다운의 개수 큐브(facets)와 같은 판정을 쓰도록 facet_matches에 위임합니다.
     """
-    # 언어 필터 매칭
-    if not language or language == "전체":
-        language_match = True
-    elif '.' not in language:
-        # "Python"이나 "SQL"처럼 base language만 선택한 경우
-        # problem.language는 kind의 '.' 앞부분만 반환
-        language_match = problem.language.lower() == language.lower()
-    else:
-        # "Python.Pyspark"처럼 구체적인 라이브러리까지 선택한 경우
-        language_match = problem.kind.lower() == language.lower()
+    return facet_matches(problem.difficulty, problem.kind, problem.problem_type,
+                         difficulty, language, problem_types)
+
 
-    difficulty_match = (not difficulty or difficulty ==
-                        "전체") or problem.difficulty == difficulty
-    # problem_types가 리스트로 전달됨 (체크박스 선택값)
-    type_match = (not problem_types or len(problem_types) == 0) or problem.problem_type in problem_types
-    return difficulty_match and language_match and type_match
+def filter_choice_updates(problem_file: str,
+                          difficulty: str,
+                          language: str,
+                          problem_types: List[str]) -> Tuple[gr.update, gr.update, gr.update, gr.update]:
+    """필터 드롭다운에 조건별 문제 수를 표시하고, 빈 조합이면 출제 버튼을 비활성화합니다.
+
+    Returns:
+        Tuple: (difficulty, language, problem_types, new_btn) 업데이트
+    """
+    cube = get_facet_cube(problem_file)
+    total = cube.count(difficulty, language, problem_types)
+    return (
+        gr.update(choices=difficulty_choices(cube, cube.difficulties, difficulty, language, problem_types)),
+        gr.update(choices=language_choices(cube, ["전체"] + cube.kinds, difficulty, language, problem_types)),
+        gr.update(choices=problem_type_choices(cube, PROBLEM_TYPE_OPTIONS, difficulty, language)),
+        gr.update(value="🔄 새 문제 출제" if total else "🚫 조건에 맞는 문제 없음", interactive=total > 0),
+    )
 
 
 def normalize_filters(
@@ -732,15 +582,19 @@ def normalize_filters(
 
 
 def pick_problem(
-    difficulty: str, language: str, problem_types: List[str]
+    difficulty: str, language: str, problem_types: List[str],
+    bank: Optional[List[Problem]] = None,
 ) -> Tuple[Problem | None, bool, str, Dict]:
-    """체크박스로 선택된 problem_types 중에서 문제를 선택합니다. 엄격한 필터링으로 매칭 실패 시 None을 반환합니다."""
+    """체크박스로 선택된 problem_types 중에서 문제를 선택합니다. 엄격한 필터링으로 매칭 실패 시 None을 반환합니다.
+
+    bank를 주지 않으면 현재 문제 은행(problem_bank.PROBLEM_BANK)에서 고릅니다.
+    """
     rechallenge = False
     hint = ""
     target_filters = normalize_filters(difficulty, language, problem_types)
 
     # 엄격한 필터링: 요청한 조건에 정확히 맞는 문제만 선택
-    full_pool = [(p, "") for p in problem_bank.PROBLEM_BANK]
+    full_pool = [(p, "") for p in (problem_bank.PROBLEM_BANK if bank is None else bank)]
     candidates = [
         (prob, attempt_hint)
         for prob, attempt_hint in full_pool
@@ -834,6 +688,36 @@ def save_favorites(favorites: List[Dict]) -> None:
             ensure_ascii=False,
             indent=2),
         encoding="utf-8")
+    FAVORITE_CHOICES.bump()
+
+
+_FAVORITES_LOCK = threading.Lock()
+
+
+def update_favorites(change: Callable[[List[Dict]], Any]) -> Any:
+    """즐겨찾기 목록을 읽어 change(favorites)로 제자리에서 고치고, 바뀌었으면 저장합니다.
+
+    UI와 API가 읽고-고치고-쓰기를 겹쳐 서로의 변경을 덮어쓰지 않도록 한 잠금 안에서 합니다.
+    change의 반환값을 그대로 돌려줍니다.
+    """
+    with _FAVORITES_LOCK:
+        favorites = load_favorites()
+        before = list(favorites)
+        result = change(favorites)
+        if favorites != before:
+            save_favorites(favorites)
+        return result
+
+
+def favorite_entry(problem: Problem, source_file: str) -> Dict[str, str]:
+    """즐겨찾기 파일에 저장할 항목입니다. (timestamp는 save_favorites가 채움)"""
+    return {
+        "pid": problem.pid,
+        "source_file": source_file,
+        "title": problem.title,
+        "difficulty": problem.difficulty,
+        "kind": problem.kind,
+    }
 
 
 def favorite_button_label(pid: str, source_file: str = DEFAULT_PROBLEM_FILE) -> str:
@@ -866,103 +750,120 @@ def _format_dropdown_choices(
     return labels, values
 
 
-def refresh_favorite_choices() -> Tuple[List[str], List[str]]:
-    """즐겨찾기 드롭다운 선택지를 반환합니다. 값은 'source_file:pid' 형식입니다."""
-    favorites = load_favorites()
-    return _format_dropdown_choices(
-        favorites,
+def favorite_index() -> PickerIndex:
+    """즐겨찾기 검색 인덱스를 반환합니다. 값은 'source_file:pid' 형식입니다. (저장 전까지 캐시)"""
+    return FAVORITE_CHOICES.get("favorites", lambda: PickerIndex.build(
+        load_favorites(),
         lambda fav: f"{fav.get('title', '')} | {fav.get('source_file', DEFAULT_PROBLEM_FILE)} | {fav.get('difficulty', '')} | {fav.get('kind', '')}",
-        lambda fav: f"{fav.get('source_file', DEFAULT_PROBLEM_FILE)}:{fav['pid']}"
-    )
+        lambda fav: f"{fav.get('source_file', DEFAULT_PROBLEM_FILE)}:{fav['pid']}",
+        lambda fav: f"{fav.get('title', '')} {fav.get('kind', '')} {fav.get('difficulty', '')}",
+    ))
 
 
-def call_llm(system_prompt: str, user_prompt: str,
-             endpoint: str = LM_STUDIO_ENDPOINT) -> str:
-    payload = {
-        "model": "lm-studio",
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "stream": False,
-        "temperature": 0.2,
-    }
-    try:
-        response = requests.post(endpoint, json=payload, timeout=180)
-        response.raise_for_status()
-        content = response.json()
-        result = content["choices"][0]["message"]["content"]
+def refresh_favorite_choices() -> Tuple[List[str], List[str]]:
+    """즐겨찾기 전체 선택지를 반환합니다. (드롭다운에는 picker_update로 한 쪽씩 보냄)"""
+    index = favorite_index()
+    return index.labels, index.values
 
-        # 일부 모델이 생성하는 <think>...</think> 태그 제거
-        # (Gradio Markdown 렌더링 방해 방지)
-        result = re.sub(r'<think>.*?</think>', '', result, flags=re.DOTALL)
-        result = result.strip()
 
-        return result
-    except (requests.RequestException, KeyError, ValueError, IndexError) as exc:
-        return (
-            "LLM 서버에 연결하지 못했습니다.\n"
-            f"로컬 엔드포인트({endpoint})를 확인하세요.\n"
-            f"네트워크를 확인하거나 나중에 다시 시도하세요. ({exc})"
-        )
+def new_picker_state(cache: ChoiceCache) -> Dict:
+    """세션별 드롭다운 검색 상태: 마지막으로 받은 generation, 검색어, 쪽 번호"""
+    return {"generation": cache.generation, "query": "", "page": 0}
+
+
+def picker_update(cache: ChoiceCache,
+                  index_fn: Callable[[], PickerIndex],
+                  picker: Optional[Dict],
+                  query: Optional[str] = None,
+                  page: Optional[int] = None,
+                  value: Optional[str] = None,
+                  reset_value: bool = True) -> Tuple[gr.update, Dict]:
+    """검색 결과 한 쪽만 드롭다운에 보냅니다. 선택은 value로 바뀝니다.
 
-def build_feedback(
+    세션이 마지막으로 받은 generation/검색어/쪽과 같으면 선택지를 다시 보내지 않습니다.
+    이때 reset_value가 False이면 선택도 그대로 두어 빈 업데이트만 보냅니다.
+
+    Returns:
+        Tuple[gr.update, Dict]: (드롭다운 업데이트, 세션에 기억할 picker 상태)
+    """
+    picker = picker or {}
+    query = picker.get("query", "") if query is None else query.strip()
+    page = picker.get("page", 0) if page is None else page
+    generation = cache.generation
+    if (generation == picker.get("generation")
+            and query == picker.get("query", "") and page == picker.get("page", 0)):
+        return (gr.update(value=value) if reset_value else gr.update()), picker
+    result = index_fn().search(query, page)
+    return gr.update(choices=result.choices, value=value, info=result.info()), {"generation": generation, "query": query, "page": result.page}
+
+
+async def build_feedback(
     problem: Problem, code: str, endpoint: str
 ) -> str:
     """LLM을 사용하여 코드에 대한 피드백을 생성합니다."""
-    
-    # 빈칸채우기 또는 개념문제인 경우 다른 프롬프트 사용
-    if problem.problem_type in ["빈칸채우기", "개념문제"]:
-        system_prompt = (
-            "당신은 주어진 문제에 대한 사용자의 답변을 채점하는 조교입니다."
-            "문제를 맞췄는지 간결하게 답변하세요. 그 다음 해설을 제공하세요."
-            "정답 여부, 핵심 개념, 관련 개념들과 관계, 실제 적용 사례, 작성자의 의도 추정 및 약점분석을 포함합니다.")
-        user_prompt = (
-            f"(출제자)문제: {problem.body}\n"
-            f"(사용자)답변: {code}\n\n"
-            "\n다음 사항을 포함하여 평가에 대한 해설을 Markdown으로 읽기 편하게 제공하세요:\n"
-            "- 1) 답변 평가 및 해설\n"
-            "- 2) 핵심 개념, 핵심개념의 상위개념, 헷갈리기 쉬운 유사개념, 반대개념 및 각각의 설명\n"
-            "- 3) 실제 적용 사례 또는 예시"
-            "- 4) 답변을 이렇게 쓴 이유/의도 추측 및 약점분석\n")
-
-    else:
-        # 일반 코딩 문제
-        system_prompt = (
-            "당신은 주어진 문제에 대한 사용자의 답변을 채점하는 조교입니다. "
-            "문제를 맞췄는지 간결하게 답변하세요. 그 다음 해설은 제공하세요."
-            "정답 여부, 놓친 부분, 작성자의 의도 추정 및 약점분석, 효율/논리 개선안을 포함합니다.")
-        user_prompt = (
-            f"(출제자)문제: {problem.body}\n"
-            f"(출제자)스키마: {problem.schema}\n"
-            f"(출제자)샘플데이터: {problem.sample_rows}\n"
-            f"(사용자)답변:```{code}\n```\n"
-            "\n다음 사항을 포함하여 평가에 대한 해설을 Markdown으로 읽기 편하게 제공하세요:\n"
-            "- 1) 코드 분석 및 평가\n"
-            "- 2) 보완이 필요한 부분\n"
-            "- 3) 답변을 이렇게 쓴 이유/의도 추측 및 약점분석\n"
-            "- 4) 더 효율적이거나 간결한 방법")
-                            
-    llm_reply = call_llm(system_prompt, user_prompt, endpoint)
+    system_prompt, user_prompt, profile = build_feedback_prompts(problem, code)
+    llm_reply = await acall_llm(system_prompt, user_prompt, endpoint, profile)
     return llm_reply
 
 
+async def stream_feedback(
+    problem: Problem, code: str, endpoint: str
+) -> AsyncIterator[str]:
+    """build_feedback의 스트리밍 버전입니다. 누적된 피드백을 차례로 yield합니다."""
+    system_prompt, user_prompt, profile = build_feedback_prompts(problem, code)
+    async for partial in astream_llm(system_prompt, user_prompt, endpoint, profile):
+        yield partial
+
+
+async def build_verdict(problem: Problem, code: str) -> str:
+    """빠른 모델로 정답/오답 판정과 한 줄 코멘트를 생성합니다. 빠른 모델이 없으면 큰 모델을 씁니다.
+
+    Returns:
+        str: 화면 표시용 판정 Markdown (예: "✅ **정답** — 조건을 정확히 처리했습니다.")
+    """
+    system_prompt, user_prompt, profile = build_verdict_prompts(problem, code)
+    endpoint, model = (FAST_MODEL_ENDPOINT, FAST_MODEL) if FAST_MODEL else (LM_STUDIO_ENDPOINT, LM_STUDIO_MODEL)
+    reply = await acall_llm(system_prompt, user_prompt, endpoint, profile, model=model)
+    return format_verdict(reply)
+
+
+def verdict_passed(verdict: str) -> Optional[bool]:
+    """빠른 판정 배지로 본 정답 여부입니다. 판정이 없거나 판정 불가면 None."""
+    if verdict.startswith("✅"):
+        return True
+    if verdict.startswith("❌"):
+        return False
+    return None
+
+
+def review_quality(verdict: str) -> Optional[int]:
+    """복습 제출의 SM-2 품질: 정답 4, 오답 1. 판정이 없거나 판정 불가면 None (일정을 바꾸지 않음)"""
+    passed = verdict_passed(verdict)
+    if passed is None:
+        return None
+    return 4 if passed else 1
+
+
+def compose_feedback(verdict: str, detail: str) -> str:
+    """빠른 판정과 상세 해설을 하나의 피드백 Markdown으로 합칩니다."""
+    parts = []
+    if verdict:
+        parts.append(f"### ⚡ 빠른 판정\n{verdict}")
+    if detail:
+        parts.append(detail)
+    return "\n\n---\n\n".join(parts)
+
+
 # append_attempt function removed - manual note saving implemented below
 
 
-def generate_hint_summary(problem: Problem, code: str, feedback: str, endpoint: str) -> str:
+async def generate_hint_summary(problem: Problem, code: str, feedback: str, endpoint: str) -> str:
     """LLM을 사용하여 틀린 이유를 50자 이내로 요약합니다."""
-    system_prompt = (
-        "당신은 학습 도우미입니다. 학생이 문제를 틀린 이유를 50자 이내로 간결하게 요약하세요."
-    )
-    user_prompt = (
-        f"문제: {problem.body}\n"
-        f"제출 코드: {code}\n"
-        f"피드백: {feedback}\n\n"
-        "위 내용을 바탕으로 이 문제를 틀린 핵심 이유를 50자 이내로 요약하세요."
-    )
-    summary = call_llm(system_prompt, user_prompt, endpoint)
-    # 50자로 자르기
+    system_prompt, user_prompt, profile = build_hint_summary_prompts(problem, code, feedback)
+    summary = await acall_llm(system_prompt, user_prompt, endpoint, profile)
+    # 생각 태그를 지운 응답의 첫 줄만 (목록 기호 제거) 50자로 자르기
+    lines = [line.strip().lstrip("-*• ").strip() for line in summary.splitlines()]
+    summary = next((line for line in lines if line), "")
     return summary[:50] if len(summary) > 50 else summary
 
 
@@ -1006,12 +907,11 @@ def save_to_wrong_notes(
     )
 
     try:
-        serialized = serialize_attempt(attempt)
-        # JSON Lines: append 모드로 새 라인 추가
-        # 파일이 비어있지 않으면 앞에 개행 추가 (안전하게 줄바꿈 보장)
-        prefix = '\n' if NOTE_PATH.exists() and NOTE_PATH.stat().st_size > 0 else ''
-        with open(NOTE_PATH, 'a', encoding='utf-8') as f:
-            f.write(f'{prefix}{serialized}\n')
+        # JSON Lines: 활성 파일에 새 라인 추가 (크기 한도를 넘으면 세그먼트로 봉인)
+        append_attempt(attempt)
+        NOTE_CHOICES.bump()
+        # 복습 일정: 해당 문제의 카드만 갱신 (힙에 새 항목 추가)
+        REVIEW_QUEUE.record_attempt(attempt)
         return f"✅ 오답노트에 추가되었습니다! ({format_timestamp_with_weekday()})"
     except ValueError as e:
         print(f"[오류] Attempt 저장 실패: {e}", file=__import__('sys').stderr)
@@ -1026,20 +926,31 @@ def refresh_note_pid_choices() -> Tuple[List[str], List[str]]:
             - labels: "title | source_file | difficulty | kind" 형식
             - values: "source_file:pid" 문자열
     """
-    entries = failed_attempts(load_attempts())
-    # source_file + pid 조합별로 첫 번째 항목만 유지 (중복 제거)
-    seen_keys = set()
-    unique_entries = []
-    for a in entries:
-        key = f"{a.source_file}:{a.pid}"
-        if key not in seen_keys:
-            seen_keys.add(key)
-            unique_entries.append(a)
+    index = note_pid_index()
+    return index.labels, index.values
 
-    return _format_dropdown_choices(
-        unique_entries,
-        lambda a: f"{a.title} | {a.source_file} | {a.difficulty} | {a.kind}",
-        lambda a: f"{a.source_file}:{a.pid}"
+
+def note_pid_index() -> PickerIndex:
+    """오답노트 문제 목록의 검색 인덱스를 반환합니다. (저장 전까지 캐시)"""
+    return NOTE_CHOICES.get("pids", _build_note_pid_index)
+
+
+def _build_note_pid_index() -> PickerIndex:
+    # 목록에 필요한 필드만 추출 (합격 점수 이상인 기록은 디코딩 전에 건너뜀)
+    entries = scan_attempt_fields(("pid", "source_file", "title", "difficulty", "kind", "nickname", "score"))
+    # source_file + pid 조합별로 첫 번째 항목만 유지 (중복 제거), 별명은 모두 모아 검색에 사용
+    unique_entries: Dict[str, Dict] = {}
+    nicknames: Dict[str, set] = {}
+    for a in entries:
+        key = f"{a['source_file']}:{a['pid']}"
+        unique_entries.setdefault(key, a)
+        nicknames.setdefault(key, set()).add(a["nickname"])
+
+    return PickerIndex.build(
+        list(unique_entries.items()),
+        lambda item: f"{item[1]['title']} | {item[1]['source_file']} | {item[1]['difficulty']} | {item[1]['kind']}",
+        lambda item: item[0],
+        lambda item: " ".join([item[1]["title"], item[1]["kind"], item[1]["difficulty"], *sorted(nicknames[item[0]])]),
     )
 
 
@@ -1064,16 +975,29 @@ def refresh_note_attempt_choices(selected_key: str) -> Tuple[List[str], List[str
     else:
         source_file, pid = DEFAULT_PROBLEM_FILE, selected_key
 
-    entries = failed_attempts(load_attempts())
-    pid_entries = [a for a in entries if a.pid == pid and a.source_file == source_file]
+    return NOTE_CHOICES.get(("attempts", source_file, pid),
+                            lambda: _build_note_attempt_choices(source_file, pid))
+
+
+def _build_note_attempt_choices(source_file: str, pid: str) -> Tuple[List[str], List[str]]:
+    entries = scan_attempt_fields(("pid", "source_file", "nickname", "timestamp", "score"))
+    pid_entries = [a for a in entries if a["pid"] == pid and a["source_file"] == source_file]
 
     return _format_dropdown_choices(
         pid_entries,
-        lambda a: f"{a.nickname if a.nickname else '(별명없음)'} | {a.timestamp}",
-        lambda a: f"{a.source_file}:{a.pid}:{a.nickname}:{a.timestamp}"
+        lambda a: f"{a['nickname'] if a['nickname'] else '(별명없음)'} | {a['timestamp']}",
+        lambda a: f"{a['source_file']}:{a['pid']}:{a['nickname']}:{a['timestamp']}"
     )
 
 
+def previous_feedback_markdown(entry: Attempt) -> str:
+    """오답노트 기록의 지난 피드백을 접힌 블록으로 표시합니다. (blob은 이때 처음 압축을 풂)"""
+    feedback = entry.text("feedback")
+    if not feedback:
+        return ""
+    return f"<details><summary>📝 지난 피드백 ({entry.timestamp})</summary>\n\n{feedback}\n\n</details>"
+
+
 def load_from_notes(
         selected_key: str) -> Tuple[str, Dict, gr.update, str, str]:
     """오답노트에서 문제를 로드합니다.
@@ -1083,12 +1007,11 @@ def load_from_notes(
 
     Returns:
         Tuple[str, Dict, gr.update, str, str]: (question, state, code_update, fav_button, status)
+            status에는 선택한 기록의 지난 피드백이 접힌 상태로 들어갑니다.
     """
     if not selected_key:
         return "문제를 선택하세요.", {}, gr.update(), "☆ 즐겨찾기 추가", ""
 
-    entries = failed_attempts(load_attempts())
-
     # 복합 키 파싱: source_file:pid:nickname:timestamp
     # maxsplit=3으로 timestamp에 ":"가 있어도 처리
     parts = selected_key.split(":", 3)
@@ -1102,55 +1025,50 @@ def load_from_notes(
     else:
         return "선택한 문제가 없습니다.", {}, gr.update(), "☆ 즐겨찾기 추가", ""
 
-    # 해당 source_file로 PROBLEM_BANK 재로드
-    reload_problem_bank(source_file)
-
-    # 모든 조건으로 정확히 매칭
+    # 세그먼트 색인으로 해당 문제의 기록만 읽은 뒤 모든 조건으로 정확히 매칭
+    entries = failed_attempts(load_attempts_for(source_file, pid))
     for entry in entries:
         if (entry.pid == pid and
             entry.nickname == nickname and
             entry.timestamp == timestamp and
             entry.source_file == source_file):
-            problem = next(
-                (p for p in problem_bank.PROBLEM_BANK if p.pid == entry.pid), None)
+            # 공유 문제 캐시에서 (source_file, pid)로 조회
+            problem = find_problem(source_file, entry.pid)
             if problem:
                 filters = normalize_filters(None, None, None)
                 question = render_question(
                     problem, True, entry.rechallenge_hint, filters)
                 return (
                     question,
-                    {
-                        "problem": problem,
+                    ensure_state({
+                        "pid": problem.pid,
+                        "source_file": source_file,
                         "rechallenge": True,
                         "hint": entry.rechallenge_hint,
                         "filters": filters,
                         "in_progress": False,
-                        "source_file": source_file,  # source_file 저장
-                    },
+                    }),
                     gr.update(value="", language=problem.safe_language),
                     favorite_button_label(problem.pid, source_file),
-                    "",
+                    previous_feedback_markdown(entry),
                 )
 
     return "선택한 문제가 없습니다.", {}, gr.update(), "☆ 즐겨찾기 추가", ""
 
 
 def load_favorite_problem(pid: str, source_file: str = DEFAULT_PROBLEM_FILE) -> Tuple[str, Dict, gr.update, str, str, gr.update]:
-    """즐겨찾기에서 문제를 로드합니다. source_file에서 PROBLEM_BANK를 재로드합니다."""
-    # 해당 소스 파일로 PROBLEM_BANK 재로드
-    reload_problem_bank(source_file)
-
-    problem = next((p for p in problem_bank.PROBLEM_BANK if p.pid == pid), None)
+    """즐겨찾기에서 문제를 로드합니다. 공유 문제 캐시에서 (source_file, pid)로 조회합니다."""
+    problem = find_problem(source_file, pid)
     if problem:
         filters = normalize_filters(None, None, None)
         question = render_question(problem, False, "", filters)
         state = ensure_state({
-            "problem": problem,
+            "pid": problem.pid,
+            "source_file": source_file,
             "rechallenge": False,
             "hint": "",
             "filters": filters,
             "in_progress": False,
-            "source_file": source_file,  # source_file 저장
         })
         return (
             question,
@@ -1166,16 +1084,22 @@ def load_favorite_problem(pid: str, source_file: str = DEFAULT_PROBLEM_FILE) ->
 def on_new_problem(problem_file: str,
                    difficulty: str,
                    language: str,
-                   problem_types: List[str]) -> Tuple[str,
-                                                      Dict,
-                                                      gr.update,
-                                                      str,
-                                                      str,
-                                                      gr.update,
-                                                      gr.update,
-                                                      str,
-                                                      str]:
-    """새 문제를 출제합니다. problem_types는 체크박스로 선택된 리스트입니다."""
+                   problem_types: List[str],
+                   note_picker: Optional[Dict] = None) -> Tuple[str,
+                                                        Dict,
+                                                        gr.update,
+                                                        str,
+                                                        str,
+                                                        gr.update,
+                                                        gr.update,
+                                                        str,
+                                                        str,
+                                                        Dict,
+                                                        Dict]:
+    """새 문제를 출제합니다. problem_types는 체크박스로 선택된 리스트입니다.
+
+    note_picker는 세션의 오답노트 드롭다운 검색 상태입니다. (picker_update 참고)
+    """
     # 선택된 문제 파일로 PROBLEM_BANK 재로드 (필요시)
     reload_problem_bank(problem_file)
 
@@ -1200,6 +1124,18 @@ def on_new_problem(problem_file: str,
         # Gradio Error를 raise하여 사용자에게 오류 메시지 표시
         raise gr.Error(error_msg)
 
+    return present_new_problem(problem, problem_file, rechallenge, hint, filters, applied_filters,
+                               note_picker)
+
+
+def present_new_problem(problem: Problem,
+                        problem_file: str,
+                        rechallenge: bool,
+                        hint: str,
+                        filters: Dict,
+                        applied_filters: Optional[Dict] = None,
+                        note_picker: Optional[Dict] = None) -> Tuple:
+    """신규 문제 탭에 문제를 표시하는 출력 묶음을 만듭니다. (on_new_problem, on_load_search_result 공용)"""
     question = render_question(
         problem,
         rechallenge,
@@ -1209,18 +1145,16 @@ def on_new_problem(problem_file: str,
     state = ensure_state({})
     state.update(
         {
-            "problem": problem,
+            "pid": problem.pid,
+            "source_file": problem_file,  # 현재 문제 파일 저장
             "rechallenge": rechallenge,
             "hint": hint,
             "filters": filters,
             "in_progress": False,
-            "last_feedback": "",
-            "source_file": problem_file,  # 현재 문제 파일 저장
         }
     )
-    # 오답노트 목록 자동 업데이트 (PID 드롭다운만)
-    pid_labels, pid_values = refresh_note_pid_choices()
-    pid_choices = list(zip(pid_labels, pid_values)) if pid_labels else []
+    # 오답노트 목록 자동 업데이트 (PID 드롭다운만, 세션이 받은 뒤 바뀐 경우에만)
+    pid_update, note_picker = picker_update(NOTE_CHOICES, note_pid_index, note_picker, reset_value=False)
 
     return (
         question,
@@ -1228,137 +1162,415 @@ def on_new_problem(problem_file: str,
         gr.update(value="", language=problem.safe_language),
         favorite_button_label(problem.pid, problem_file),
         "",  # exec_result 초기화
-        gr.update(choices=pid_choices, value=None),  # note_pid_dropdown 업데이트
+        pid_update,  # note_pid_dropdown 업데이트
         gr.update(value="💡 힌트 보기"),  # hint_btn 초기화
         "",  # add_notes_status 초기화
         "",  # nickname_input 초기화
+        client_view_data(state),  # new_view (힌트/즐겨찾기 클라이언트 핸들러용)
+        note_picker,  # note_picker
+    )
+
+
+def on_search(query: str,
+              problem_file: str,
+              difficulty: str,
+              language: str,
+              problem_types: List[str]) -> Tuple[gr.update, str]:
+    """현재 문제 파일에서 제목/본문/힌트/스키마를 검색합니다. 필터는 matches_filters를 그대로 적용합니다."""
+    if not query or not query.strip():
+        return gr.update(choices=[], value=None), "검색어를 입력하세요."
+
+    index = get_search_index(problem_file)
+    started = time.perf_counter()
+    result = index.search(
+        query,
+        lambda p: matches_filters(p, difficulty, language, problem_types),
+        limit=SEARCH_RESULT_LIMIT)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if not result.hits:
+        return gr.update(choices=[], value=None), f"'{query}'에 맞는 문제가 없습니다."
+
+    choices = [
+        (f"[{hit.problem.difficulty}] {hit.problem.title} ({hit.problem.kind})",
+         f"{problem_file}:{hit.problem.pid}")
+        for hit in result.hits
+    ]
+    # 매칭 결과의 난이도/문제 유형별 개수
+    by_difficulty: Counter = Counter()
+    by_type: Counter = Counter()
+    for (facet_difficulty, _, facet_type), count in result.facets.items():
+        by_difficulty[facet_difficulty] += count
+        by_type[facet_type] += count
+    info = (
+        f"**{result.total}개** 일치 (상위 {len(choices)}개 표시, {elapsed_ms:.1f} ms)\n\n"
+        f"📊 {' · '.join(f'{k} {v}' for k, v in sorted(by_difficulty.items()))}\n\n"
+        f"🏷️ {' · '.join(f'{k} {v}' for k, v in by_type.most_common())}"
     )
+    return gr.update(choices=choices, value=choices[0][1]), info
+
+
+def on_similar_problems(state: Dict,
+                        difficulty: str,
+                        language: str,
+                        problem_types: List[str]) -> Tuple[gr.update, str, gr.update]:
+    """현재 문제와 임베딩 코사인 유사도가 높은 문제를 현재 필터 안에서 추천합니다."""
+    problem = state_problem(state)
+    if problem is None:
+        return gr.update(), "먼저 문제를 출제하세요.", gr.update(open=True)
+
+    source_file = state.get("source_file", DEFAULT_PROBLEM_FILE)
+    index = get_embedding_index(source_file)
+    if index is None:
+        # 처음 한 번은 백그라운드에서 문제 임베딩을 만듭니다
+        status = BUILD_STATUS[source_file]
+        if status.error and not status.running:
+            message = f"⚠️ 임베딩 서버에 연결하지 못했습니다. ({status.error}) 다시 누르면 재시도합니다."
+        elif status.total:
+            message = f"🧭 문제 임베딩 생성 중... ({status.done}/{status.total}) 잠시 후 다시 눌러주세요."
+        else:
+            message = "🧭 문제 임베딩을 준비하는 중입니다. 잠시 후 다시 눌러주세요."
+        return gr.update(), message, gr.update(open=True)
+
+    hits = index.similar(
+        problem.pid,
+        lambda p: matches_filters(p, difficulty, language, problem_types),
+        limit=SIMILAR_RESULT_LIMIT)
+    if not hits:
+        return gr.update(choices=[], value=None), "현재 필터에 맞는 비슷한 문제가 없습니다.", gr.update(open=True)
+
+    choices = [
+        (f"[{hit.problem.difficulty}] {hit.problem.title} (유사도 {hit.similarity:.2f})",
+         f"{source_file}:{hit.problem.pid}")
+        for hit in hits
+    ]
+    info = f"🧭 비슷한 문제 {len(choices)}개 (기준: **{problem.title}**)"
+    return gr.update(choices=choices, value=choices[0][1]), info, gr.update(open=True)
+
 
+def on_load_search_result(composite_key: str,
+                          problem_file: str,
+                          difficulty: str,
+                          language: str,
+                          problem_types: List[str],
+                          note_picker: Optional[Dict] = None) -> Tuple:
+    """검색/추천 결과에서 선택한 문제를 신규 문제 탭에 불러옵니다. composite_key는 'source_file:pid' 형식입니다."""
+    if not composite_key:
+        raise gr.Error("검색 결과에서 문제를 선택하세요.")
 
-def on_submit(state: Dict, code: str, progress=gr.Progress()
-              ) -> Tuple[str, gr.update, gr.update]:
-    """코드를 제출하고 LLM 피드백을 받습니다. (자동 저장 없음)"""
+    parts = composite_key.split(":", 1)
+    if len(parts) == 2:
+        problem_file, pid = parts
+    else:
+        pid = composite_key
+
+    problem = find_problem(problem_file, pid)
+    if problem is None:
+        raise gr.Error(f"`{problem_file}`에서 문제를 찾을 수 없습니다. 다시 검색해주세요.")
+
+    filters = normalize_filters(difficulty, language, problem_types)
+    return present_new_problem(problem, problem_file, False, "", filters,
+                               note_picker=note_picker)
+
+
+def warm_bank_caches(changes: BankChanges) -> None:
+    """문제 파일 감시 리스너: 새로 읽은 파일의 검색 인덱스와 개수 큐브를 미리 만들고,
+    삭제된 파일의 검색 인덱스/개수 큐브/임베딩은 캐시에서 뺍니다.
+    """
+    for filename in changes.removed:
+        forget_search_index(filename)
+        forget_facet_cube(filename)
+        forget_embedding_index(filename)
+    for filename in changes.loaded:
+        try:
+            get_search_index(filename)
+            get_facet_cube(filename)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"[경고] 검색 인덱스 생성 실패 ({filename}): {exc}", file=sys.stderr)
+
+
+def on_bank_watch_tick(seen_generation: int, current_file: str) -> Tuple[gr.update, int]:
+    """문제 파일 목록이 바뀐 경우에만 문제은행 드롭다운 선택지를 갱신합니다.
+
+    선택 중이던 파일이 삭제되었으면 첫 번째 파일로 바꿉니다. (problem_file.change가 필터를 다시 계산)
+    """
+    generation = BANK_WATCHER.generation
+    if generation == seen_generation or not BANK_WATCHER.files:
+        return gr.update(), seen_generation
+    files = BANK_WATCHER.files
+    if current_file in files:
+        return gr.update(choices=files), generation
+    return gr.update(choices=files, value=files[0]), generation
+
+
+async def run_grading_job(job: GradingJob, publish: Callable[[], None]) -> None:
+    """채점 작업 본체입니다. GRADING_JOBS가 이벤트 핸들러와 별개의 task로 실행합니다.
+
+    캐스케이드 모드(job.mode)에 따라 빠른 모델의 판정을 먼저 채우고, 큰 모델의 상세 해설을
+    이어서 스트리밍합니다. 값이 바뀔 때마다 publish()로 따라가는 핸들러에 알립니다.
+    single 모드도 학습 통계와 복습 일정에 쓸 판정을 해설 뒤에 받습니다. (빠른 모델이 없으면 큰 모델)
+    """
+    problem = find_problem(job.source_file, job.pid)
+    if problem is None:
+        raise LookupError(f"문제를 찾을 수 없습니다: {job.source_file}:{job.pid}")
+
+    async with GRADING_LANE.slot():
+        job.status = RUNNING
+        if job.mode in ("cascade", "verdict_only"):
+            job.phase = "빠른 채점 중"
+            publish()
+            job.verdict = await build_verdict(problem, job.code)
+            publish()
+
+        if job.mode != "verdict_only":
+            job.phase = "LLM 피드백 생성 중"
+            publish()
+            async for detail in stream_feedback(problem, job.code, LM_STUDIO_ENDPOINT):
+                job.detail = detail
+                publish()
+
+        if job.mode == "single":
+            job.phase = "판정 중"
+            publish()
+            job.verdict = await build_verdict(problem, job.code)
+            publish()
+
+    # 학습 통계: 정답/오답 판정이 나온 채점만 (source_file, kind, difficulty, problem_type) 칸 하나에 더함
+    passed = verdict_passed(job.verdict)
+    if passed is not None:
+        await asyncio.to_thread(LEARNER_STATS.record_result, job.source_file, job.pid, passed)
+
+    if job.review:
+        quality = review_quality(job.verdict)
+        if quality is None:
+            # 판정 없이 통과로 치면 틀려도 간격이 늘어나므로 카드를 그대로(복습할 때) 둠
+            job.note = "⚠️ 판정을 받지 못해 복습 일정을 바꾸지 않았습니다. 다시 제출해주세요."
+            return
+        card = await asyncio.to_thread(REVIEW_QUEUE.record_review, job.source_file, job.pid, quality)
+        if card is not None:
+            job.note = f"📅 다음 복습: {format_due(card)}"
+
+
+def grading_job_markdown(job: GradingJob) -> str:
+    """채점 작업의 현재 상태를 결과 영역에 보일 Markdown으로 만듭니다."""
+    feedback = compose_feedback(job.verdict, job.detail)
+    if job.status == QUEUED:
+        return f"⏳ 채점 대기 중입니다. (대기 {GRADING_LANE.waiting}명)"
+    if job.status == ERROR:
+        return f"❌ 채점 중 오류가 발생했습니다: {job.error}"
+    if job.status == INTERRUPTED:
+        message = "⚠️ 서버가 다시 시작되어 채점이 중단되었습니다. 다시 제출해주세요."
+        return f"{message}\n\n{feedback}" if feedback else message
+    if job.status != DONE:
+        return feedback or f"⏳ {job.phase}..."
+
+    result = feedback
+    if job.mode == "verdict_only":
+        result += "\n\n> 📖 상세 해설이 필요하면 '상세 해설' 버튼을 누르세요."
+    if job.note:
+        result += f"\n\n> {job.note}"
+    return result
+
+
+async def follow_grading_job(state: Dict, job: GradingJob, progress: gr.Progress) -> AsyncIterator[str]:
+    """채점 작업이 바뀔 때마다 결과 Markdown을 yield하고, 끝나면 피드백을 탭 세션에 저장합니다.
+
+    핸들러(웹소켓)가 끊겨도 작업은 계속 실행되므로, 새로고침 후 같은 작업에 다시 붙을 수 있습니다.
+    """
+    phase = ""
+    async for job in GRADING_JOBS.follow(job.job_id):
+        if job.phase != phase:
+            phase = job.phase
+            progress(0.2 if job.mode in ("cascade", "verdict_only") and not job.verdict else 0.5, desc=phase)
+        yield grading_job_markdown(job)
+
+    if job.status == DONE:
+        # 힌트 자동 숨김 (버튼 레이블 초기화)
+        state["detail_pending"] = job.mode == "verdict_only"
+        save_session_feedback(state, last_feedback=compose_feedback(job.verdict, job.detail),
+                              last_verdict=job.verdict, last_code=job.code)
+
+
+async def on_submit(state: Dict, code: str, job_id: str = "", progress=gr.Progress()
+                    ) -> AsyncIterator[Tuple[str, gr.update, gr.update, str]]:
+    """코드를 제출하고 LLM 피드백을 받습니다. (자동 저장 없음)
+
+    채점은 GRADING_JOBS의 백그라운드 작업으로 실행하고 이 핸들러는 작업을 따라가며 화면만 갱신합니다.
+    작업 ID는 브라우저에 저장되어(마지막 출력) 새로고침 후 restore_grading_job이 다시 붙습니다.
+    같은 문제/코드/모드의 채점이 이미 있으면 모델을 다시 부르지 않고 그 결과를 보여줍니다.
+    """
     state = ensure_state(state)
-    if not state or "problem" not in state:
-        return "문제가 선택되지 않았습니다.", gr.update(), gr.update(value="💡 힌트 보기")
+    problem = state_problem(state)
+    if problem is None:
+        yield "문제가 선택되지 않았습니다.", gr.update(), gr.update(value="💡 힌트 보기"), job_id
+        return
 
     if state.get("in_progress"):
-        return "피드백 생성이 진행 중입니다. 잠시만 기다려주세요.", gr.update(), gr.update()
+        yield "피드백 생성이 진행 중입니다. 잠시만 기다려주세요.", gr.update(), gr.update(), job_id
+        return
 
     state["in_progress"] = True
-    problem: Problem = state["problem"]
+    source_file = state.get("source_file", DEFAULT_PROBLEM_FILE)
+    mode = resolve_cascade_mode(problem.problem_type, problem.difficulty)
+    review = state.pop("review", False)
 
-    progress(0.5, desc="LLM 피드백 생성 중")
-    feedback = build_feedback(problem, code, LM_STUDIO_ENDPOINT)
+    try:
+        # 복습 제출은 판정으로 복습 일정을 갱신해야 하므로 항상 새로 채점
+        job = None if review else GRADING_JOBS.find(source_file, problem.pid, code, mode)
+        if job is None:
+            job = GRADING_JOBS.start(source_file, problem.pid, code, mode, review, run_grading_job)
+        async for result in follow_grading_job(state, job, progress):
+            yield result, gr.update(), gr.update(value="💡 힌트 보기"), job.job_id
+    finally:
+        state["in_progress"] = False
 
-    # 힌트 자동 숨김
-    state.update({
-        "in_progress": False,
-        "last_feedback": feedback,
-        "last_code": code,
-        "hint_visible": False
-    })
 
-    # LLM 피드백만 반환
-    result = f"{feedback}"
+async def restore_grading_job(job_id: str, progress=gr.Progress()) -> AsyncIterator[Tuple]:
+    """페이지를 다시 불러왔을 때 브라우저에 남은 채점 작업의 문제와 결과를 탭에 되살립니다.
+
+    작업이 실행 중이면 끝날 때까지 따라가고, 끝났으면 저장된 피드백을 바로 보여줍니다.
+    작업이 만료되었거나 문제가 사라졌으면 작업 ID를 지웁니다.
 
-    return result, gr.update(), gr.update(value="💡 힌트 보기")
+    Returns:
+        (question, state, code_update, fav_button, exec_result, hint_btn, view, job_id)
+    """
+    job = GRADING_JOBS.get(job_id)
+    problem = find_problem(job.source_file, job.pid) if job else None
+    if problem is None:
+        yield (gr.update(),) * 7 + ("",)
+        return
+
+    filters = normalize_filters(None, None, None)
+    state = ensure_state({
+        "pid": problem.pid,
+        "source_file": job.source_file,
+        "rechallenge": False,
+        "hint": "",
+        "filters": filters,
+        "in_progress": True,
+    })
+    restored = (
+        render_question(problem, False, "", filters),
+        state,
+        gr.update(value=job.code, language=problem.safe_language),
+        favorite_button_label(problem.pid, job.source_file),
+    )
+    try:
+        async for result in follow_grading_job(state, job, progress):
+            yield (*restored, result, gr.update(value="💡 힌트 보기"), client_view_data(state), job.job_id)
+    finally:
+        state["in_progress"] = False
 
 
-def toggle_hint(state: Dict) -> Tuple[str, gr.update, Dict]:
-    """힌트 표시/숨김을 토글합니다."""
+async def on_request_detail(state: Dict, progress=gr.Progress()) -> AsyncIterator[str]:
+    """빠른 판정만 받은 제출에 대해 큰 모델의 상세 해설을 요청합니다."""
     state = ensure_state(state)
+    problem = state_problem(state)
+    if problem is None:
+        yield "문제가 선택되지 않았습니다."
+        return
 
-    if not state or "problem" not in state:
-        return "문제가 선택되지 않았습니다.", gr.update(value="💡 힌트 보기"), state
+    # 유휴 만료로 저장소에서 제거되었으면 다시 제출해야 합니다
+    saved = session_feedback(state)
+    if "last_code" not in saved:
+        yield "⚠️ 먼저 코드를 제출하세요."
+        return
 
-    # 힌트 표시 상태 토글
-    state["hint_visible"] = not state.get("hint_visible", False)
+    if not state.get("detail_pending"):
+        # 이미 상세 해설까지 받은 제출
+        yield saved.get("last_feedback", "")
+        return
 
-    problem: Problem = state["problem"]
+    if state.get("in_progress"):
+        yield "피드백 생성이 진행 중입니다. 잠시만 기다려주세요."
+        return
 
-    # LLM 응답이 있는지 확인
-    llm_feedback = state.get("last_feedback", "")
+    state["in_progress"] = True
+    verdict = saved.get("last_verdict", "")
 
-    if state["hint_visible"]:
-        # 힌트 표시
-        hint_text = f"### 💡 문법 힌트\n{problem.hint}"
-        button_label = "💡 힌트 숨기기"
+    try:
+        if GRADING_LANE.is_saturated():
+            yield f"⏳ 채점 대기 중입니다. (대기 {GRADING_LANE.waiting + 1}번째)"
 
-        # LLM 응답이 있으면 함께 표시 (LLM 응답 유지 + 힌트 추가)
-        if llm_feedback:
-            result = f"{llm_feedback}\n\n{hint_text}"
-        else:
-            result = hint_text
-    else:
-        # 힌트 숨김
-        button_label = "💡 힌트 보기"
+        async with GRADING_LANE.slot():
+            progress(0.5, desc="상세 해설 생성 중")
+            detail = ""
+            async for detail in stream_feedback(problem, saved["last_code"], LM_STUDIO_ENDPOINT):
+                yield compose_feedback(verdict, detail)
 
-        # LLM 응답이 있으면 유지
-        if llm_feedback:
-            result = f"{llm_feedback}"
-        else:
-            result = ""
+        feedback = compose_feedback(verdict, detail)
+        state["detail_pending"] = False
+        save_session_feedback(state, last_feedback=feedback)
+    finally:
+        state["in_progress"] = False
 
-    return result, gr.update(value=button_label), state
+    yield feedback
 
 
-def toggle_favorite(state: Dict) -> Tuple[gr.update, str, gr.update]:
-    if not state or "problem" not in state:
-        labels, values = refresh_favorite_choices()
-        return gr.update(), "문제가 선택되지 않았습니다.", gr.update(
-            choices=list(zip(labels, values)), value=None)
+def client_view_data(state: Optional[Dict]) -> Dict:
+    """탭의 클라이언트 JS 핸들러(HINT_TOGGLE_JS, FAVORITE_SYNC_JS)가 쓰는 데이터를 반환합니다.
 
-    problem: Problem = state["problem"]
+    Returns:
+        Dict: {"key": "source_file:pid", "hint": 렌더링된 힌트 블록}, 문제가 없으면 빈 딕셔너리
+    """
+    problem = state_problem(state)
+    if problem is None:
+        return {}
     source_file = state.get("source_file", DEFAULT_PROBLEM_FILE)
-    favorites = load_favorites()
+    return {
+        "key": f"{source_file}:{problem.pid}",
+        "hint": f"### 💡 문법 힌트\n{problem.hint}",
+    }
 
-    # source_file + pid 조합으로 존재 여부 확인
-    exists = any(
-        fav.get("pid") == problem.pid and fav.get("source_file", DEFAULT_PROBLEM_FILE) == source_file
-        for fav in favorites
-    )
 
-    if exists:
-        # source_file + pid 조합으로 제거
-        favorites = [
+def toggle_favorite(state: Dict, favorite_picker: Optional[Dict] = None) -> Tuple[gr.update, str, gr.update, Dict]:
+    problem = state_problem(state)
+    if problem is None:
+        choices, favorite_picker = picker_update(FAVORITE_CHOICES, favorite_index, favorite_picker)
+        return gr.update(), "문제가 선택되지 않았습니다.", choices, favorite_picker
+
+    source_file = state.get("source_file", DEFAULT_PROBLEM_FILE)
+
+    def toggle(favorites: List[Dict]) -> bool:
+        # source_file + pid 조합으로 존재 여부 확인 후 제거/추가
+        kept = [
             fav for fav in favorites
             if not (fav.get("pid") == problem.pid and fav.get("source_file", DEFAULT_PROBLEM_FILE) == source_file)
         ]
-        message = "즐겨찾기에서 제거했습니다."
-        new_value = None
-    else:
-        favorites.append(
-            {
-                "pid": problem.pid,
-                "source_file": source_file,
-                "title": problem.title,
-                "difficulty": problem.difficulty,
-                "kind": problem.kind,
-            }
-        )
+        if len(kept) < len(favorites):
+            favorites[:] = kept
+            return False
+        favorites.append(favorite_entry(problem, source_file))
+        return True
+
+    if update_favorites(toggle):
         message = "즐겨찾기에 추가했습니다."
         new_value = problem.pid
+    else:
+        message = "즐겨찾기에서 제거했습니다."
+        new_value = None
 
-    save_favorites(favorites)
-    labels, values = refresh_favorite_choices()
+    choices, favorite_picker = picker_update(FAVORITE_CHOICES, favorite_index, favorite_picker, value=new_value)
     return (
         gr.update(value=favorite_button_label(problem.pid, source_file)),
         message,
-        gr.update(choices=list(zip(labels, values)), value=new_value),
+        choices,
+        favorite_picker,
     )
 
 
 def build_interface() -> gr.Blocks:
     # 사용 가능한 문제 파일 목록
     available_problem_files = get_available_problem_files()
+    initial_problem_file = available_problem_files[0] if available_problem_files else DEFAULT_PROBLEM_FILE
 
+    # 필터 옵션과 옵션별 문제 수는 문제 파일의 개수 큐브에서 가져옵니다
     # kind 값을 정렬하여 계층적으로 표시
     # 결과: ["전체", "Python", "Python.Pyspark", "SQL"]
-    language_options = ["전체"] + \
-        sorted(unique_preserve_order([p.kind for p in problem_bank.PROBLEM_BANK]))
-    # 문제 유형 옵션 (체크박스용)
-    problem_type_options = ["코딩", "개념문제", "빈칸채우기"]
+    facet_cube = get_facet_cube(initial_problem_file)
+    difficulty_options = facet_cube.difficulties
+    language_options = ["전체"] + facet_cube.kinds
+    initial_difficulty = difficulty_options[0] if difficulty_options else None
 
     demo = gr.Blocks(
         title="SQL & Python 코딩 연습"
@@ -1366,9 +1578,19 @@ def build_interface() -> gr.Blocks:
 
     with demo:
         # 탭별 독립적인 state 생성
-        new_state = gr.State({})    # 신규 문제 탭 전용
-        note_state = gr.State({})   # 오답노트 탭 전용
-        fav_state = gr.State({})    # 즐겨찾기 탭 전용
+        # state에는 (source_file, pid) 핸들만 두고 피드백은 FEEDBACK_STORE에 보관합니다.
+        new_state = gr.State({}, delete_callback=discard_session_state)    # 신규 문제 탭 전용
+        note_state = gr.State({}, delete_callback=discard_session_state)   # 오답노트 탭 전용
+        fav_state = gr.State({}, delete_callback=discard_session_state)    # 즐겨찾기 탭 전용
+        # 탭별 마지막 채점 작업 ID (브라우저 localStorage). 새로고침해도 채점 결과를 되살립니다.
+        new_job = gr.BrowserState("", storage_key="codedojo_new_job", secret=GRADING_JOB_SECRET)
+        note_job = gr.BrowserState("", storage_key="codedojo_note_job", secret=GRADING_JOB_SECRET)
+        fav_job = gr.BrowserState("", storage_key="codedojo_fav_job", secret=GRADING_JOB_SECRET)
+        # 탭별 클라이언트 보기 데이터 (client_view_data). 힌트 토글/즐겨찾기 버튼 동기화를
+        # 브라우저에서 처리하도록 문제를 불러올 때 함께 내려보냅니다.
+        new_view = gr.JSON({}, visible=False)
+        note_view = gr.JSON({}, visible=False)
+        fav_view = gr.JSON({}, visible=False)
 
         # ===== 헤더 =====
         with gr.Row(variant='panel'):
@@ -1380,6 +1602,16 @@ def build_interface() -> gr.Blocks:
                 interactive=False,         # 사용자가 이미지를 수정/업로드 하지 못하도록 설정
                 
             )
+        # AI 모델 예열 상태 (백그라운드 warm-up/keep-alive 결과를 주기적으로 표시)
+        model_status_md = gr.Markdown(MODEL_WARMER.format_status())
+        model_status_timer = gr.Timer(10)
+        # data 폴더 문제 파일 추가/삭제를 드롭다운에 반영 (세션별로 마지막으로 본 generation 기억)
+        bank_watch_timer = gr.Timer(BANK_WATCHER.interval)
+        bank_generation = gr.State(BANK_WATCHER.generation)
+        # 오답노트/즐겨찾기 드롭다운은 검색 결과 한 쪽만 보내고, 세션이 마지막으로 받은
+        # generation/검색어/쪽을 기억해 바뀐 경우에만 다시 보냄
+        note_picker = gr.State(new_picker_state(NOTE_CHOICES))
+        favorite_picker = gr.State(new_picker_state(FAVORITE_CHOICES))
 
 
         # ===== 탭 구조 =====
@@ -1392,25 +1624,28 @@ def build_interface() -> gr.Blocks:
                     with gr.Row():
                         problem_file = gr.Dropdown(
                             choices=available_problem_files,
-                            value=available_problem_files[0] if available_problem_files else DEFAULT_PROBLEM_FILE,
+                            value=initial_problem_file,
                             label="📁 문제은행 선택",
                             scale=3
                         )
                         difficulty = gr.Dropdown(
-                            DIFFICULTY_OPTIONS,
-                            value=DIFFICULTY_OPTIONS[0],
+                            difficulty_choices(facet_cube, difficulty_options, initial_difficulty,
+                                               language_options[0], PROBLEM_TYPE_OPTIONS),
+                            value=initial_difficulty,
                             label="📊 난이도",
                             scale=3
                         )
                         language = gr.Dropdown(
-                            language_options,
+                            language_choices(facet_cube, language_options, initial_difficulty,
+                                             language_options[0], PROBLEM_TYPE_OPTIONS),
                             value=language_options[0],
                             label="💻 영역",
                             scale=3
                         )
                         problem_types = gr.CheckboxGroup(
-                            choices=problem_type_options,
-                            value=problem_type_options,
+                            choices=problem_type_choices(facet_cube, PROBLEM_TYPE_OPTIONS,
+                                                         initial_difficulty, language_options[0]),
+                            value=PROBLEM_TYPE_OPTIONS,
                             label="🏷️ 문제 유형",
                             scale=3
                         )
@@ -1434,7 +1669,16 @@ def build_interface() -> gr.Blocks:
                         with gr.Row():
                             new_btn = gr.Button("🔄 새 문제 출제", variant="primary", size="md", scale=1)
                             favorite_btn = gr.Button("⭐ 즐겨찾기 추가", size="md", scale=1)
+                        similar_btn = gr.Button("🧭 비슷한 문제 추천", size="md")
                         new_favorite_status_md = gr.Markdown("")
+                        with gr.Accordion("🔎 문제 검색", open=False, elem_classes="gradio-accordion") as search_accordion:
+                            search_query = gr.Textbox(
+                                placeholder="제목, 본문, 힌트, 스키마에서 검색 (Enter)",
+                                show_label=False,
+                            )
+                            search_results = gr.Dropdown(choices=[], label="검색/추천 결과", interactive=True)
+                            search_info_md = gr.Markdown("")
+                            load_search_btn = gr.Button("📥 검색한 문제 풀기", size="sm")
 
                     # 오른쪽: 코드 에디터
                     with gr.Column(scale=8, variant="panel"):
@@ -1455,6 +1699,7 @@ def build_interface() -> gr.Blocks:
                                 scale=8
                             )
                             hint_btn = gr.Button("💡 힌트 보기", size="md", scale=1)
+                            explain_btn = gr.Button("📖 상세 해설", size="md", scale=1, visible=bool(FAST_MODEL))
 
                 # [3단] 피드백 영역 (접을 수 있는 Accordion)
                 with gr.Accordion("LLM 피드백 및 오답노트 추가", open=True, elem_classes="gradio-accordion"):
@@ -1491,14 +1736,24 @@ def build_interface() -> gr.Blocks:
             with gr.Tab("📝 오답노트"):
                 # 1단: 제어 패널 (접을 수 있는 Accordion)
                 with gr.Accordion("📝 오답노트 재도전", open=True, elem_classes="gradio-accordion"):
+                    # 문제 목록 검색 (제목/별명/유형/난이도, 결과는 한 쪽씩)
+                    with gr.Row():
+                        note_search = gr.Textbox(
+                            placeholder="🔍 제목 / 별명 / 유형 / 난이도 검색",
+                            show_label=False,
+                            container=False,
+                            scale=4
+                        )
+                        note_prev_btn = gr.Button("◀ 이전", size="sm", scale=1, min_width=60)
+                        note_next_btn = gr.Button("다음 ▶", size="sm", scale=1, min_width=60)
                     # 2단계 드롭다운: 1) PID 선택 → 2) 시도 선택
                     with gr.Row():
                         # 드롭다운 1: PID 선택
-                        pid_labels, pid_values = refresh_note_pid_choices()
-                        pid_choices = list(zip(pid_labels, pid_values)) if pid_labels else []
+                        first_page = note_pid_index().search()
                         note_pid_dropdown = gr.Dropdown(
-                            choices=pid_choices,
+                            choices=first_page.choices,
                             label="문제 선택",
+                            info=first_page.info(),
                             scale=2,
                             min_width=200
                         )
@@ -1513,6 +1768,7 @@ def build_interface() -> gr.Blocks:
                     with gr.Row():
                         refresh_btn = gr.Button("🔄 새로고침", size="sm", scale=1)
                         load_note_btn = gr.Button("🎯 문제 불러오기", size="sm", scale=1)
+                        review_btn = gr.Button("📅 복습", size="sm", scale=1)
 
                 # 2단: 메인 콘텐츠 영역 - 헤더
                 with gr.Row():
@@ -1553,6 +1809,7 @@ def build_interface() -> gr.Blocks:
                                 scale=8
                             )
                             note_hint_btn = gr.Button("💡 힌트 보기", size="md", scale=1)
+                            note_explain_btn = gr.Button("📖 상세 해설", size="md", scale=1, visible=bool(FAST_MODEL))
 
                 # [3단] 피드백 영역 (접을 수 있는 Accordion)
                 with gr.Accordion("LLM 피드백", open=True, elem_classes="gradio-accordion"):
@@ -1567,11 +1824,20 @@ def build_interface() -> gr.Blocks:
             with gr.Tab("⭐ 즐겨찾기"):
                 # 1단: 제어 패널 (접을 수 있는 Accordion)
                 with gr.Accordion("⭐ 즐겨찾기 목록", open=True, elem_classes="gradio-accordion"):
-                    fav_labels, fav_values = refresh_favorite_choices()
-                    fav_choices = list(zip(fav_labels, fav_values)) if fav_labels else []
+                    with gr.Row():
+                        fav_search = gr.Textbox(
+                            placeholder="🔍 제목 / 유형 / 난이도 검색",
+                            show_label=False,
+                            container=False,
+                            scale=4
+                        )
+                        fav_prev_btn = gr.Button("◀ 이전", size="sm", scale=1, min_width=60)
+                        fav_next_btn = gr.Button("다음 ▶", size="sm", scale=1, min_width=60)
+                    first_page = favorite_index().search()
                     favorite_choices = gr.Dropdown(
-                        choices=fav_choices,
+                        choices=first_page.choices,
                         label="즐겨찾기 목록",
+                        info=first_page.info(),
                         scale=1
                     )
                     with gr.Row():
@@ -1618,6 +1884,7 @@ def build_interface() -> gr.Blocks:
                                 scale=8
                             )
                             fav_hint_btn = gr.Button("💡 힌트 보기", size="md", scale=1)
+                            fav_explain_btn = gr.Button("📖 상세 해설", size="md", scale=1, visible=bool(FAST_MODEL))
 
                 # [3단] 피드백 영역 (접을 수 있는 Accordion)
                 with gr.Accordion("LLM 피드백", open=True, elem_classes="gradio-accordion"):
@@ -1628,6 +1895,19 @@ def build_interface() -> gr.Blocks:
                         container=True
                     )
 
+            # ========== 탭 4: 학습 통계 ==========
+            # 채점 판정의 누적 집계(learner_stats)로 그리므로 기록 수와 관계없이 조합 수만큼만 계산
+            with gr.Tab("📈 학습 통계") as stats_tab:
+                stats_md = gr.Markdown(format_dashboard())
+                stats_refresh_btn = gr.Button("🔄 새로고침", size="sm")
+
+        # ===== LLM 토큰 사용량 리포트 =====
+        with gr.Accordion("📊 LLM 토큰 사용량", open=False, elem_classes="gradio-accordion"):
+            usage_report_md = gr.Markdown(format_usage_report())
+            lane_metrics_md = gr.Markdown(format_lane_metrics())
+            session_memory_md = gr.Markdown(format_session_memory_report())
+            usage_refresh_btn = gr.Button("🔄 새로고침", size="sm")
+
         with gr.Row():
             theme_toggle_btn = gr.Button("🌙 다크모드", elem_id="theme-toggle-btn", size="sm", scale=1)
 
@@ -1635,89 +1915,147 @@ def build_interface() -> gr.Blocks:
         # ===== 이벤트 핸들러 - 신규 문제 탭 =====
 
         # 문제 파일 선택 시 난이도/언어 드롭다운 옵션 업데이트
-        def on_problem_file_change(selected_file):
-            """문제 파일 변경 시 난이도/언어 옵션 업데이트"""
-            _, new_difficulty_options, new_language_options = reload_problem_bank(selected_file)
-            return (
-                gr.update(choices=new_difficulty_options, value=new_difficulty_options[0] if new_difficulty_options else None),
-                gr.update(choices=new_language_options, value=new_language_options[0] if new_language_options else "전체"),
-            )
+        def on_problem_file_change(selected_file, selected_types):
+            """문제 파일 변경 시 난이도/언어 옵션과 옵션별 문제 수 업데이트"""
+            _, new_difficulty_options, _ = reload_problem_bank(selected_file)
+            new_difficulty = new_difficulty_options[0] if new_difficulty_options else None
+            difficulty_update, language_update, types_update, new_btn_update = filter_choice_updates(
+                selected_file, new_difficulty, "전체", selected_types)
+            difficulty_update["value"] = new_difficulty
+            language_update["value"] = "전체"
+            return difficulty_update, language_update, types_update, new_btn_update
 
         problem_file.change(
-            on_problem_file_change,
-            inputs=[problem_file],
-            outputs=[difficulty, language],
+            UI_LANE.track(on_problem_file_change),
+            inputs=[problem_file, problem_types],
+            outputs=[difficulty, language, problem_types, new_btn],
+            **UI_LANE.event_kwargs,
+        )
+
+        bank_watch_timer.tick(
+            UI_LANE.track(on_bank_watch_tick),
+            inputs=[bank_generation, problem_file],
+            outputs=[problem_file, bank_generation],
+            show_progress="hidden",
+            **UI_LANE.event_kwargs,
         )
 
+        # 필터를 바꿀 때마다 다른 필터의 옵션별 문제 수를 다시 계산 (사용자 입력에만 반응)
+        for filter_component in (difficulty, language, problem_types):
+            filter_component.input(
+                UI_LANE.track(filter_choice_updates),
+                inputs=[problem_file, difficulty, language, problem_types],
+                outputs=[difficulty, language, problem_types, new_btn],
+                show_progress="hidden",
+                **UI_LANE.event_kwargs,
+            )
+
         new_btn.click(
-            on_new_problem,
-            inputs=[problem_file, difficulty, language, problem_types],
-            outputs=[question_md, new_state, code_box, favorite_btn, exec_result, note_pid_dropdown, hint_btn, add_notes_status, nickname_input],
+            UI_LANE.track(on_new_problem),
+            inputs=[problem_file, difficulty, language, problem_types, note_picker],
+            outputs=[question_md, new_state, code_box, favorite_btn, exec_result, note_pid_dropdown, hint_btn, add_notes_status, nickname_input, new_view, note_picker],
+            **UI_LANE.event_kwargs,
+        )
+
+        search_query.submit(
+            UI_LANE.track(on_search),
+            inputs=[search_query, problem_file, difficulty, language, problem_types],
+            outputs=[search_results, search_info_md],
+            **UI_LANE.event_kwargs,
+        )
+
+        similar_btn.click(
+            UI_LANE.track(on_similar_problems),
+            inputs=[new_state, difficulty, language, problem_types],
+            outputs=[search_results, search_info_md, search_accordion],
+            **UI_LANE.event_kwargs,
+        )
+
+        load_search_btn.click(
+            UI_LANE.track(on_load_search_result),
+            inputs=[search_results, problem_file, difficulty, language, problem_types, note_picker],
+            outputs=[question_md, new_state, code_box, favorite_btn, exec_result, note_pid_dropdown, hint_btn, add_notes_status, nickname_input, new_view, note_picker],
+            **UI_LANE.event_kwargs,
         )
 
         submit_btn.click(
             on_submit,
-            inputs=[new_state, code_box],
-            outputs=[exec_result, note_pid_dropdown, hint_btn],
+            inputs=[new_state, code_box, new_job],
+            outputs=[exec_result, note_pid_dropdown, hint_btn, new_job],
             show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
         )
 
+        # 힌트 토글은 서버 왕복 없이 브라우저에서 처리
         hint_btn.click(
-            toggle_hint,
-            inputs=new_state,
-            outputs=[exec_result, hint_btn, new_state],
+            None,
+            inputs=[exec_result, hint_btn, new_view],
+            outputs=[exec_result, hint_btn],
+            js=HINT_TOGGLE_JS,
         )
 
-        # ===== 헬퍼 함수: 즐겨찾기 버튼 업데이트 =====
-        def _get_favorite_button_update(state_dict):
-            """state에서 즐겨찾기 버튼 업데이트를 계산합니다.
-
-            Args:
-                state_dict: 탭의 state 딕셔너리
-
-            Returns:
-                gr.update: 버튼 업데이트 객체
-            """
-            if state_dict and "problem" in state_dict:
-                source_file = state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                return gr.update(value=favorite_button_label(state_dict["problem"].pid, source_file))
-            return gr.update()  # state 없으면 변경 안 함
-
-        # 신규 문제 탭의 즐겨찾기 버튼 (버튼만 동기화, 메시지는 현재 탭만)
-        def toggle_favorite_new_tab(new_state_dict, note_state_dict, fav_state_dict):
-            # 현재 탭(신규 출제)의 문제에 대해 즐겨찾기 토글
-            btn_update, message, choices_update = toggle_favorite(new_state_dict)
-            # 다른 탭의 버튼 업데이트 계산
-            note_btn = _get_favorite_button_update(note_state_dict)
-            fav_btn = _get_favorite_button_update(fav_state_dict)
-            # 메시지는 현재 탭(신규 출제)에만 표시
-            return btn_update, message, choices_update, note_btn, "", fav_btn, ""
+        explain_btn.click(
+            on_request_detail,
+            inputs=new_state,
+            outputs=exec_result,
+            show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
+        )
 
+        # 즐겨찾기 토글은 현재 탭만 서버에서 처리하고,
+        # 같은 문제를 보고 있는 다른 탭의 버튼 레이블은 브라우저에서 맞춥니다. (메시지는 현재 탭만)
         favorite_btn.click(
-            toggle_favorite_new_tab,
-            inputs=[new_state, note_state, fav_state],
-            outputs=[favorite_btn, new_favorite_status_md, favorite_choices, note_favorite_btn, note_favorite_status_md, fav_favorite_btn, fav_favorite_status_md],
+            UI_LANE.track(toggle_favorite),
+            inputs=[new_state, favorite_picker],
+            outputs=[favorite_btn, new_favorite_status_md, favorite_choices, favorite_picker],
+            **UI_LANE.event_kwargs,
+        ).then(
+            None,
+            inputs=[favorite_btn, new_view, note_view, fav_view, note_favorite_btn, fav_favorite_btn],
+            outputs=[note_favorite_btn, note_favorite_status_md, fav_favorite_btn, fav_favorite_status_md],
+            js=FAVORITE_SYNC_JS,
         )
 
-        # ===== 이벤트 핸들러 - 즐겨찾기 탭 =====
-        def refresh_favorites(new_state_dict, note_state_dict):
-            labels, values = refresh_favorite_choices()
-
-            # 다른 탭의 버튼 레이블 계산
-            if new_state_dict and "problem" in new_state_dict:
-                source_file = new_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                new_btn = favorite_button_label(new_state_dict["problem"].pid, source_file)
-            else:
-                new_btn = "☆ 즐겨찾기 추가"
+        # ===== 이벤트 핸들러 - 목록 검색/쪽 넘기기 (오답노트, 즐겨찾기 공용) =====
+        def bind_picker(search_box, prev_btn, next_btn, dropdown, picker_state, cache, index_fn):
+            def on_query(query, picker):
+                return picker_update(cache, index_fn, picker, query=query, page=0)
+
+            def on_turn(step):
+                def turn(query, picker):
+                    picker = picker or {}
+                    # 검색어가 아직 반영되지 않았으면 첫 쪽부터
+                    page = picker.get("page", 0) + step if query.strip() == picker.get("query", "") else 0
+                    return picker_update(cache, index_fn, picker, query=query, page=max(page, 0))
+                return turn
+
+            search_box.input(
+                UI_LANE.track(on_query),
+                inputs=[search_box, picker_state],
+                outputs=[dropdown, picker_state],
+                show_progress="hidden",
+                trigger_mode="always_last",
+                **UI_LANE.event_kwargs,
+            )
+            for btn, step in ((prev_btn, -1), (next_btn, 1)):
+                btn.click(
+                    UI_LANE.track(on_turn(step)),
+                    inputs=[search_box, picker_state],
+                    outputs=[dropdown, picker_state],
+                    show_progress="hidden",
+                    **UI_LANE.event_kwargs,
+                )
 
-            if note_state_dict and "problem" in note_state_dict:
-                source_file = note_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                note_btn = favorite_button_label(note_state_dict["problem"].pid, source_file)
-            else:
-                note_btn = "☆ 즐겨찾기 추가"
+        bind_picker(note_search, note_prev_btn, note_next_btn, note_pid_dropdown, note_picker,
+                    NOTE_CHOICES, note_pid_index)
+        bind_picker(fav_search, fav_prev_btn, fav_next_btn, favorite_choices, favorite_picker,
+                    FAVORITE_CHOICES, favorite_index)
 
+        # ===== 이벤트 핸들러 - 즐겨찾기 탭 =====
+        def refresh_favorites(picker):
+            choices, picker = picker_update(FAVORITE_CHOICES, favorite_index, picker)
             return (
-                gr.update(choices=list(zip(labels, values)), value=None),
+                choices,
                 {},
                 "즐겨찾기 목록에서 문제를 선택하세요.",
                 gr.update(value=""),
@@ -1725,17 +2063,18 @@ def build_interface() -> gr.Blocks:
                 gr.update(value="💡 힌트 보기"),
                 "☆ 즐겨찾기 추가",  # fav_favorite_btn (현재 탭이므로 초기화)
                 "",
-                note_btn,  # note_favorite_btn
-                new_btn,   # favorite_btn
+                {},  # fav_view
+                picker,  # favorite_picker
             )
 
         fav_refresh_btn.click(
-            refresh_favorites,
-            inputs=[new_state, note_state],
-            outputs=[favorite_choices, fav_state, fav_question_md, fav_code_box, fav_exec_result, fav_hint_btn, fav_favorite_btn, fav_favorite_status_md, note_favorite_btn, favorite_btn]
+            UI_LANE.track(refresh_favorites),
+            inputs=favorite_picker,
+            outputs=[favorite_choices, fav_state, fav_question_md, fav_code_box, fav_exec_result, fav_hint_btn, fav_favorite_btn, fav_favorite_status_md, fav_view, favorite_picker],
+            **UI_LANE.event_kwargs,
         )
 
-        def load_favorite_selection(composite_key, new_state_dict, note_state_dict, fav_state_dict):
+        def load_favorite_selection(composite_key):
             """즐겨찾기에서 문제를 불러옵니다. composite_key는 'source_file:pid' 형식입니다."""
             if not composite_key:
                 return (
@@ -1746,8 +2085,7 @@ def build_interface() -> gr.Blocks:
                     gr.update(value="💡 힌트 보기"),
                     "☆ 즐겨찾기 추가",
                     "",
-                    "☆ 즐겨찾기 추가",
-                    "☆ 즐겨찾기 추가",
+                    {},
                 )
 
             # 복합 키 파싱: source_file:pid
@@ -1758,106 +2096,98 @@ def build_interface() -> gr.Blocks:
                 source_file, pid = DEFAULT_PROBLEM_FILE, composite_key
 
             question, state_val, code_update, btn_label, status_text, hint_update = load_favorite_problem(pid, source_file)
-
-            # 각 탭의 버튼 레이블을 개별적으로 계산
-            fav_btn = btn_label  # 현재 불러온 문제
-
-            if new_state_dict and "problem" in new_state_dict:
-                new_source = new_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                new_btn = favorite_button_label(new_state_dict["problem"].pid, new_source)
-            else:
-                new_btn = "☆ 즐겨찾기 추가"
-
-            if note_state_dict and "problem" in note_state_dict:
-                note_source = note_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                note_btn = favorite_button_label(note_state_dict["problem"].pid, note_source)
-            else:
-                note_btn = "☆ 즐겨찾기 추가"
-
-            return question, state_val, code_update, status_text, hint_update, fav_btn, "", note_btn, new_btn
+            return question, state_val, code_update, status_text, hint_update, btn_label, "", client_view_data(state_val)
 
         load_fav_btn.click(
-            load_favorite_selection,
-            inputs=[favorite_choices, new_state, note_state, fav_state],
-            outputs=[fav_question_md, fav_state, fav_code_box, fav_status_md, fav_hint_btn, fav_favorite_btn, fav_favorite_status_md, note_favorite_btn, favorite_btn],
+            UI_LANE.track(load_favorite_selection),
+            inputs=[favorite_choices],
+            outputs=[fav_question_md, fav_state, fav_code_box, fav_status_md, fav_hint_btn, fav_favorite_btn, fav_favorite_status_md, fav_view],
+            **UI_LANE.event_kwargs,
         )
 
 
         # 즐겨찾기 탭의 제출/힌트 버튼
         fav_submit_btn.click(
             on_submit,
-            inputs=[fav_state, fav_code_box],
-            outputs=[fav_exec_result, note_pid_dropdown, fav_hint_btn],
+            inputs=[fav_state, fav_code_box, fav_job],
+            outputs=[fav_exec_result, note_pid_dropdown, fav_hint_btn, fav_job],
             show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
         )
 
+        # 힌트 토글은 서버 왕복 없이 브라우저에서 처리
         fav_hint_btn.click(
-            toggle_hint,
-            inputs=fav_state,
-            outputs=[fav_exec_result, fav_hint_btn, fav_state],
+            None,
+            inputs=[fav_exec_result, fav_hint_btn, fav_view],
+            outputs=[fav_exec_result, fav_hint_btn],
+            js=HINT_TOGGLE_JS,
         )
 
-        # 즐겨찾기 탭의 문제 영역 즐겨찾기 버튼 (버튼만 동기화, 메시지는 현재 탭만)
-        def toggle_favorite_fav_tab(fav_state_dict, new_state_dict, note_state_dict):
-            # 현재 탭(즐겨찾기)의 문제에 대해 즐겨찾기 토글
-            btn_update, message, choices_update = toggle_favorite(fav_state_dict)
-            # 다른 탭의 버튼 업데이트 계산
-            new_btn = _get_favorite_button_update(new_state_dict)
-            note_btn = _get_favorite_button_update(note_state_dict)
-            # 메시지는 현재 탭(즐겨찾기)에만 표시
-            return btn_update, message, choices_update, new_btn, "", note_btn, ""
+        fav_explain_btn.click(
+            on_request_detail,
+            inputs=fav_state,
+            outputs=fav_exec_result,
+            show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
+        )
 
+        # 즐겨찾기 탭의 문제 영역 즐겨찾기 버튼
         fav_favorite_btn.click(
-            toggle_favorite_fav_tab,
-            inputs=[fav_state, new_state, note_state],
-            outputs=[fav_favorite_btn, fav_favorite_status_md, favorite_choices, favorite_btn, new_favorite_status_md, note_favorite_btn, note_favorite_status_md],
+            UI_LANE.track(toggle_favorite),
+            inputs=[fav_state, favorite_picker],
+            outputs=[fav_favorite_btn, fav_favorite_status_md, favorite_choices, favorite_picker],
+            **UI_LANE.event_kwargs,
+        ).then(
+            None,
+            inputs=[fav_favorite_btn, fav_view, new_view, note_view, favorite_btn, note_favorite_btn],
+            outputs=[favorite_btn, new_favorite_status_md, note_favorite_btn, note_favorite_status_md],
+            js=FAVORITE_SYNC_JS,
         )
 
         # 오답노트 추가 이벤트
-        def on_add_to_notes(state_dict, nickname, progress=gr.Progress()):
-            """오답노트에 수동으로 추가합니다."""
+        async def on_add_to_notes(state_dict, nickname, picker, progress=gr.Progress()):
+            """오답노트에 수동으로 추가합니다. 파일 I/O는 이벤트 루프를 막지 않도록 스레드로 넘깁니다."""
             progress(0.1, desc="오답노트 저장 시작...")
 
-            if not state_dict or "problem" not in state_dict:
-                return "⚠️ 먼저 문제를 출제하고 코드를 제출하세요.", gr.update()
+            problem = state_problem(state_dict)
+            if problem is None:
+                return "⚠️ 먼저 문제를 출제하고 코드를 제출하세요.", gr.update(), picker
 
-            if "last_code" not in state_dict or "last_feedback" not in state_dict:
-                return "⚠️ 먼저 코드를 제출하여 피드백을 받으세요.", gr.update()
+            saved = session_feedback(state_dict)
+            if "last_code" not in saved or "last_feedback" not in saved:
+                return "⚠️ 먼저 코드를 제출하여 피드백을 받으세요.", gr.update(), picker
 
-            problem = state_dict["problem"]
             source_file = state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
 
             # 중복 저장 체크: 같은 source_file + pid + nickname 조합으로 이미 저장되었는지 확인
-            existing_attempts = load_attempts()
-            if any(
-                attempt.pid == problem.pid
-                and attempt.nickname == nickname
-                and attempt.source_file == source_file
-                for attempt in existing_attempts
-            ):
-                return "⚠️ 같은 별명으로 이미 저장된 문제입니다.", gr.update()
-
-            code = state_dict["last_code"]
-            feedback = state_dict["last_feedback"]
+            # (해당 문제의 기록만 읽음: 색인이 있는 세그먼트는 해당 줄만)
+            existing_attempts = await asyncio.to_thread(load_attempts_for, source_file, problem.pid)
+            if any(attempt.nickname == nickname for attempt in existing_attempts):
+                return "⚠️ 같은 별명으로 이미 저장된 문제입니다.", gr.update(), picker
+
+            code = saved["last_code"]
+            feedback = saved["last_feedback"]
 
             progress(0.5, desc="LLM으로 힌트 요약 중...")
-            hint_summary = generate_hint_summary(problem, code, feedback, LM_STUDIO_ENDPOINT)
+            async with GRADING_LANE.slot():
+                hint_summary = await generate_hint_summary(problem, code, feedback, LM_STUDIO_ENDPOINT)
 
             progress(0.8, desc="오답노트에 저장 중...")
-            result = save_to_wrong_notes(problem, code, feedback, nickname, hint_summary, source_file)
+            result = await asyncio.to_thread(
+                save_to_wrong_notes, problem, code, feedback, nickname, hint_summary, source_file)
 
             progress(0.9, desc="오답노트 목록 갱신 중...")
-            # 오답노트 목록 갱신 (PID 드롭다운만)
-            pid_labels, pid_values = refresh_note_pid_choices()
-            pid_choices_updated = list(zip(pid_labels, pid_values)) if pid_labels else []
-
-            return result, gr.update(choices=pid_choices_updated, value=None)
+            # 오답노트 목록 갱신 (PID 드롭다운만, 저장에 실패했으면 generation이 그대로라 보내지 않음)
+            pid_update, picker = await asyncio.to_thread(
+                picker_update, NOTE_CHOICES, note_pid_index, picker, reset_value=False)
+            return result, pid_update, picker
 
         add_to_notes_btn.click(
             on_add_to_notes,
-            inputs=[new_state, nickname_input],
-            outputs=[add_notes_status, note_pid_dropdown],
+            inputs=[new_state, nickname_input, note_picker],
+            outputs=[add_notes_status, note_pid_dropdown, note_picker],
             show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
         )
 
         # ===== 이벤트 핸들러 - 오답노트 탭 =====
@@ -1872,31 +2202,18 @@ def build_interface() -> gr.Blocks:
 
         # 드롭다운 1 선택 시 드롭다운 2 업데이트
         note_pid_dropdown.change(
-            update_attempt_dropdown,
+            UI_LANE.track(update_attempt_dropdown),
             inputs=[note_pid_dropdown],
-            outputs=[note_attempt_dropdown]
+            outputs=[note_attempt_dropdown],
+            **UI_LANE.event_kwargs,
         )
 
-        def refresh_notes(new_state_dict, fav_state_dict):
-            # PID 드롭다운 갱신
-            pid_labels, pid_values = refresh_note_pid_choices()
-            pid_choices = list(zip(pid_labels, pid_values)) if pid_labels else []
-
-            # 다른 탭의 버튼 레이블 계산
-            if new_state_dict and "problem" in new_state_dict:
-                new_source = new_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                new_btn = favorite_button_label(new_state_dict["problem"].pid, new_source)
-            else:
-                new_btn = "☆ 즐겨찾기 추가"
-
-            if fav_state_dict and "problem" in fav_state_dict:
-                fav_source = fav_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                fav_btn = favorite_button_label(fav_state_dict["problem"].pid, fav_source)
-            else:
-                fav_btn = "☆ 즐겨찾기 추가"
+        def refresh_notes(picker):
+            # PID 드롭다운 갱신 (바뀌지 않았으면 선택만 초기화)
+            pid_update, picker = picker_update(NOTE_CHOICES, note_pid_index, picker)
 
             return (
-                gr.update(choices=pid_choices, value=None),  # note_pid_dropdown
+                pid_update,  # note_pid_dropdown
                 gr.update(choices=[], value=None),  # note_attempt_dropdown 초기화
                 {},  # note_state
                 "오답노트에서 문제를 선택하세요.",  # note_question_md
@@ -1905,37 +2222,25 @@ def build_interface() -> gr.Blocks:
                 gr.update(value="💡 힌트 보기"),  # note_hint_btn
                 "☆ 즐겨찾기 추가",  # note_favorite_btn (현재 탭이므로 초기화)
                 "",  # note_favorite_status_md
-                fav_btn,  # fav_favorite_btn
-                new_btn,  # favorite_btn
+                {},  # note_view
+                picker,  # note_picker
             )
 
         refresh_btn.click(
-            refresh_notes,
-            inputs=[new_state, fav_state],
-            outputs=[note_pid_dropdown, note_attempt_dropdown, note_state, note_question_md, note_code_box, note_exec_result, note_hint_btn, note_favorite_btn, note_favorite_status_md, fav_favorite_btn, favorite_btn]
+            UI_LANE.track(refresh_notes),
+            inputs=note_picker,
+            outputs=[note_pid_dropdown, note_attempt_dropdown, note_state, note_question_md, note_code_box, note_exec_result, note_hint_btn, note_favorite_btn, note_favorite_status_md, note_view, note_picker],
+            **UI_LANE.event_kwargs,
         )
 
-        def load_note_to_tab(composite_key, new_state_dict, note_state_dict, fav_state_dict):
+        def load_note_to_tab(composite_key):
             """오답노트 탭용: 문제 불러오기 (복합 키 사용)"""
             if not composite_key:
-                return gr.update(), {}, gr.update(), "", gr.update(value="💡 힌트 보기"), "☆ 즐겨찾기 추가", "", "☆ 즐겨찾기 추가", "☆ 즐겨찾기 추가"
+                return gr.update(), {}, gr.update(), "", gr.update(value="💡 힌트 보기"), "☆ 즐겨찾기 추가", "", {}
 
             # load_from_notes() 함수 사용
             question, note_state_val, code_update, note_btn, status = load_from_notes(composite_key)
 
-            # 다른 탭의 버튼 레이블 계산
-            if new_state_dict and "problem" in new_state_dict:
-                new_source = new_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                new_btn = favorite_button_label(new_state_dict["problem"].pid, new_source)
-            else:
-                new_btn = "☆ 즐겨찾기 추가"
-
-            if fav_state_dict and "problem" in fav_state_dict:
-                fav_source = fav_state_dict.get("source_file", DEFAULT_PROBLEM_FILE)
-                fav_btn = favorite_button_label(fav_state_dict["problem"].pid, fav_source)
-            else:
-                fav_btn = "☆ 즐겨찾기 추가"
-
             return (
                 question,  # note_question_md
                 note_state_val,  # note_state
@@ -1944,58 +2249,140 @@ def build_interface() -> gr.Blocks:
                 gr.update(value="💡 힌트 보기"),  # note_hint_btn
                 note_btn,  # note_favorite_btn
                 "",  # note_favorite_status_md
-                fav_btn,  # fav_favorite_btn
-                new_btn,  # favorite_btn
+                client_view_data(note_state_val),  # note_view
             )
 
         load_note_btn.click(
-            load_note_to_tab,
-            inputs=[note_attempt_dropdown, new_state, note_state, fav_state],
-            outputs=[note_question_md, note_state, note_code_box, note_exec_result, note_hint_btn, note_favorite_btn, note_favorite_status_md, fav_favorite_btn, favorite_btn],
+            UI_LANE.track(load_note_to_tab),
+            inputs=[note_attempt_dropdown],
+            outputs=[note_question_md, note_state, note_code_box, note_exec_result, note_hint_btn, note_favorite_btn, note_favorite_status_md, note_view],
+            **UI_LANE.event_kwargs,
+        )
+
+        def load_next_review():
+            """복습 일정에서 지금 복습할 문제(다음 복습 시각이 가장 이른 문제)를 불러옵니다."""
+            card = REVIEW_QUEUE.next_due()
+            if card is None:
+                upcoming = REVIEW_QUEUE.peek()
+                message = "🎉 지금 복습할 문제가 없습니다."
+                if upcoming is not None:
+                    message += f" (다음 복습: {format_due(upcoming)})"
+                return gr.update(), gr.update(), gr.update(), message, gr.update(), gr.update(), "", gr.update()
+
+            outputs = list(load_note_to_tab(card.last_key))
+            if outputs[1]:
+                # 이 문제를 제출하면 판정으로 복습 카드를 갱신
+                outputs[1]["review"] = True
+                outputs[3] = f"📅 복습 (실패 {card.lapses}회, 연속 통과 {card.repetitions}회)\n\n{outputs[3]}"
+            else:
+                # 기록이나 문제가 없어진 카드는 일정에서 빼 다음 카드가 나오게 함
+                REVIEW_QUEUE.remove(card.source_file, card.pid)
+                outputs[3] = f"⚠️ 복습할 기록을 불러오지 못했습니다: {card.key} (복습 일정에서 뺌)"
+            return tuple(outputs)
+
+        review_btn.click(
+            UI_LANE.track(load_next_review),
+            inputs=None,
+            outputs=[note_question_md, note_state, note_code_box, note_exec_result, note_hint_btn, note_favorite_btn, note_favorite_status_md, note_view],
+            **UI_LANE.event_kwargs,
         )
 
         note_submit_btn.click(
             on_submit,
-            inputs=[note_state, note_code_box],
-            outputs=[note_exec_result, note_pid_dropdown, note_hint_btn],
+            inputs=[note_state, note_code_box, note_job],
+            outputs=[note_exec_result, note_pid_dropdown, note_hint_btn, note_job],
             show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
         )
 
+        # 힌트 토글은 서버 왕복 없이 브라우저에서 처리
         note_hint_btn.click(
-            toggle_hint,
-            inputs=note_state,
-            outputs=[note_exec_result, note_hint_btn, note_state],
+            None,
+            inputs=[note_exec_result, note_hint_btn, note_view],
+            outputs=[note_exec_result, note_hint_btn],
+            js=HINT_TOGGLE_JS,
         )
 
-        # 오답노트 탭의 즐겨찾기 버튼 (버튼만 동기화, 메시지는 현재 탭만)
-        def toggle_favorite_note_tab(note_state_dict, new_state_dict, fav_state_dict):
-            # 현재 탭(오답노트)의 문제에 대해 즐겨찾기 토글
-            btn_update, message, choices_update = toggle_favorite(note_state_dict)
-            # 다른 탭의 버튼 업데이트 계산
-            new_btn = _get_favorite_button_update(new_state_dict)
-            fav_btn = _get_favorite_button_update(fav_state_dict)
-            # 메시지는 현재 탭(오답노트)에만 표시
-            return btn_update, message, choices_update, new_btn, "", fav_btn, ""
+        note_explain_btn.click(
+            on_request_detail,
+            inputs=note_state,
+            outputs=note_exec_result,
+            show_progress="minimal",
+            **GRADING_LANE.event_kwargs,
+        )
 
+        # 오답노트 탭의 즐겨찾기 버튼
         note_favorite_btn.click(
-            toggle_favorite_note_tab,
-            inputs=[note_state, new_state, fav_state],
-            outputs=[note_favorite_btn, note_favorite_status_md, favorite_choices, favorite_btn, new_favorite_status_md, fav_favorite_btn, fav_favorite_status_md],
+            UI_LANE.track(toggle_favorite),
+            inputs=[note_state, favorite_picker],
+            outputs=[note_favorite_btn, note_favorite_status_md, favorite_choices, favorite_picker],
+            **UI_LANE.event_kwargs,
+        ).then(
+            None,
+            inputs=[note_favorite_btn, note_view, new_view, fav_view, favorite_btn, fav_favorite_btn],
+            outputs=[favorite_btn, new_favorite_status_md, fav_favorite_btn, fav_favorite_status_md],
+            js=FAVORITE_SYNC_JS,
+        )
+
+        # ===== 이벤트 핸들러 - AI 모델 상태 =====
+        model_status_timer.tick(
+            UI_LANE.track(lambda: MODEL_WARMER.format_status()),
+            inputs=None,
+            outputs=model_status_md,
+            show_progress="hidden",
+            **UI_LANE.event_kwargs,
+        )
+
+        # ===== 이벤트 핸들러 - LLM 사용량 =====
+        for stats_trigger in (stats_tab.select, stats_refresh_btn.click):
+            stats_trigger(
+                UI_LANE.track(format_dashboard),
+                inputs=None,
+                outputs=stats_md,
+                show_progress="hidden",
+                **UI_LANE.event_kwargs,
+            )
+
+        usage_refresh_btn.click(
+            UI_LANE.track(lambda: (format_usage_report(), format_lane_metrics(), format_session_memory_report())),
+            inputs=None,
+            outputs=[usage_report_md, lane_metrics_md, session_memory_md],
+            **UI_LANE.event_kwargs,
         )
 
         # ===== 이벤트 핸들러 - Dark Mode Toggle =====
         # 페이지 로드 시 초기화
         demo.load(None, None, None, js=DARK_MODE_INIT_JS)
 
+        # 새로고침 전에 제출한 채점 작업이 있으면 탭마다 문제와 결과를 되살림
+        for job_state, tab_outputs in (
+                (new_job, [question_md, new_state, code_box, favorite_btn, exec_result, hint_btn, new_view]),
+                (note_job, [note_question_md, note_state, note_code_box, note_favorite_btn, note_exec_result, note_hint_btn, note_view]),
+                (fav_job, [fav_question_md, fav_state, fav_code_box, fav_favorite_btn, fav_exec_result, fav_hint_btn, fav_view])):
+            demo.load(
+                restore_grading_job,
+                inputs=job_state,
+                outputs=[*tab_outputs, job_state],
+                show_progress="minimal",
+                **GRADING_LANE.event_kwargs,
+            )
+
         # 버튼 클릭 시 토글
         theme_toggle_btn.click(None, None, None, js=DARK_MODE_TOGGLE_JS)
 
     return demo
 
 
-app = build_interface()
+# 오답노트 병렬 파싱 워커(wrong_notes._parse_pool, spawn)는 실행 중인 메인 모듈을 __mp_main__으로
+# 다시 불러옵니다. 이 가드는 워커에서 build_interface()만 건너뜁니다. gradio 등 이 파일의 import는
+# 워커마다 그대로 실행되지만 풀을 재사용하므로 워커당 한 번입니다. 문제 은행(problem_bank.PROBLEM_BANK),
+# 복습 일정, 통계는 처음 쓸 때 읽으므로 워커에서는 읽지 않습니다.
+if __name__ != "__mp_main__":
+    app = build_interface()
 
 if __name__ == "__main__":
+    # api.py가 `import app`으로 이 모듈을 다시 실행하지 않도록 같은 모듈로 등록
+    sys.modules.setdefault("app", sys.modules[__name__])
     launch_kwargs = {
         "theme": CUSTOM_THEME,
         "css": CUSTOM_CSS,
@@ -2005,4 +2392,20 @@ if __name__ == "__main__":
     }
     if "theme_mode" in inspect.signature(app.launch).parameters:
         launch_kwargs["theme_mode"] = "light"
-    app.launch(**launch_kwargs)
+    # 첫 제출이 모델 로드 비용을 떠안지 않도록 백그라운드에서 미리 예열
+    start_model_warmer()
+    # 문제 파일을 백그라운드에서 미리 읽고, data 폴더 변경을 감시해 바뀐 파일만 다시 읽음
+    # (새로 읽은 파일의 검색 인덱스/개수 큐브도 함께 준비하고, 삭제된 파일의 캐시는 정리)
+    BANK_WATCHER.add_listener(warm_bank_caches)
+    # 변경 로그가 길어진 문제 파일은 백그라운드에서 압축
+    BANK_WATCHER.add_listener(compact_changed_banks)
+    start_bank_watcher()
+
+    from api import HEADLESS_API_ENABLED, create_server
+    if HEADLESS_API_ENABLED:
+        # Gradio UI는 "/", 헤드리스 JSON API는 "/api/v1" (api.py 참고)
+        import uvicorn
+        server = create_server(app, theme=launch_kwargs["theme"], css=launch_kwargs["css"])
+        uvicorn.run(server, host=launch_kwargs["server_name"], port=launch_kwargs["server_port"])
+    else:
+        app.launch(**launch_kwargs)
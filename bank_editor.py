@@ -0,0 +1,294 @@
+"""문제 은행 편집 도구.
+
+문제를 추가/수정/삭제할 때 문제 파일 전체를 다시 쓰지 않고, 문제 파일 옆의 변경 로그
+(data/<파일명>.changes)에 한 줄씩 덧붙입니다. load_problem_bank가 읽을 때 로그를 합치며,
+로그가 BANK_COMPACT_THRESHOLD줄을 넘으면 문제 파일을 통째로 다시 써서 로그를 비웁니다.
+CLI와 앱(백그라운드 압축)은 서로 다른 프로세스이므로 로그 추가와 압축은 로그 파일에
+fcntl.flock을 잡고 합니다. (fcntl이 없는 Windows에서는 같은 프로세스 안에서만 잠급니다)
+
+사용법 (저장소 루트에서):
+    python bank_editor.py upsert problems.json new_problem.json   # 객체 하나 또는 배열 ('-'면 stdin)
+    python bank_editor.py delete problems.json python_basic_string_quotes
+    python bank_editor.py compact problems.json
+    python bank_editor.py status
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from problem_bank import (
+    Problem,
+    changelog_path_for,
+    find_problem,
+    get_available_problem_files,
+    is_jsonl_bank,
+    iter_bank_records,
+    problem_from_record,
+)
+
+# 변경 로그가 이 줄 수를 넘으면 압축합니다.
+BANK_COMPACT_THRESHOLD = int(os.getenv("BANK_COMPACT_THRESHOLD", "200"))
+
+# 같은 프로세스 안에서 로그 추가와 압축이 겹치지 않도록 파일별로 잠급니다.
+_BANK_LOCKS: Dict[str, threading.Lock] = {}
+_BANK_LOCKS_GUARD = threading.Lock()
+_COMPACTING: set = set()
+
+
+def _bank_lock(filename: str) -> threading.Lock:
+    with _BANK_LOCKS_GUARD:
+        return _BANK_LOCKS.setdefault(filename, threading.Lock())
+
+
+def _bank_path(filename: str) -> Path:
+    return Path("data") / filename
+
+
+@contextmanager
+def _locked_changelog(log_path: Path, mode: str) -> Iterator[Optional[BinaryIO]]:
+    """변경 로그를 열어 다른 프로세스와 겹치지 않게 잠근 채 반환합니다.
+
+    압축은 로그를 새 파일로 교체하거나 지우므로, 잠금을 기다리는 동안 교체된 옛 파일을
+    잡았으면 다시 엽니다. mode가 "r+b"이고 로그가 없으면 None을 반환합니다.
+    """
+    while True:
+        try:
+            f = log_path.open(mode)
+        except FileNotFoundError:
+            yield None
+            return
+        with f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)  # 파일을 닫으면 풀림
+            try:
+                current = os.stat(log_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(f.fileno()).st_ino:
+                yield f
+                return
+
+
+def _append_entry(filename: str, entry: Dict[str, Any]) -> None:
+    bank_path = _bank_path(filename)
+    if not bank_path.exists():
+        raise FileNotFoundError(f"Problem data file not found: {bank_path}")
+    entry["ts"] = time.time()
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _bank_lock(filename), _locked_changelog(changelog_path_for(bank_path), "ab") as f:
+        f.write(line.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def upsert_problem(filename: str, record: Dict[str, Any]) -> Problem:
+    """문제를 추가하거나 같은 pid의 문제를 교체합니다. 레코드가 잘못되었으면 ValueError."""
+    problem = problem_from_record(record)
+    _append_entry(filename, {"op": "upsert", "problem": record})
+    return problem
+
+
+def delete_problem(filename: str, pid: str) -> bool:
+    """문제를 삭제합니다. 해당 pid가 없으면 로그에 남기지 않고 False를 반환합니다."""
+    if find_problem(filename, pid) is None:
+        return False
+    _append_entry(filename, {"op": "delete", "pid": pid})
+    return True
+
+
+def changelog_length(filename: str) -> int:
+    """변경 로그의 줄 수입니다. (로그가 없으면 0)"""
+    log_path = changelog_path_for(_bank_path(filename))
+    if not log_path.exists():
+        return 0
+    with log_path.open("rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def merge_bank_records(records: List[Any], log_lines: List[str]) -> List[Dict[str, Any]]:
+    """원본 레코드에 변경 로그를 적용합니다. 바뀌지 않은 레코드는 키 순서까지 그대로 둡니다.
+
+    load_problem_bank의 apply_change_log와 같은 규칙(제자리 교체, 새 pid는 끝에 추가)을 따르며,
+    검증에 실패하는 로그 항목은 읽을 때와 마찬가지로 건너뜁니다.
+    """
+    merged: List[Optional[Dict[str, Any]]] = [r for r in records if isinstance(r, dict)]
+    positions = {r.get("pid"): i for i, r in enumerate(merged)}
+    for line in log_lines:
+        try:
+            entry = json.loads(line)
+            if entry.get("op") == "upsert":
+                record = entry["problem"]
+                pid = problem_from_record(record).pid
+                if pid in positions:
+                    merged[positions[pid]] = record
+                else:
+                    positions[pid] = len(merged)
+                    merged.append(record)
+            elif entry.get("op") == "delete":
+                position = positions.pop(entry.get("pid"), None)
+                if position is not None:
+                    merged[position] = None
+        except (ValueError, KeyError, AttributeError):
+            continue
+    return [r for r in merged if r is not None]
+
+
+def _detect_indent(path: Path) -> int:
+    """JSON 배열 문제 파일의 들여쓰기 칸 수를 첫 레코드에서 읽습니다. (기본 4칸)"""
+    with path.open(encoding="utf-8-sig") as f:
+        for line in f:
+            stripped = line.lstrip(" ")
+            if stripped.startswith("{"):
+                return len(line) - len(stripped) or 4
+    return 4
+
+
+def _write_atomic(path: Path, records: List[Dict[str, Any]], jsonl: bool) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        if jsonl:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            # json.dumps(records, indent=...)와 같은 형태를 레코드 단위로 씁니다
+            indent = _detect_indent(path)
+            f.write("[" if records else "[]")
+            for i, record in enumerate(records):
+                body = json.dumps(record, ensure_ascii=False, indent=indent)
+                f.write(("\n" if i == 0 else ",\n") + "\n".join(" " * indent + line for line in body.splitlines()))
+            if records:
+                f.write("\n]")
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+
+
+def compact_bank(filename: str) -> int:
+    """변경 로그를 문제 파일에 합쳐 다시 쓰고 로그를 비웁니다. 합친 로그 줄 수를 반환합니다.
+
+    1) 로그를 끝(offset)까지 읽어 문제 파일에 합친 뒤 임시 파일로 쓰고 교체
+    2) 로그에서 offset 이후의 부분(끝나지 않은 줄)만 남기고 교체
+    로그 잠금을 끝까지 잡고 있으므로 그 사이 다른 프로세스의 추가가 사라지지 않고,
+    두 단계 사이에 중단되어도 로그 재적용 결과가 같으므로 문제 목록은 달라지지 않습니다.
+    """
+    bank_path = _bank_path(filename)
+    log_path = changelog_path_for(bank_path)
+    with _bank_lock(filename), _locked_changelog(log_path, "r+b") as f:
+        if f is None:
+            return 0
+        applied = f.read()
+        # 잠그지 않고 쓰다가 끊긴 마지막 줄은 합치지 않고 남깁니다
+        offset = applied.rfind(b"\n") + 1
+        rest = applied[offset:]
+        applied = applied[:offset]
+
+        lines = [line for line in applied.decode("utf-8").splitlines() if line.strip()]
+        if lines:
+            records = [item for _, item in iter_bank_records(bank_path)]
+            _write_atomic(bank_path, merge_bank_records(records, lines), is_jsonl_bank(bank_path))
+
+        if rest:
+            tmp = log_path.with_name(log_path.name + ".tmp")
+            tmp.write_bytes(rest)
+            tmp.replace(log_path)
+        else:
+            log_path.unlink()
+        return len(lines)
+
+
+def schedule_compaction(filename: str, threshold: int = BANK_COMPACT_THRESHOLD) -> Optional[threading.Thread]:
+    """변경 로그가 threshold줄을 넘었으면 백그라운드 스레드에서 압축합니다."""
+    if changelog_length(filename) < threshold:
+        return None
+    with _BANK_LOCKS_GUARD:
+        if filename in _COMPACTING:
+            return None
+        _COMPACTING.add(filename)
+
+    def _run() -> None:
+        try:
+            compact_bank(filename)
+        except (OSError, ValueError) as exc:
+            print(f"[경고] 문제 파일 압축 실패 ({filename}): {exc}", file=sys.stderr)
+        finally:
+            with _BANK_LOCKS_GUARD:
+                _COMPACTING.discard(filename)
+
+    thread = threading.Thread(target=_run, name=f"bank-compact-{filename}", daemon=True)
+    thread.start()
+    return thread
+
+
+def compact_changed_banks(changes) -> None:
+    """문제 파일 감시 리스너: 변경 로그가 길어진 문제 파일을 백그라운드에서 압축합니다."""
+    for filename in changes.loaded:
+        schedule_compaction(filename)
+
+
+def _read_records(source: str) -> List[Dict[str, Any]]:
+    text = sys.stdin.read() if source == "-" else Path(source).read_text(encoding="utf-8")
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="문제 은행 편집 (변경 로그 기반)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_upsert = sub.add_parser("upsert", help="문제 추가/수정")
+    p_upsert.add_argument("bank")
+    p_upsert.add_argument("records", help="문제 객체 또는 배열 JSON 파일 ('-'면 stdin)")
+    p_delete = sub.add_parser("delete", help="문제 삭제")
+    p_delete.add_argument("bank")
+    p_delete.add_argument("pids", nargs="+")
+    p_compact = sub.add_parser("compact", help="변경 로그를 문제 파일에 합치기")
+    p_compact.add_argument("bank")
+    sub.add_parser("status", help="문제 파일별 변경 로그 줄 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        for filename in get_available_problem_files():
+            print(f"{filename}: 변경 로그 {changelog_length(filename)}줄 (압축 기준 {BANK_COMPACT_THRESHOLD}줄)")
+        return 0
+
+    if args.command == "compact":
+        print(f"{args.bank}: 변경 로그 {compact_bank(args.bank)}줄을 합쳤습니다.")
+        return 0
+
+    failed = 0
+    if args.command == "upsert":
+        for i, record in enumerate(_read_records(args.records)):
+            try:
+                problem = upsert_problem(args.bank, record)
+                print(f"upsert {problem.pid}")
+            except ValueError as exc:
+                failed += 1
+                print(f"[오류] #{i}: {exc}", file=sys.stderr)
+    else:
+        for pid in args.pids:
+            if delete_problem(args.bank, pid):
+                print(f"delete {pid}")
+            else:
+                failed += 1
+                print(f"[오류] {args.bank}에 {pid} 문제가 없습니다.", file=sys.stderr)
+
+    # CLI는 곧바로 종료되므로 백그라운드가 아닌 현재 프로세스에서 압축합니다
+    if changelog_length(args.bank) >= BANK_COMPACT_THRESHOLD:
+        print(f"{args.bank}: 변경 로그 {compact_bank(args.bank)}줄을 합쳤습니다.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from problem_bank import bank_signature, forget_problem_bank, get_available_problem_files, get_problem_bank
+
+# data 폴더 문제 파일 감시 설정
+# - 앱 시작 시 모든 문제 파일을 스레드 풀에서 동시에 읽어 캐시에 올립니다.
+#   (첫 사용자가 큰 문제 파일 파싱 비용을 떠안지 않도록)
+# - 이후 BANK_WATCH_SECONDS마다 문제 파일과 변경 로그의 (mtime, 크기)를 확인해
+#   추가/변경된 파일만 다시 읽고, 삭제된 파일은 캐시에서 뺍니다.
+# - 캐시 항목은 튜플 하나로 교체되므로 요청 처리 중에도 반쯤 바뀐 목록이 보이지 않습니다.
+BANK_WATCH_SECONDS = float(os.getenv("BANK_WATCH_SECONDS", "3"))
+BANK_PRELOAD_WORKERS = int(os.getenv("BANK_PRELOAD_WORKERS", "4"))
+
+
+@dataclass
+class BankChanges:
+    """한 번의 확인에서 발견된 문제 파일 변경 내역입니다."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def loaded(self) -> List[str]:
+        """새로 읽은 파일 (추가 + 변경)"""
+        return self.added + self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def preload_banks(filenames: Sequence[str], workers: int = BANK_PRELOAD_WORKERS) -> List[str]:
+    """문제 파일들을 동시에 읽어 캐시에 올립니다. 읽기에 성공한 파일명을 반환합니다."""
+    def _load(filename: str) -> Optional[str]:
+        try:
+            get_problem_bank(filename)
+            return filename
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            print(f"[경고] 문제 파일 미리 읽기 실패 ({filename}): {exc}", file=sys.stderr)
+            return None
+
+    if not filenames:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(filenames))),
+                            thread_name_prefix="bank-preload") as pool:
+        return [name for name in pool.map(_load, filenames) if name]
+
+
+class BankWatcher:
+    """data 폴더의 문제 파일을 주기적으로 확인해 바뀐 파일만 다시 읽습니다.
+
+    generation은 파일 목록이나 내용이 바뀔 때마다 1씩 증가합니다.
+    UI는 이 값을 세션별로 기억해 두었다가 달라졌을 때만 드롭다운을 갱신합니다.
+    """
+
+    def __init__(self, data_dir: Path | str = Path("data"), interval: float = BANK_WATCH_SECONDS):
+        self.data_dir = Path(data_dir)
+        self.interval = interval
+        self.generation = 0
+        self.files: List[str] = []
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._listeners: List[Callable[[BankChanges], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[BankChanges], None]) -> None:
+        """변경이 반영된 뒤 감시 스레드에서 호출될 함수를 등록합니다."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bank-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self.scan()
+        while not self._stop.wait(self.interval):
+            self.scan()
+
+    def scan(self) -> BankChanges:
+        """파일 목록과 (mtime, 크기)를 비교해 바뀐 파일만 다시 읽습니다."""
+        with self._lock:
+            files = get_available_problem_files(self.data_dir)
+            signatures = {name: bank_signature(self.data_dir / name) for name in files}
+            signatures = {name: sig for name, sig in signatures.items() if sig[0] != -1}
+
+            changes = BankChanges(
+                added=[name for name in signatures if name not in self._signatures],
+                changed=[name for name, sig in signatures.items()
+                         if name in self._signatures and self._signatures[name] != sig],
+                removed=[name for name in self._signatures if name not in signatures],
+            )
+            if not changes:
+                return changes
+
+            preload_banks(changes.loaded)
+            for name in changes.removed:
+                forget_problem_bank(name)
+
+            self._signatures = signatures
+            self.files = list(signatures)
+            self.generation += 1
+
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception as exc:  # 리스너 오류로 감시 스레드가 멈추지 않도록
+                print(f"[경고] 문제 파일 변경 처리 실패: {exc}", file=sys.stderr)
+        return changes
+
+
+BANK_WATCHER = BankWatcher()
+
+
+def start_bank_watcher() -> BankWatcher:
+    """앱 시작 시 호출합니다. 첫 확인에서 모든 문제 파일을 미리 읽습니다."""
+    BANK_WATCHER.start()
+    return BANK_WATCHER
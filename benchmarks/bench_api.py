@@ -0,0 +1,114 @@
+"""헤드리스 JSON API 처리량 벤치마크.
+
+대역 서버(stub_llm_server)를 별도 프로세스로 띄우고, 같은 프로세스에서 API 서버(api.create_server)를
+uvicorn으로 실행한 뒤, 클라이언트 N개가 동시에 "출제(pick) → 채점(SSE 끝까지 읽기)"를 반복합니다.
+제출 코드는 요청마다 달라 채점 작업 재사용 없이 매번 모델을 부릅니다.
+
+- pick: 문제 출제 요청 지연
+- grade: 채점 요청부터 done 이벤트까지 걸린 시간
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_api.py --clients 32 --requests 200 --token-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_async_grading import free_port, wait_for_server  # noqa: E402
+
+
+def percentile_ms(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+
+async def run_clients(base: str, clients: int, requests: int) -> None:
+    import httpx
+
+    pick_times: List[float] = []
+    grade_times: List[float] = []
+    counter = iter(range(requests))
+
+    async def client(http: httpx.AsyncClient) -> None:
+        for i in counter:
+            started = time.perf_counter()
+            response = await http.get(f"{base}/api/v1/problems/pick")
+            response.raise_for_status()
+            problem = response.json()
+            picked = time.perf_counter()
+            body = {"source_file": problem["source_file"], "pid": problem["pid"], "code": f"SELECT {i}"}
+            async with http.stream("POST", f"{base}/api/v1/grade", json=body) as stream:
+                async for line in stream.aiter_lines():
+                    if line == "event: done":
+                        break
+            pick_times.append(picked - started)
+            grade_times.append(time.perf_counter() - picked)
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    print(f"채점 {requests}건, 클라이언트 {clients}개: {elapsed:.2f} s | {requests / elapsed:.1f} 채점/s")
+    for name, values in (("pick", pick_times), ("grade", grade_times)):
+        print(f"  {name:<6} p50 {percentile_ms(values, 0.5):8.1f} ms | p95 {percentile_ms(values, 0.95):8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--token-ms", type=float, default=5.0, help="대역 서버 출력 토큰당 지연(ms)")
+    args = parser.parse_args()
+
+    stub_port, api_port = free_port(), free_port()
+    stub = subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "stub_llm_server.py"), "--port", str(stub_port),
+        "--token-ms", str(args.token_ms), "--prompt-ms", "0",
+    ])
+    # app은 불러올 때 엔드포인트를 읽으므로 먼저 대역 서버로 지정
+    endpoint = f"http://127.0.0.1:{stub_port}/v1/chat/completions"
+    os.environ["LM_STUDIO_ENDPOINT"] = endpoint
+    os.environ["LM_STUDIO_FAST_ENDPOINT"] = endpoint
+    try:
+        wait_for_server(f"http://127.0.0.1:{stub_port}/v1/models")
+        import uvicorn
+
+        import app
+        import llm_client
+        from api import create_server
+        from grading_jobs import GRADING_JOBS
+
+        # 사용량 로그와 채점 작업 파일이 저장소의 data 폴더에 쌓이지 않도록 함
+        llm_client.record_usage = lambda *a, **k: None
+        GRADING_JOBS.root = Path(tempfile.mkdtemp(prefix="bench_api_jobs_"))
+
+        server = uvicorn.Server(uvicorn.Config(create_server(app.app), host="127.0.0.1", port=api_port,
+                                               log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{api_port}"
+        wait_for_server(f"{base}/api/v1/problems/pick")
+        asyncio.run(run_clients(base, args.clients, args.requests))
+        server.should_exit = True
+        thread.join(timeout=10)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""스레드 풀 방식과 비동기 방식의 동시 채점 처리량 비교 벤치마크.
+
+대역 서버(stub_llm_server)를 별도 프로세스로 띄우고, 채점 요청 N건을 동시에 보냅니다.
+- thread-pool: Gradio 동기 핸들러처럼 고정 크기 스레드 풀에서 call_llm 호출
+- thread-per-request: 스레드 풀을 요청 수만큼 늘린 경우
+- async: acall_llm을 asyncio.gather로 동시에 대기
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_async_grading.py --requests 200 --token-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import llm_client  # noqa: E402
+from llm_client import acall_llm, call_llm  # noqa: E402
+
+GRADIO_THREAD_LIMIT = 40  # anyio 기본 워커 스레드 수 (Gradio 동기 핸들러가 사용)
+
+
+class ThreadPeak:
+    """벤치마크 동안 프로세스의 최대 스레드 수를 샘플링합니다."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(url: str, timeout: float = 10.0) -> None:
+    import requests
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise RuntimeError(f"대역 서버 응답 없음: {url}")
+
+
+def run_threads(endpoint: str, n: int, workers: int) -> Tuple[float, int]:
+    with ThreadPeak() as peak:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda i: call_llm("s", f"답변 {i}", endpoint, "coding_feedback"), range(n)))
+        elapsed = time.perf_counter() - started
+    return elapsed, peak.peak
+
+
+def run_async(endpoint: str, n: int) -> Tuple[float, int]:
+    async def main():
+        await asyncio.gather(*(acall_llm("s", f"답변 {i}", endpoint, "coding_feedback") for i in range(n)))
+
+    with ThreadPeak() as peak:
+        started = time.perf_counter()
+        asyncio.run(main())
+        elapsed = time.perf_counter() - started
+    return elapsed, peak.peak
+
+
+def report(name: str, n: int, run: Callable[[], Tuple[float, int]]) -> None:
+    elapsed, threads = run()
+    print(f"{name:<20} {elapsed:7.2f} s | {n / elapsed:7.1f} 채점/s | 최대 스레드 {threads}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--token-ms", type=float, default=20.0, help="대역 서버 출력 토큰당 지연(ms)")
+    parser.add_argument("--completion-tokens", type=int, default=48)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "stub_llm_server.py"), "--port", str(port),
+        "--token-ms", str(args.token_ms), "--completion-tokens", str(args.completion_tokens),
+        "--prompt-ms", "0",
+    ])
+    # 사용량 로그 파일을 건드리지 않도록 기록 비활성화
+    llm_client.record_usage = lambda *a, **k: None
+    try:
+        wait_for_server(f"http://127.0.0.1:{port}/v1/models")
+        endpoint = f"http://127.0.0.1:{port}/v1/chat/completions"
+        n = args.requests
+        per_call = args.token_ms * args.completion_tokens / 1000
+        print(f"동시 채점 {n}건, 채점 1건당 약 {per_call:.1f}초")
+        report(f"thread-pool ({GRADIO_THREAD_LIMIT})", n, lambda: run_threads(endpoint, n, GRADIO_THREAD_LIMIT))
+        report("thread-per-request", n, lambda: run_threads(endpoint, n, n))
+        report("async", n, lambda: run_async(endpoint, n))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
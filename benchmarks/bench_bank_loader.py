@@ -0,0 +1,87 @@
+"""문제 파일 로더 최대 메모리(peak RSS) 벤치마크.
+
+실제 문제 파일을 복제해 N개짜리 합성 문제 은행을 JSON 배열과 JSONL로 만들고,
+기존 방식(json.loads로 파일 전체를 읽은 뒤 변환)과 스트리밍 로더(load_problem_bank)의
+최대 RSS와 소요 시간을 측정합니다. 측정마다 새 프로세스를 띄워 서로 영향을 주지 않게 합니다.
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_bank_loader.py --docs 300000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def peak_rss_mb() -> float:
+    # 리눅스는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode: str, path: str) -> None:
+    """측정용 자식 프로세스: 로드 전후 최대 RSS와 소요 시간을 JSON 한 줄로 출력합니다."""
+    from problem_bank import Problem, load_problem_bank
+
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == "json.loads":
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        problems = [Problem(**item) for item in raw]
+        del raw
+    else:
+        problems = load_problem_bank(path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"count": len(problems), "seconds": elapsed,
+                      "base_mb": before, "peak_mb": peak_rss_mb()}))
+
+
+def measure(mode: str, path: Path) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--child", mode, str(path)],
+                         check=True, capture_output=True, text=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bank", default="data/problems.json")
+    parser.add_argument("--docs", type=int, default=300_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    base = json.loads((ROOT / args.bank).read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory() as tmp:
+        array_path = Path(tmp) / "bench.json"
+        lines_path = Path(tmp) / "bench.jsonl"
+        with array_path.open("w", encoding="utf-8") as fa, lines_path.open("w", encoding="utf-8") as fl:
+            fa.write("[\n")
+            for i in range(args.docs):
+                record = json.dumps(dict(base[i % len(base)], pid=f"{base[i % len(base)]['pid']}_{i}"),
+                                    ensure_ascii=False)
+                fa.write(("," if i else "") + record + "\n")
+                fl.write(record + "\n")
+            fa.write("]\n")
+        size_mb = array_path.stat().st_size / 1024 / 1024
+        print(f"문제 {args.docs:,}개, 파일 {size_mb:.1f} MB")
+
+        for mode, path in (("json.loads", array_path), ("stream", array_path), ("stream", lines_path)):
+            m = measure(mode, path)
+            print(f"{mode:>10} {path.suffix:<6} | {m['seconds']:.2f} s | "
+                  f"최대 RSS {m['peak_mb']:.0f} MB (로드 중 증가 {m['peak_mb'] - m['base_mb']:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""오답노트 병렬 파싱 벤치마크.
+
+여러 학생의 기록을 모은 것 같은 합성 오답노트 파일(JSON Lines, 일부 손상 줄 포함)을 만들고
+단일 프로세스 파싱과 프로세스 풀 병렬 파싱(워커 수별)의 소요 시간과 속도 향상을 비교합니다.
+워커 풀을 띄우는 비용은 제외하고, 결과가 단일 프로세스와 같은지도 확인합니다.
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_notes_parse.py --mb 64
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wrong_notes import parse_note_file_parallel, parse_note_text, safe_read_file  # noqa: E402
+
+
+def write_notes(path: Path, target_bytes: int) -> int:
+    rng = random.Random(0)
+    count = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write("# 오답노트 기록\n")
+        while f.tell() < target_bytes:
+            record = {
+                "pid": f"p{rng.randrange(700)}", "title": f"문제 {count % 97}", "difficulty": "Lv1 기초",
+                "score": rng.choice([0, 40, 60, 85]), "status": "재도전",
+                "submitted": "df.filter(col('age') > 30)\n" * rng.randint(1, 20),
+                "feedback": "### 판정\n재도전\n" + "설명 " * rng.randint(50, 400),
+                "improvement": "", "reasoning": "", "question": "문제 본문", "code": "",
+                "kind": "Python.Pyspark", "timestamp": f"2026-01-01 10:{count % 60:02d} (목)",
+                "rechallenge_hint": "힌트", "nickname": f"학생{count % 40}", "source_file": "problems.json",
+            }
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            if count % 1000 == 0:
+                f.write('{"pid": "broken", \x00 손상된 줄\n')
+            count += 1
+    return count
+
+
+def timed(fn):
+    started = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):  # 손상 줄 경고는 출력하지 않음
+        result = fn()
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=64)
+    parser.add_argument("--workers", type=int, nargs="*", help="측정할 워커 수 (기본: 1, 2, 4, ... 코어 수)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers_list = args.workers or sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < cores], cores})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wrong_notes.md"
+        count = write_notes(path, int(args.mb * 1024 * 1024))
+        print(f"기록 {count:,}개, 파일 {path.stat().st_size / 1024 / 1024:.0f} MB, 코어 {cores}개")
+
+        baseline, serial_s = timed(lambda: parse_note_text(safe_read_file(path)))
+        print(f"단일 프로세스 | {serial_s:.2f} s")
+
+        for workers in workers_list:
+            # 풀 생성/워커 import 비용 제외: 실제 조각을 한 번 파싱해 모든 워커가 뜨고 일을 받게 함
+            parse_note_file_parallel(path, workers)
+            result, parallel_s = timed(lambda: parse_note_file_parallel(path, workers))
+            same = "일치" if result == baseline else "불일치"
+            print(f"워커 {workers:>3}개     | {parallel_s:.2f} s | 속도 향상 x{serial_s / parallel_s:.2f} | 결과 {same}")
+
+
+if __name__ == "__main__":
+    main()
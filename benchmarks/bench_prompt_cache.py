@@ -0,0 +1,100 @@
+"""프롬프트 배치별 첫 토큰 지연(TTFT) 벤치마크.
+
+같은 문제에 서로 다른 답안을 여러 번 제출할 때, 문제별 고정 접두어 배치
+(prompts.build_feedback_prompts)와 cache_prompt 힌트가 TTFT를 얼마나 줄이는지
+로컬 대역 서버(stub_llm_server)로 측정합니다.
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_prompt_cache.py --submissions 6
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import llm_client  # noqa: E402
+from llm_client import get_profile, stream_llm  # noqa: E402
+from problem_bank import Problem, load_problem_bank  # noqa: E402
+from prompts import build_feedback_prompts  # noqa: E402
+from stub_llm_server import StubConfig, start_stub_server  # noqa: E402
+
+PromptBuilder = Callable[[Problem, str], Tuple[str, str, object]]
+
+
+def legacy_feedback_prompts(problem: Problem, code: str):
+    """변경 전 배치: 지시문은 system, 문제와 답안과 요청 항목은 user에 섞여 있음."""
+    system_prompt = (
+        "당신은 주어진 문제에 대한 사용자의 답변을 채점하는 조교입니다. "
+        "문제를 맞췄는지 간결하게 답변하세요. 그 다음 해설은 제공하세요."
+    )
+    user_prompt = (
+        f"(출제자)문제: {problem.body}\n"
+        f"(출제자)스키마: {problem.schema}\n"
+        f"(출제자)샘플데이터: {problem.sample_rows}\n"
+        f"(사용자)답변:```{code}\n```\n"
+        "\n다음 사항을 포함하여 평가에 대한 해설을 Markdown으로 읽기 편하게 제공하세요:\n"
+        "- 1) 코드 분석 및 평가\n- 2) 보완이 필요한 부분\n"
+        "- 3) 답변을 이렇게 쓴 이유/의도 추측 및 약점분석\n- 4) 더 효율적이거나 간결한 방법"
+    )
+    return system_prompt, user_prompt, get_profile("coding_feedback")
+
+
+def measure_ttft(endpoint: str, builder: PromptBuilder, problem: Problem, code: str) -> float:
+    system_prompt, user_prompt, profile = builder(problem, code)
+    started = time.perf_counter()
+    for _ in stream_llm(system_prompt, user_prompt, endpoint, profile):
+        return time.perf_counter() - started
+    return float("nan")
+
+
+def run_scenario(name: str, builder: PromptBuilder, cache_hints: bool,
+                 problems: List[Problem], submissions: int, config: StubConfig) -> None:
+    # 시나리오마다 새 서버를 띄워 캐시 상태를 초기화
+    server = start_stub_server(config)
+    endpoint = f"{server.base_url}/v1/chat/completions"
+    llm_client.PROMPT_CACHE_ENABLED = cache_hints
+
+    first: List[float] = []
+    repeat: List[float] = []
+    try:
+        for problem in problems:
+            for i in range(submissions):
+                code = f"SELECT * FROM t WHERE attempt = {i}  -- 제출 {i}"
+                ttft = measure_ttft(endpoint, builder, problem, code)
+                (first if i == 0 else repeat).append(ttft)
+    finally:
+        server.shutdown()
+
+    print(f"{name:<34} 첫 제출 {statistics.median(first) * 1000:7.1f} ms | "
+          f"반복 제출 {statistics.median(repeat) * 1000:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bank", default="data/problems.json")
+    parser.add_argument("--problems", type=int, default=5)
+    parser.add_argument("--submissions", type=int, default=6)
+    parser.add_argument("--prompt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # 접두어가 충분히 긴 코딩 문제 위주로 선택
+    bank = [p for p in load_problem_bank(args.bank) if p.problem_type == "코딩"]
+    problems = sorted(bank, key=lambda p: len(p.body) + len(p.schema), reverse=True)[: args.problems]
+    config = StubConfig(prompt_ms=args.prompt_ms, token_ms=1.0, completion_tokens=8)
+    # 사용량 로그 파일을 건드리지 않도록 기록 비활성화
+    llm_client.record_usage = lambda *a, **k: None
+
+    print(f"문제 {len(problems)}개 x 제출 {args.submissions}회, 프롬프트 토큰당 {args.prompt_ms} ms (TTFT 중앙값)")
+    run_scenario("기존 배치, 캐시 힌트 없음", legacy_feedback_prompts, False, problems, args.submissions, config)
+    run_scenario("기존 배치 + cache_prompt", legacy_feedback_prompts, True, problems, args.submissions, config)
+    run_scenario("문제별 고정 접두어 + cache_prompt", build_feedback_prompts, True, problems, args.submissions, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""전문 검색 인덱스(search_index) 질의 지연 벤치마크.
+
+실제 문제 파일을 복제/변형해 N개짜리 합성 문제 은행을 만들고
+인덱스 생성, 저장/불러오기, 질의 지연(p50/p95)을 측정합니다.
+
+사용법 (저장소 루트에서):
+    python benchmarks/bench_search.py --docs 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from problem_bank import load_problem_bank  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+
+QUERIES = ["문자열", "데이터프레임 필터", "groupby", "조인", "select where", "결측치 처리",
+           "리스트 컴프리헨션", "윈도우 함수", "np array", "정렬"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bank", default="data/problems.json")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base = load_problem_bank(args.bank)
+    rng = random.Random(0)
+    problems = [
+        replace(p, pid=f"{p.pid}_{i}", body=f"{p.body} {rng.choice(base).title}")
+        for i, p in enumerate(base[j % len(base)] for j in range(args.docs))
+    ]
+
+    started = time.perf_counter()
+    index = SearchIndex.build(problems, digest="bench")
+    build_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.search.npz"
+        started = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - started
+        started = time.perf_counter()
+        index = SearchIndex.load(path, problems, "bench")
+        load_s = time.perf_counter() - started
+        size_mb = path.stat().st_size / 1024 / 1024
+
+    predicate = lambda p: p.problem_type == "코딩"  # noqa: E731
+    latencies = []
+    for _ in range(args.repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            index.search(query, predicate, limit=20)
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+
+    print(f"문제 {len(problems):,}개, 어휘 {len(index.vocab):,}개, posting {len(index.doc_ids):,}개")
+    print(f"생성 {build_s:.1f} s | 저장 {save_s:.2f} s | 불러오기 {load_s:.2f} s | 파일 {size_mb:.1f} MB")
+    print(f"질의 지연 p50 {statistics.median(latencies):.2f} ms | "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms | 최대 {latencies[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""LM Studio / llama.cpp 서버를 흉내 내는 로컬 대역(stand-in) 서버입니다.
+
+실제 모델 없이 벤치마크와 수동 테스트를 할 수 있도록 OpenAI 호환 API의
+일부를 표준 라이브러리만으로 구현합니다.
+
+- GET  /v1/models
+- POST /v1/chat/completions (stream=True/False, usage 포함)
+- POST /v1/embeddings (글자 2-gram 해싱으로 만든 결정적 벡터)
+
+지연 모델:
+- 프롬프트 처리: 캐시되지 않은 프롬프트 토큰마다 --prompt-ms
+- 생성: 출력 토큰마다 --token-ms
+- cache_prompt=True인 요청은 최근 슬롯의 프롬프트와 가장 긴 공통 접두어만큼
+  처리를 건너뜁니다 (llama.cpp의 프롬프트 캐시와 같은 방식).
+
+사용법:
+    python benchmarks/stub_llm_server.py --port 1234
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+CHARS_PER_TOKEN = 2  # 한글 위주 텍스트의 대략적인 토큰 환산
+STUB_MODEL_ID = "stub-model"
+STUB_EMBEDDING_DIM = 64
+STUB_REPLY = (
+    "정답\n조건을 올바르게 처리했습니다.\n\n"
+    "### 1) 코드 분석 및 평가\n요구사항을 충족합니다. "
+    "### 2) 보완이 필요한 부분\n예외 상황을 더 고려해 보세요. "
+)
+
+
+@dataclass
+class StubConfig:
+    prompt_ms: float = 1.0
+    token_ms: float = 10.0
+    completion_tokens: int = 48
+    cache_slots: int = 4
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def render_chat(messages: List[Dict]) -> str:
+    """메시지를 단순한 채팅 템플릿 문자열로 펼칩니다."""
+    return "".join(f"<|{m.get('role', 'user')}|>{m.get('content', '')}<|end|>" for m in messages)
+
+
+def common_prefix_len(a: str, b: str) -> int:
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def stub_embedding(text: str, dim: int = STUB_EMBEDDING_DIM) -> List[float]:
+    """글자 2-gram을 차원에 해싱한 벡터. 겹치는 글자가 많은 텍스트일수록 코사인 유사도가 높습니다."""
+    vector = [0.0] * dim
+    for i in range(max(1, len(text) - 1)):
+        vector[zlib.crc32(text[i:i + 2].encode("utf-8")) % dim] += 1.0
+    return vector
+
+
+class PromptCache:
+    """최근 프롬프트 몇 개를 보관하고 가장 긴 공통 접두어를 찾습니다."""
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._prompts: List[str] = []
+        self._lock = threading.Lock()
+
+    def lookup_and_store(self, prompt: str, use_cache: bool) -> int:
+        with self._lock:
+            cached = max((common_prefix_len(prompt, p) for p in self._prompts), default=0) if use_cache else 0
+            self._prompts.append(prompt)
+            del self._prompts[:-self.slots]
+        return cached
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "StubLLM/0.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler 시그니처
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, obj: Dict, status: int = 200) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json({"object": "list", "data": [{"id": STUB_MODEL_ID, "object": "model"}]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path == "/v1/chat/completions":
+            self._chat(self._read_json())
+        elif path == "/v1/embeddings":
+            self._embeddings(self._read_json())
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _prefill(self, payload: Dict) -> Tuple[int, int]:
+        """프롬프트 처리 지연을 흉내 내고 (prompt_tokens, cached_tokens)를 반환합니다."""
+        config: StubConfig = self.server.config
+        prompt = render_chat(payload.get("messages", []))
+        cached_chars = self.server.cache.lookup_and_store(prompt, bool(payload.get("cache_prompt")))
+        prompt_tokens = count_tokens(prompt)
+        cached_tokens = min(prompt_tokens, cached_chars // CHARS_PER_TOKEN)
+        time.sleep((prompt_tokens - cached_tokens) * config.prompt_ms / 1000)
+        return prompt_tokens, cached_tokens
+
+    def _reply_tokens(self, payload: Dict) -> List[str]:
+        config: StubConfig = self.server.config
+        n = min(int(payload.get("max_tokens") or config.completion_tokens), config.completion_tokens)
+        text = (STUB_REPLY * (1 + n * CHARS_PER_TOKEN // len(STUB_REPLY)))[: n * CHARS_PER_TOKEN]
+        return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+    def _embeddings(self, payload: Dict) -> None:
+        config: StubConfig = self.server.config
+        texts = payload.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        prompt_tokens = sum(count_tokens(t) for t in texts)
+        time.sleep(prompt_tokens * config.prompt_ms / 1000)
+        self._send_json({
+            "object": "list",
+            "model": payload.get("model", STUB_MODEL_ID),
+            "data": [{"object": "embedding", "index": i, "embedding": stub_embedding(t)}
+                     for i, t in enumerate(texts)],
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        })
+
+    def _chat(self, payload: Dict) -> None:
+        config: StubConfig = self.server.config
+        prompt_tokens, cached_tokens = self._prefill(payload)
+        tokens = self._reply_tokens(payload)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+        }
+        timings = {"prompt_n": prompt_tokens - cached_tokens, "cache_n": cached_tokens}
+
+        if not payload.get("stream"):
+            time.sleep(len(tokens) * config.token_ms / 1000)
+            self._send_json({
+                "object": "chat.completion",
+                "model": payload.get("model", STUB_MODEL_ID),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+                "timings": timings,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            for token in tokens:
+                chunk = {"object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(config.token_ms / 1000)
+            final = {"object": "chat.completion.chunk", "choices": [], "usage": usage, "timings": timings}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 동시 접속 벤치마크에서 연결이 거부되지 않도록 listen 백로그를 넉넉하게
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig, verbose: bool = False):
+        super().__init__(address, StubHandler)
+        self.config = config
+        self.verbose = verbose
+        self.cache = PromptCache(config.cache_slots)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(config: StubConfig | None = None, port: int = 0) -> StubLLMServer:
+    """대역 서버를 백그라운드 스레드에서 시작합니다. port=0이면 빈 포트를 사용합니다."""
+    server = StubLLMServer(("127.0.0.1", port), config or StubConfig())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 대역 LLM 서버")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--prompt-ms", type=float, default=1.0, help="캐시되지 않은 프롬프트 토큰당 지연(ms)")
+    parser.add_argument("--token-ms", type=float, default=10.0, help="출력 토큰당 지연(ms)")
+    parser.add_argument("--completion-tokens", type=int, default=48)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = StubConfig(prompt_ms=args.prompt_ms, token_ms=args.token_ms,
+                        completion_tokens=args.completion_tokens)
+    server = StubLLMServer(("127.0.0.1", args.port), config, verbose=args.verbose)
+    print(f"stub LLM server on {server.base_url}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# 내용 주소 기반 압축 텍스트 저장소
+# - 텍스트의 sha256을 키로 data/blobs/<앞 2자리>/<나머지>.z 에 zlib 압축해 한 번만 저장합니다.
+#   같은 피드백/코드가 여러 기록에 나와도 파일은 하나입니다.
+# - 파일은 임시 파일에 쓴 뒤 교체하므로 중간에 끊겨도 깨진 blob이 남지 않습니다.
+# - 읽은 blob은 BLOB_CACHE_ITEMS개까지 메모리에 둡니다.
+BLOB_DIR = Path("data/blobs")
+BLOB_COMPRESS_LEVEL = 6
+BLOB_CACHE_ITEMS = int(os.getenv("BLOB_CACHE_ITEMS", "256"))
+
+
+def blob_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """sha256으로 주소를 매기는 zlib 압축 텍스트 저장소입니다."""
+
+    def __init__(self, root: Path | str = BLOB_DIR, cache_items: int = BLOB_CACHE_ITEMS):
+        self.root = Path(root)
+        self.cache_items = cache_items
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest[2:]}.z"
+
+    def put(self, text: str) -> str:
+        """텍스트를 저장하고 digest를 반환합니다. 이미 있으면 쓰지 않습니다."""
+        digest = blob_digest(text)
+        path = self.path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(zlib.compress(text.encode("utf-8"), BLOB_COMPRESS_LEVEL))
+            tmp.replace(path)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """digest의 텍스트를 반환합니다. blob 파일이 없거나 손상되었으면 None."""
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return self._cache[digest]
+        try:
+            text = zlib.decompress(self.path_for(digest).read_bytes()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError):
+            return None
+        with self._lock:
+            self._cache[digest] = text
+            while len(self._cache) > self.cache_items:
+                self._cache.popitem(last=False)
+        return text
+
+
+BLOB_STORE = BlobStore()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+# 드롭다운 선택지 캐시
+# - 오답노트/즐겨찾기 선택지는 저장할 때만 바뀌므로 generation별로 한 번만 만듭니다.
+#   save_to_wrong_notes / save_favorites가 bump()로 generation을 올리면 다음 요청에서 다시 만듭니다.
+# - 다른 프로세스(오답노트 압축 CLI 등)가 파일을 바꾼 경우도 놓치지 않도록
+#   감시 파일의 (mtime, 크기)가 달라지면 generation을 함께 올립니다.
+# - UI는 세션별로 마지막으로 받은 generation을 기억해 두고, 같으면 선택지를 다시 보내지 않습니다.
+CHOICE_CACHE_KEYS = 256  # 키별 선택지(예: 문제별 시도 목록)를 기억할 최대 개수
+
+T = TypeVar("T")
+
+
+def _stat_signature(paths: Sequence[Path]) -> Tuple[int, ...]:
+    signature: List[int] = []
+    for path in paths:
+        try:
+            stat = path.stat()
+            signature += [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            signature += [-1, -1]
+    return tuple(signature)
+
+
+class ChoiceCache:
+    """generation이 바뀔 때까지 선택지((labels, values) 또는 PickerIndex)를 키별로 기억합니다."""
+
+    def __init__(self, watch: Callable[[], Sequence[Path]] = lambda: (),
+                 max_keys: int = CHOICE_CACHE_KEYS):
+        self._watch = watch
+        self.max_keys = max_keys
+        self._generation = 0
+        self._signature: Optional[Tuple[int, ...]] = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """현재 generation. 감시 파일이 바뀌었으면 먼저 올립니다."""
+        signature = _stat_signature(self._watch())
+        with self._lock:
+            if signature != self._signature:
+                if self._signature is not None:
+                    self._bump_locked()
+                self._signature = signature
+            return self._generation
+
+    def bump(self) -> int:
+        """저장 직후 호출합니다. 기억한 선택지를 모두 버리고 새 generation을 반환합니다."""
+        with self._lock:
+            self._bump_locked()
+            # 방금 쓴 파일의 상태를 기준으로 삼아 같은 변경으로 한 번 더 올리지 않습니다
+            self._signature = None
+            return self._generation
+
+    def _bump_locked(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def get(self, key: Hashable, build: Callable[[], T]) -> T:
+        """key의 선택지를 반환합니다. 현재 generation에서 처음이면 build()로 만듭니다."""
+        generation = self.generation
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        choices = build()
+        with self._lock:
+            # 만드는 사이에 저장이 있었으면 기억하지 않습니다 (다음 요청에서 다시 만듦)
+            if generation == self._generation:
+                self._entries[key] = choices
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+        return choices
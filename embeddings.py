@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import requests
+
+from llm_client import EMBEDDING_ENDPOINT, EMBEDDING_MODEL, embed_texts
+from problem_bank import Problem, get_problem_bank
+from search_index import FacetCodes, file_digest
+
+# 비슷한 문제 추천용 임베딩 행렬
+# - 문제 파일마다 data/<파일명(확장자 포함)>.embeddings.npz에 (문제 수 x 차원) float32 행렬을 저장합니다.
+#   행은 L2 정규화되어 있어 코사인 유사도가 내적 한 번으로 계산됩니다.
+# - 파일 전체 해시와 모델이 같으면 그대로 불러오고, 다르면 문제별 내용 해시를 비교해
+#   새로 추가되었거나 바뀐 문제만 다시 임베딩합니다.
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_VERSION = 1
+
+
+def embedding_text(problem: Problem) -> str:
+    """임베딩에 넣을 문제 텍스트입니다. 검색 인덱스와 같은 필드를 씁니다."""
+    return "\n".join(part for part in (problem.title, problem.body, problem.hint, problem.schema) if part)
+
+
+def content_hash(problem: Problem, model: str) -> str:
+    return hashlib.sha1(f"{model}\0{embedding_text(problem)}".encode("utf-8")).hexdigest()
+
+
+def embeddings_path_for(bank_path: Path) -> Path:
+    """문제 파일 옆에 저장되는 임베딩 경로입니다. (예: data/problems.json → data/problems.json.embeddings.npz)
+
+    확장자까지 넣어 problems.json과 problems.jsonl이 서로의 임베딩을 덮어쓰지 않게 합니다.
+    """
+    return bank_path.with_name(f"{bank_path.name}.embeddings.npz")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+@dataclass
+class SimilarHit:
+    problem: Problem
+    similarity: float
+
+
+class EmbeddingIndex:
+    """문제 파일 하나의 정규화된 임베딩 행렬입니다."""
+
+    def __init__(self, problems: List[Problem], matrix: np.ndarray, hashes: List[str],
+                 model: str, digest: str = ""):
+        self.problems = problems
+        self.matrix = matrix
+        self.hashes = hashes
+        self.model = model
+        self.digest = digest
+        self.facets = FacetCodes.build(problems)
+        self._rows: Dict[str, int] = {p.pid: i for i, p in enumerate(problems)}
+
+    def save(self, path: Path) -> None:
+        meta = {
+            "version": EMBEDDING_VERSION,
+            "model": self.model,
+            "digest": self.digest,
+            "pids": [p.pid for p in self.problems],
+            "hashes": self.hashes,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), matrix=self.matrix)
+        tmp.replace(path)
+
+    @staticmethod
+    def load_raw(path: Path) -> Optional[Tuple[Dict, np.ndarray]]:
+        """저장된 (meta, matrix)를 읽습니다. 없거나 손상되었으면 None을 반환합니다."""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != EMBEDDING_VERSION:
+                    return None
+                return meta, data["matrix"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def similar(self, pid: str, predicate: Optional[Callable[[Problem], bool]] = None,
+                limit: int = 10) -> List[SimilarHit]:
+        """pid 문제와 코사인 유사도가 높은 문제를 필터 안에서 limit개 반환합니다."""
+        row = self._rows.get(pid)
+        if row is None or not len(self.problems):
+            return []
+
+        sims = self.matrix @ self.matrix[row]
+        mask = self.facets.mask(predicate)
+        if mask is not None:
+            sims = np.where(mask, sims, -np.inf)
+        sims[row] = -np.inf
+
+        candidates = np.flatnonzero(np.isfinite(sims))
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-sims[candidates], limit - 1)[:limit]]
+        top = candidates[np.argsort(-sims[candidates], kind="stable")]
+        return [SimilarHit(self.problems[i], float(sims[i])) for i in top.tolist()]
+
+
+def build_embedding_index(problems: List[Problem], digest: str, previous: Optional[Tuple[Dict, np.ndarray]],
+                          embed: Callable[[List[str]], List[List[float]]] = embed_texts,
+                          model: str = EMBEDDING_MODEL,
+                          on_progress: Optional[Callable[[int, int], None]] = None) -> EmbeddingIndex:
+    """이전 행렬에서 내용이 같은 문제의 행을 재사용하고 나머지만 배치로 임베딩합니다."""
+    hashes = [content_hash(p, model) for p in problems]
+    reusable: Dict[str, np.ndarray] = {}
+    if previous is not None:
+        meta, old_matrix = previous
+        if meta.get("model") == model:
+            reusable = {h: old_matrix[i] for i, h in enumerate(meta.get("hashes", []))}
+
+    missing = [i for i, h in enumerate(hashes) if h not in reusable]
+    new_vectors: Dict[int, np.ndarray] = {}
+    for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+        batch = missing[start:start + EMBEDDING_BATCH_SIZE]
+        vectors = embed([embedding_text(problems[i]) for i in batch])
+        for i, vector in zip(batch, vectors):
+            new_vectors[i] = np.asarray(vector, dtype=np.float32)
+        if on_progress:
+            on_progress(min(start + EMBEDDING_BATCH_SIZE, len(missing)), len(missing))
+
+    rows = [reusable[h] if i not in new_vectors else new_vectors[i] for i, h in enumerate(hashes)]
+    dims = {len(r) for r in rows}
+    if len(dims) > 1:
+        raise ValueError(f"임베딩 차원이 섞여 있습니다: {sorted(dims)}")
+    matrix = normalize_rows(np.vstack(rows)) if rows else np.zeros((0, 0), dtype=np.float32)
+    return EmbeddingIndex(problems, matrix, hashes, model, digest)
+
+
+@dataclass
+class BuildStatus:
+    """문제 파일별 임베딩 생성 상태입니다. (UI 표시용)"""
+    done: int = 0
+    total: int = 0
+    running: bool = False
+    error: str = ""
+
+
+_EMBEDDING_CACHE: Dict[str, EmbeddingIndex] = {}
+BUILD_STATUS: Dict[str, BuildStatus] = {}
+_BUILD_LOCK = threading.Lock()
+
+
+def _current_index(filename: str, problems: List[Problem]) -> Optional[EmbeddingIndex]:
+    cached = _EMBEDDING_CACHE.get(filename)
+    if cached is not None and cached.problems is problems and cached.model == EMBEDDING_MODEL:
+        return cached
+    return None
+
+
+def _build(filename: str, problems: List[Problem], status: BuildStatus) -> None:
+    bank_path = Path("data") / filename
+    path = embeddings_path_for(bank_path)
+    try:
+        digest = file_digest(bank_path)
+        previous = EmbeddingIndex.load_raw(path) if path.exists() else None
+        if (previous is not None and previous[0].get("digest") == digest
+                and previous[0].get("model") == EMBEDDING_MODEL
+                and previous[0].get("pids") == [p.pid for p in problems]):
+            meta, matrix = previous
+            index = EmbeddingIndex(problems, matrix, meta["hashes"], EMBEDDING_MODEL, digest)
+        else:
+            def progress(done: int, total: int) -> None:
+                status.done, status.total = done, total
+
+            index = build_embedding_index(problems, digest, previous, on_progress=progress)
+            index.save(path)
+        _EMBEDDING_CACHE[filename] = index
+        status.error = ""
+    except (requests.RequestException, OSError, ValueError, KeyError) as exc:
+        print(f"[경고] 임베딩 생성 실패 ({filename} @ {EMBEDDING_ENDPOINT}): {exc}", file=sys.stderr)
+        status.error = type(exc).__name__
+    finally:
+        status.running = False
+
+
+def get_embedding_index(filename: str, wait: bool = False) -> Optional[EmbeddingIndex]:
+    """문제 파일의 임베딩 인덱스를 반환합니다.
+
+    준비되지 않았으면 백그라운드 생성을 시작하고 None을 반환합니다. (wait=True면 끝날 때까지 기다림)
+    진행 상황은 BUILD_STATUS[filename]에서 확인할 수 있습니다.
+    """
+    problems = get_problem_bank(filename)
+    with _BUILD_LOCK:
+        index = _current_index(filename, problems)
+        if index is not None:
+            return index
+        status = BUILD_STATUS.setdefault(filename, BuildStatus())
+        if not status.running:
+            status.running = True
+            status.done, status.total = 0, 0
+            thread = threading.Thread(target=_build, args=(filename, problems, status),
+                                      name=f"embedding-{filename}", daemon=True)
+            thread.start()
+        else:
+            thread = None
+
+    if wait:
+        if thread is not None:
+            thread.join()
+        else:
+            while status.running:
+                time.sleep(0.1)
+        return _current_index(filename, problems)
+    return None
+
+
+def forget_embedding_index(filename: str) -> None:
+    """삭제된 문제 파일의 임베딩 인덱스를 캐시에서 제거합니다. 생성 중인 상태는 끝날 때까지 둡니다."""
+    with _BUILD_LOCK:
+        _EMBEDDING_CACHE.pop(filename, None)
+        status = BUILD_STATUS.get(filename)
+        if status is not None and not status.running:
+            del BUILD_STATUS[filename]
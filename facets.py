@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from problem_bank import Problem, get_problem_bank, unique_preserve_order
+
+# 필터 드롭다운용 문제 개수 큐브
+# (difficulty, kind, problem_type) 조합별 문제 수를 문제 파일마다 한 번 만들어 두고,
+# 드롭다운 레이블의 개수와 빈 조합 판정은 조합 수(수십 개)만큼만 계산합니다.
+# 문제 파일이 바뀌면 새 문제 목록으로 큐브를 다시 만듭니다. 목록을 읽는 것 자체가 O(n)이라
+# 빠진/바뀐 문제만 골라내는 비교도 O(n)이고, 조합 세기 한 번보다 싸지 않습니다.
+
+Combo = Tuple[str, str, str]
+
+
+def facet_matches(problem_difficulty: str, kind: str, problem_type: str,
+                  difficulty: Optional[str], language: Optional[str],
+                  problem_types: Optional[Sequence[str]]) -> bool:
+    """(difficulty, kind, problem_type) 값이 필터 조건과 일치하는지 확인합니다.
+
+    language 필터 동작:
+    - "전체": 모든 문제 포함
+    - "Python": Python 관련 모두 포함 (kind의 '.' 앞부분 비교)
+    - "Python.Pyspark": Python.Pyspark만 포함
+    """
+    if not language or language == "전체":
+        language_match = True
+    elif '.' not in language:
+        language_match = kind.split('.')[0].lower() == language.lower()
+    else:
+        language_match = kind.lower() == language.lower()
+
+    difficulty_match = (not difficulty or difficulty == "전체") or problem_difficulty == difficulty
+    type_match = not problem_types or problem_type in problem_types
+    return difficulty_match and language_match and type_match
+
+
+def problem_combo(problem: Problem) -> Combo:
+    return (problem.difficulty, problem.kind, problem.problem_type)
+
+
+class FacetCube:
+    """문제 파일 하나의 difficulty x kind x problem_type 개수 큐브입니다. (빈 칸은 저장하지 않음)"""
+
+    def __init__(self, counts: Optional[Counter] = None):
+        self.counts: Counter = counts if counts is not None else Counter()
+
+    @classmethod
+    def build(cls, problems: Iterable[Problem]) -> "FacetCube":
+        return cls(Counter(problem_combo(p) for p in problems))
+
+    @property
+    def difficulties(self) -> List[str]:
+        return unique_preserve_order([combo[0] for combo in self.counts])
+
+    @property
+    def kinds(self) -> List[str]:
+        return sorted(unique_preserve_order([combo[1] for combo in self.counts]))
+
+    def count(self, difficulty: Optional[str], language: Optional[str],
+              problem_types: Optional[Sequence[str]]) -> int:
+        return sum(n for (d, k, t), n in self.counts.items()
+                   if facet_matches(d, k, t, difficulty, language, problem_types))
+
+
+def _labeled(options: Sequence[str], counts: Sequence[int], selected: Optional[str]) -> List[Tuple[str, str]]:
+    """'값 (개수)' 레이블을 붙이고, 현재 선택값이 아닌 빈 항목은 빼서 고를 수 없게 합니다."""
+    return [(f"{option} ({n})", option) for option, n in zip(options, counts) if n or option == selected]
+
+
+def difficulty_choices(cube: FacetCube, options: Sequence[str], difficulty: Optional[str],
+                       language: Optional[str], problem_types: Optional[Sequence[str]]) -> List[Tuple[str, str]]:
+    counts = [cube.count(option, language, problem_types) for option in options]
+    return _labeled(options, counts, difficulty)
+
+
+def language_choices(cube: FacetCube, options: Sequence[str], difficulty: Optional[str],
+                     language: Optional[str], problem_types: Optional[Sequence[str]]) -> List[Tuple[str, str]]:
+    counts = [cube.count(difficulty, option, problem_types) for option in options]
+    return _labeled(options, counts, language)
+
+
+def problem_type_choices(cube: FacetCube, options: Sequence[str], difficulty: Optional[str],
+                         language: Optional[str]) -> List[Tuple[str, str]]:
+    # 체크박스는 여러 개를 고르므로 빈 항목도 남겨 두고 개수만 표시합니다
+    return [(f"{option} ({cube.count(difficulty, language, [option])})", option) for option in options]
+
+
+# 파일별 큐브 캐시: filename -> (큐브를 만든 문제 리스트, 큐브)
+_CUBE_CACHE: Dict[str, Tuple[List[Problem], FacetCube]] = {}
+_CUBE_LOCK = threading.Lock()
+
+
+def get_facet_cube(filename: str) -> FacetCube:
+    """문제 파일의 개수 큐브를 반환합니다. 파일이 바뀌었으면(문제 목록 객체가 다르면) 다시 만듭니다."""
+    problems = get_problem_bank(filename)
+    with _CUBE_LOCK:
+        cached = _CUBE_CACHE.get(filename)
+        if cached is not None and cached[0] is problems:
+            return cached[1]
+        cube = FacetCube.build(problems)
+        _CUBE_CACHE[filename] = (problems, cube)
+        return cube
+
+
+def forget_facet_cube(filename: str) -> None:
+    """삭제된 문제 파일의 개수 큐브를 캐시에서 제거합니다."""
+    with _CUBE_LOCK:
+        _CUBE_CACHE.pop(filename, None)
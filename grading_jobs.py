@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+# 채점 작업 저장소
+# - 제출마다 채점을 서버 쪽 작업(asyncio task)으로 띄우고, 이벤트 핸들러는 작업을 따라가며 화면만 갱신합니다.
+#   브라우저 탭이 닫히거나 웹소켓이 끊겨 핸들러가 취소되어도 작업은 끝까지 실행됩니다.
+# - 작업 ID는 브라우저(BrowserState)에 저장되어, 새로고침 후 실행 중인 작업에 다시 붙거나
+#   끝난 작업의 피드백을 모델을 다시 부르지 않고 보여줍니다.
+# - 작업 상태는 data/grading_jobs/<작업 ID>.json에 저장합니다. 스트리밍 중에는
+#   GRADING_JOB_FLUSH_SECONDS마다만 쓰고, 서버가 다시 시작될 때 실행 중이던 작업은 중단됨으로 표시합니다.
+# - 끝난 지 GRADING_JOB_TTL_SECONDS가 지난 작업은 새 작업을 만들 때 정리합니다.
+GRADING_JOB_DIR = Path("data/grading_jobs")
+GRADING_JOB_TTL_SECONDS = int(os.getenv("GRADING_JOB_TTL_SECONDS", "3600"))
+GRADING_JOB_FLUSH_SECONDS = 2.0
+# 브라우저에 저장하는 작업 ID의 암호화 키. 고정해 두어야 서버를 다시 시작해도 작업 ID를 읽을 수 있습니다.
+GRADING_JOB_SECRET = os.getenv("GRADING_JOB_SECRET", "codedojo-grading-jobs")
+
+QUEUED, RUNNING, DONE, ERROR, INTERRUPTED = "queued", "running", "done", "error", "interrupted"
+FINISHED_STATUSES = (DONE, ERROR, INTERRUPTED)
+
+
+def code_digest(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class GradingJob:
+    """제출 한 번의 채점 작업입니다.
+
+    Attributes:
+        job_id: 작업 ID (브라우저에 저장)
+        source_file / pid: 채점한 문제
+        code: 제출 코드
+        mode: 캐스케이드 모드 (single / cascade / verdict_only)
+        review: 복습으로 불러온 문제의 제출인지 여부
+        status: queued / running / done / error / interrupted
+        phase: 화면에 표시할 진행 단계 (예: "빠른 채점 중")
+        verdict / detail: 빠른 판정과 상세 해설 (스트리밍 중에는 지금까지 받은 부분)
+        note: 완료 후 피드백 아래에 덧붙일 안내 (복습 일정 등)
+        error: 실패 사유
+        created / updated: 만든 시각, 마지막 갱신 시각 (epoch 초)
+    """
+    job_id: str
+    source_file: str
+    pid: str
+    code: str
+    mode: str
+    review: bool = False
+    status: str = QUEUED
+    phase: str = ""
+    verdict: str = ""
+    detail: str = ""
+    note: str = ""
+    error: str = ""
+    created: float = 0.0
+    updated: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def digest(self) -> str:
+        return code_digest(self.code)
+
+
+_JOB_FIELDS = {f.name for f in fields(GradingJob)}
+
+JobRunner = Callable[[GradingJob, Callable[[], None]], Awaitable[None]]
+
+
+class GradingJobStore:
+    """채점 작업을 만들고 실행하며, 작업 변경을 따라가는 구독자에게 알립니다."""
+
+    def __init__(self, root: Path | str = GRADING_JOB_DIR, ttl_seconds: int = GRADING_JOB_TTL_SECONDS):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, GradingJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._flushed: Dict[str, Tuple[float, str]] = {}  # job_id -> (마지막으로 쓴 시각, 그때의 status)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Path:
+        return self.root / f"{job_id}.json"
+
+    # ----- 저장/불러오기 -----
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.root.exists():
+                return
+            for path in self.root.glob("*.json"):
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                    job = GradingJob(**{k: v for k, v in data.items() if k in _JOB_FIELDS})
+                except (OSError, ValueError, TypeError) as exc:
+                    print(f"[경고] 채점 작업 파일을 읽지 못했습니다 ({path.name}): {exc}", file=sys.stderr)
+                    continue
+                if not job.finished:
+                    # 이전 프로세스에서 실행 중이던 작업은 이어서 실행할 수 없습니다
+                    job.status = INTERRUPTED
+                    self._write(job)
+                self._jobs[job.job_id] = job
+
+    def _write(self, job: GradingJob) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job.job_id)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(asdict(job), ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        self._flushed[job.job_id] = (time.monotonic(), job.status)
+
+    # ----- 조회 -----
+    def get(self, job_id: Optional[str]) -> Optional[GradingJob]:
+        self._ensure_loaded()
+        return self._jobs.get(job_id) if job_id else None
+
+    def find(self, source_file: str, pid: str, code: str, mode: str) -> Optional[GradingJob]:
+        """같은 문제/코드/모드로 실행 중이거나 끝난 작업을 찾습니다. (다시 제출해도 모델을 다시 부르지 않음)"""
+        self._ensure_loaded()
+        digest = code_digest(code)
+        for job in reversed(list(self._jobs.values())):
+            if (job.source_file == source_file and job.pid == pid and job.mode == mode
+                    and job.status in (QUEUED, RUNNING, DONE) and job.digest == digest):
+                return job
+        return None
+
+    # ----- 실행 -----
+    def start(self, source_file: str, pid: str, code: str, mode: str, review: bool,
+              runner: JobRunner) -> GradingJob:
+        """새 작업을 만들고 현재 이벤트 루프에서 runner(job, publish)를 실행합니다."""
+        self._ensure_loaded()
+        self.collect()
+        now = time.time()
+        job = GradingJob(job_id=uuid.uuid4().hex, source_file=source_file, pid=pid, code=code,
+                         mode=mode, review=review, created=now, updated=now)
+        self._jobs[job.job_id] = job
+        self._write(job)
+        # 핸들러가 취소되어도 작업이 끝까지 실행되도록 task 참조를 저장소가 들고 있습니다
+        self._tasks[job.job_id] = asyncio.get_running_loop().create_task(self._run(job, runner))
+        return job
+
+    async def _run(self, job: GradingJob, runner: JobRunner) -> None:
+        try:
+            await runner(job, lambda: self.publish(job))
+            job.status = DONE
+        except asyncio.CancelledError:
+            job.status = INTERRUPTED
+            raise
+        except Exception as exc:  # 모델 오류 등: 작업에 기록하고 화면에 표시
+            job.status = ERROR
+            job.error = str(exc) or type(exc).__name__
+        finally:
+            self._tasks.pop(job.job_id, None)
+            self.publish(job)
+
+    def publish(self, job: GradingJob) -> None:
+        """작업 변경을 구독자에게 알리고, 상태가 바뀌었거나 일정 시간이 지났으면 파일에 씁니다."""
+        job.updated = time.time()
+        flushed_at, flushed_status = self._flushed.get(job.job_id, (0.0, ""))
+        if (job.status != flushed_status
+                or time.monotonic() - flushed_at >= GRADING_JOB_FLUSH_SECONDS):
+            self._write(job)
+        event = self._events.pop(job.job_id, None)
+        if event is not None:
+            event.set()
+
+    async def follow(self, job_id: str) -> AsyncIterator[GradingJob]:
+        """작업이 바뀔 때마다 yield합니다. 작업이 끝나면 마지막 상태를 yield하고 멈춥니다."""
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return
+            event = self._events.setdefault(job_id, asyncio.Event())
+            yield job
+            if job.finished:
+                return
+            await event.wait()
+
+    # ----- 정리 -----
+    def collect(self, now: Optional[float] = None) -> int:
+        """끝난 지 TTL이 지난 작업을 메모리와 디스크에서 지웁니다. 지운 개수를 반환합니다."""
+        self._ensure_loaded()
+        now = time.time() if now is None else now
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.updated > self.ttl_seconds]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._events.pop(job_id, None)
+            self._flushed.pop(job_id, None)
+            self._path(job_id).unlink(missing_ok=True)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        self._ensure_loaded()
+        counts = {status: 0 for status in (QUEUED, RUNNING, *FINISHED_STATUSES)}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+
+GRADING_JOBS = GradingJobStore()
@@ -0,0 +1,281 @@
+"""학습 통계 (채점 결과 누적 집계).
+
+(source_file, kind, difficulty, problem_type) 조합마다 채점 수, 오답 수, 마지막 채점 시각,
+연속 기록을 numpy 배열 칸 하나씩에 누적합니다. 채점 작업이 판정(정답/오답)과 함께 끝날 때
+해당 칸만 갱신하고, 대시보드는 조합 수만큼만 계산하므로 기록이 아무리 쌓여도 그리는 비용이 같습니다.
+
+- 오답노트는 사용자가 골라 저장한 오답만 담고(점수 0) 정답은 남지 않으므로 집계에 쓰지 않습니다.
+  모든 채점이 판정을 받으므로(single 모드는 해설 뒤에 큰 모델이 판정) 제출마다 한 번씩 셉니다.
+  판정 불가(형식을 따르지 않은 응답, 연결 오류)만 세지 않습니다.
+- 연속 기록(streak): 같은 결과가 이어진 횟수입니다. 정답이 이어지면 양수, 오답이 이어지면 음수.
+- 판정마다 data/stats/learner_results.jsonl에 한 줄을 덧붙이고, 집계는 data/stats/learner_stats.npz에 저장합니다.
+  (칸 수가 작으므로 저장할 때마다 통째로 씀)
+- 집계 파일이 없거나 손상되었으면 판정 기록 전체로 다시 만듭니다. (rebuild)
+
+사용법 (저장소 루트에서):
+    python learner_stats.py show
+    python learner_stats.py rebuild
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from problem_bank import find_problem
+
+STATS_PATH = Path("data/stats/learner_stats.npz")
+RESULTS_PATH = Path("data/stats/learner_results.jsonl")
+# data 바로 아래는 문제 파일 자리라 하위 폴더로 옮김
+for _legacy, _path in ((Path("data/learner_results.jsonl"), RESULTS_PATH),
+                       (Path("data/learner_stats.npz"), STATS_PATH)):
+    if _legacy.exists() and not _path.exists():
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        _legacy.replace(_path)
+STATS_VERSION = 2  # v1은 오답노트(항상 점수 0)로 집계해 통과율이 늘 0%였음
+DASHBOARD_TOP_COMBOS = 15  # 대시보드 조합별 표에 보일 최대 행 수 (실패 많은 순)
+UNKNOWN_TYPE = "(알 수 없음)"  # problem_type이 비어 있는 문제
+
+StatKey = Tuple[str, str, str, str]  # (source_file, kind, difficulty, problem_type)
+KEY_FIELDS = ("source_file", "kind", "difficulty", "problem_type")
+
+
+def result_stat_key(source_file: str, pid: str) -> Optional[StatKey]:
+    """문제의 집계 칸 키입니다. 문제 은행에서 사라진 문제면 None."""
+    problem = find_problem(source_file, pid)
+    if problem is None:
+        return None
+    return (source_file, problem.kind, problem.difficulty, problem.problem_type or UNKNOWN_TYPE)
+
+
+class LearnerStats:
+    """조합별 누적 집계입니다. 칸 번호는 keys의 순서이며 배열은 두 배씩 늘립니다."""
+
+    def __init__(self, path: Path | str = STATS_PATH, results_path: Path | str = RESULTS_PATH):
+        self.path = Path(path)
+        self.results_path = Path(results_path)
+        self.keys: List[StatKey] = []
+        self._slots: Dict[StatKey, int] = {}
+        self.attempts = np.zeros(0, dtype=np.int64)
+        self.fails = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.streak = np.zeros(0, dtype=np.int32)
+        self.best_streak = np.zeros(0, dtype=np.int32)  # 가장 길었던 연속 통과
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    # ----- 칸 관리 -----
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return self.attempts, self.fails, self.last_seen, self.streak, self.best_streak
+
+    def _reset(self) -> None:
+        self.keys = []
+        self._slots = {}
+        self.attempts, self.fails, self.last_seen, self.streak, self.best_streak = (
+            np.zeros(0, dtype=a.dtype) for a in self._arrays())
+
+    def _slot(self, key: StatKey) -> int:
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        slot = len(self.keys)
+        if slot >= len(self.attempts):
+            capacity = max(16, 2 * len(self.attempts))
+            self.attempts, self.fails, self.last_seen, self.streak, self.best_streak = (
+                np.concatenate([a, np.zeros(capacity - len(a), dtype=a.dtype)]) for a in self._arrays())
+        self.keys.append(key)
+        self._slots[key] = slot
+        return slot
+
+    def _add(self, key: StatKey, passed: bool, when: float) -> None:
+        slot = self._slot(key)
+        self.attempts[slot] += 1
+        if passed:
+            self.streak[slot] = max(self.streak[slot], 0) + 1
+            self.best_streak[slot] = max(self.best_streak[slot], self.streak[slot])
+        else:
+            self.fails[slot] += 1
+            self.streak[slot] = min(self.streak[slot], 0) - 1
+        self.last_seen[slot] = max(self.last_seen[slot], when)
+
+    # ----- 저장/불러오기 -----
+    def _ensure_loaded(self) -> None:
+        """처음 호출될 때 저장된 집계를 읽고, 없거나 손상되었으면 판정 기록으로 다시 만듭니다."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self._load():
+            self._rebuild(read_result_rows(self.results_path))
+
+    def _load(self) -> bool:
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != STATS_VERSION:
+                    return False
+                keys = [tuple(k) for k in meta["keys"]]
+                arrays = [data[name] for name in ("attempts", "fails", "last_seen", "streak", "best_streak")]
+        except (OSError, ValueError, KeyError):
+            return False
+        if any(len(a) != len(keys) for a in arrays):
+            return False
+        self.keys = keys
+        self._slots = {key: i for i, key in enumerate(keys)}
+        self.attempts, self.fails, self.last_seen, self.streak, self.best_streak = (
+            a.astype(ref.dtype) for a, ref in zip(arrays, self._arrays()))
+        return True
+
+    def _save(self) -> None:
+        """사용 중인 칸만 npz로 저장합니다. 임시 파일에 쓴 뒤 교체합니다."""
+        n = len(self.keys)
+        meta = {"version": STATS_VERSION, "keys": self.keys}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                     attempts=self.attempts[:n], fails=self.fails[:n], last_seen=self.last_seen[:n],
+                     streak=self.streak[:n], best_streak=self.best_streak[:n])
+        tmp.replace(self.path)
+
+    # ----- 갱신 -----
+    def record_result(self, source_file: str, pid: str, passed: bool,
+                      when: Optional[float] = None) -> Optional[StatKey]:
+        """판정 하나를 판정 기록에 덧붙이고 해당 조합 칸에 더해 저장합니다. 문제가 없으면 None."""
+        key = result_stat_key(source_file, pid)
+        if key is None:
+            return None
+        when = time.time() if when is None else when
+        row = dict(zip(KEY_FIELDS, key), pid=pid, passed=passed, time=when)
+        with self._lock:
+            # 집계를 먼저 불러와야 다시 만들 때 이 판정을 두 번 세지 않습니다
+            self._ensure_loaded()
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.results_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._add(key, passed, when)
+            self._save()
+        return key
+
+    def rebuild(self, rows: Sequence[Dict[str, object]]) -> int:
+        """판정 기록(오래된 순)으로 처음부터 다시 집계하고 저장합니다. 조합 수를 반환합니다."""
+        with self._lock:
+            self._loaded = True
+            self._rebuild(rows)
+            return len(self.keys)
+
+    def _rebuild(self, rows: Sequence[Dict[str, object]]) -> None:
+        self._reset()
+        for row in rows:
+            key = tuple(str(row[name]) for name in KEY_FIELDS)
+            self._add(key, bool(row["passed"]), float(row["time"]))
+        self._save()
+
+    # ----- 조회 -----
+    def totals(self, field: str) -> List[Tuple[str, int, int]]:
+        """KEY_FIELDS 중 하나로 묶은 (값, 시도 수, 실패 수) 목록입니다. 시도 많은 순."""
+        with self._lock:
+            self._ensure_loaded()
+            n = len(self.keys)
+            position = KEY_FIELDS.index(field)
+            values = sorted({key[position] for key in self.keys})
+            code_of = {value: i for i, value in enumerate(values)}
+            codes = np.array([code_of[key[position]] for key in self.keys], dtype=np.int64)
+            attempts = np.bincount(codes, weights=self.attempts[:n], minlength=len(values))
+            fails = np.bincount(codes, weights=self.fails[:n], minlength=len(values))
+        rows = [(value, int(a), int(f)) for value, a, f in zip(values, attempts, fails)]
+        return sorted(rows, key=lambda row: -row[1])
+
+    def combos(self, limit: int = DASHBOARD_TOP_COMBOS) -> List[Tuple[StatKey, int, int, float, int, int]]:
+        """조합별 (key, 시도, 실패, 마지막 시각, 연속, 최고 연속 통과) 목록입니다. 실패 많은 순."""
+        with self._lock:
+            self._ensure_loaded()
+            n = len(self.keys)
+            order = np.lexsort((-self.last_seen[:n], -self.fails[:n]))[:limit]
+            return [(self.keys[i], int(self.attempts[i]), int(self.fails[i]), float(self.last_seen[i]),
+                     int(self.streak[i]), int(self.best_streak[i])) for i in order.tolist()]
+
+
+def read_result_rows(path: Path = RESULTS_PATH) -> List[Dict[str, object]]:
+    """판정 기록을 읽습니다. 중단되며 잘린 줄처럼 읽을 수 없는 줄은 건너뜁니다."""
+    rows: List[Dict[str, object]] = []
+    if not path.exists():
+        return rows
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                if all(name in row for name in (*KEY_FIELDS, "passed", "time")):
+                    rows.append(row)
+            except ValueError:
+                continue
+    return rows
+
+
+LEARNER_STATS = LearnerStats()
+
+
+def rebuild_learner_stats(stats: LearnerStats = LEARNER_STATS) -> int:
+    """판정 기록 전체로 학습 통계를 다시 만듭니다. 조합 수를 반환합니다."""
+    return stats.rebuild(read_result_rows(stats.results_path))
+
+
+def _rate(attempts: int, fails: int) -> str:
+    return f"{(attempts - fails) / attempts * 100:.0f}%" if attempts else "-"
+
+
+def _streak_label(streak: int) -> str:
+    if streak > 0:
+        return f"정답 {streak}연속"
+    if streak < 0:
+        return f"오답 {-streak}연속"
+    return "-"
+
+
+def format_dashboard(stats: LearnerStats = LEARNER_STATS) -> str:
+    """학습 통계 탭의 Markdown입니다. 조합 수만큼만 계산합니다."""
+    by_difficulty = stats.totals("difficulty")
+    if not by_difficulty:
+        return "아직 판정된 채점이 없습니다. 문제를 제출해 정답/오답 판정을 받으면 통계가 쌓입니다."
+
+    attempts = sum(row[1] for row in by_difficulty)
+    fails = sum(row[2] for row in by_difficulty)
+    lines = [f"### 📈 전체: 채점 {attempts:,}회, 오답 {fails:,}회, 정답률 {_rate(attempts, fails)}", ""]
+
+    for title, field in (("난이도별", "difficulty"), ("유형별", "kind"), ("문제 형태별", "problem_type")):
+        rows = by_difficulty if field == "difficulty" else stats.totals(field)
+        lines += [f"#### {title}", "", "| 구분 | 채점 | 오답 | 정답률 |", "|---|---:|---:|---:|"]
+        lines += [f"| {value or '-'} | {a:,} | {f:,} | {_rate(a, f)} |" for value, a, f in rows]
+        lines.append("")
+
+    lines += [f"#### 자주 틀리는 조합 (상위 {DASHBOARD_TOP_COMBOS}개)", "",
+              "| 문제 파일 | 유형 | 난이도 | 형태 | 채점 | 오답 | 연속 | 마지막 채점 |",
+              "|---|---|---|---|---:|---:|---|---|"]
+    for key, a, f, last, streak, _ in stats.combos():
+        when = datetime.fromtimestamp(last).strftime("%Y-%m-%d %H:%M") if last else "-"
+        lines.append(f"| {' | '.join(key)} | {a:,} | {f:,} | {_streak_label(streak)} | {when} |")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="학습 통계 (채점 결과 누적 집계)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="대시보드 내용 출력")
+    sub.add_parser("rebuild", help="판정 기록 전체로 다시 집계")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        print(f"조합 {rebuild_learner_stats()}개를 다시 집계했습니다. ({STATS_PATH})")
+        return 0
+    print(format_dashboard())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
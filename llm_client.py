@@ -0,0 +1,525 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+import requests
+from dotenv import load_dotenv
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+LM_STUDIO_ENDPOINT = os.getenv("LM_STUDIO_ENDPOINT", "http://127.0.0.1:1234/v1/chat/completions")
+LM_STUDIO_MODEL = os.getenv("LM_STUDIO_MODEL", "lm-studio")
+
+# 2단계 캐스케이드: 작은 모델이 정답/오답을 먼저 판정하고, 큰 모델이 상세 해설을 생성
+# LM_STUDIO_FAST_MODEL이 비어 있으면 캐스케이드를 사용하지 않습니다.
+FAST_MODEL_ENDPOINT = os.getenv("LM_STUDIO_FAST_ENDPOINT", LM_STUDIO_ENDPOINT)
+FAST_MODEL = os.getenv("LM_STUDIO_FAST_MODEL", "")
+
+# 비슷한 문제 추천용 임베딩 모델 (OpenAI 호환 /v1/embeddings)
+EMBEDDING_ENDPOINT = os.getenv(
+    "LM_STUDIO_EMBEDDING_ENDPOINT", LM_STUDIO_ENDPOINT.replace("/chat/completions", "/embeddings"))
+EMBEDDING_MODEL = os.getenv("LM_STUDIO_EMBEDDING_MODEL", "text-embedding-nomic-embed-text-v1.5")
+
+# llama.cpp 호환 서버용 프롬프트 캐시 힌트
+# cache_prompt: 이전 요청과 겹치는 접두어의 KV 캐시를 재사용
+# n_keep: 컨텍스트가 넘칠 때 보존할 접두어 토큰 수 (-1: 전부)
+# 알 수 없는 필드를 거부하는 서버라면 LLM_PROMPT_CACHE=0으로 끌 수 있습니다.
+PROMPT_CACHE_ENABLED = os.getenv("LLM_PROMPT_CACHE", "1") != "0"
+PROMPT_CACHE_HINTS: Dict[str, Any] = {"cache_prompt": True, "n_keep": -1}
+
+USAGE_LOG_PATH = Path("data/usage/llm_usage.jsonl")
+_LEGACY_USAGE_LOG_PATH = Path("data/llm_usage.jsonl")  # data 바로 아래는 문제 파일 자리라 옮김
+if _LEGACY_USAGE_LOG_PATH.exists() and not USAGE_LOG_PATH.exists():
+    USAGE_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    _LEGACY_USAGE_LOG_PATH.replace(USAGE_LOG_PATH)
+USAGE_HISTORY_SIZE = 200
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """프롬프트 유형별 생성 예산입니다.
+
+    Attributes:
+        name: 프로필 이름 (사용량 리포트에 표시)
+        max_tokens: 응답 최대 토큰 수
+        stop: 생성 중단 시퀀스
+        temperature: 샘플링 온도
+        max_submission_chars: 프롬프트에 넣을 사용자 답변 최대 길이
+    """
+    name: str
+    max_tokens: int
+    stop: Tuple[str, ...] = ()
+    temperature: float = 0.2
+    max_submission_chars: int = 4000
+
+
+# 모델이 대화를 이어서 역할극을 하거나 요청하지 않은 항목을 덧붙이는 것을 막는 중단 시퀀스
+_FEEDBACK_STOPS = ("\n(사용자)", "\n(출제자)", "\n- 5)")
+
+GENERATION_PROFILES: Dict[str, GenerationProfile] = {
+    "coding_feedback": GenerationProfile(
+        name="coding_feedback", max_tokens=900, stop=_FEEDBACK_STOPS),
+    "concept_feedback": GenerationProfile(
+        name="concept_feedback", max_tokens=700, stop=_FEEDBACK_STOPS, max_submission_chars=2000),
+    # 줄바꿈 중단 시퀀스는 쓰지 않습니다. 추론 모델은 "<think>\n"(생각을 끈 경우 "<think>\n\n</think>")로
+    # 시작하므로 빈 응답이 됩니다. 대신 생각 태그를 지운 뒤 필요한 줄만 씁니다. (첫 줄 요약, 판정 줄)
+    "hint_summary": GenerationProfile(
+        name="hint_summary", max_tokens=160, max_submission_chars=1500),
+    "verdict": GenerationProfile(
+        name="verdict", max_tokens=160, temperature=0.0, max_submission_chars=2000),
+}
+
+
+def get_profile(profile: GenerationProfile | str) -> GenerationProfile:
+    """프로필 이름 또는 객체를 GenerationProfile로 변환합니다."""
+    if isinstance(profile, GenerationProfile):
+        return profile
+    return GENERATION_PROFILES[profile]
+
+
+# ===== 캐스케이드 라우팅 =====
+
+# single: 큰 모델만 사용 (상세 해설 뒤에 판정도 큰 모델로 받음)
+# cascade: 빠른 판정을 먼저 보여주고 큰 모델의 상세 해설을 이어서 스트리밍
+# verdict_only: 빠른 판정만 보여주고 상세 해설은 사용자가 요청할 때 생성
+CASCADE_MODES = ("single", "cascade", "verdict_only")
+
+
+@dataclass(frozen=True)
+class CascadeRoute:
+    """문제 유형/난이도별 캐스케이드 모드 규칙입니다. "*"는 모든 값과 일치합니다.
+
+    difficulty는 접두어로 비교하므로 "Lv0"은 "Lv0 입문"과 일치합니다.
+    """
+    mode: str
+    problem_type: str = "*"
+    difficulty: str = "*"
+
+    def matches(self, problem_type: str, difficulty: str) -> bool:
+        type_match = self.problem_type == "*" or self.problem_type == problem_type
+        difficulty_match = self.difficulty == "*" or difficulty.startswith(self.difficulty)
+        return type_match and difficulty_match
+
+
+DEFAULT_CASCADE_ROUTES: Tuple[CascadeRoute, ...] = (CascadeRoute("cascade"),)
+
+
+def load_cascade_routes(raw: Optional[str] = None) -> Tuple[CascadeRoute, ...]:
+    """LLM_CASCADE_ROUTES 환경변수(JSON 배열)에서 라우팅 규칙을 읽습니다.
+
+    예: [{"problem_type": "개념문제", "mode": "verdict_only"},
+         {"difficulty": "Lv4", "mode": "single"},
+         {"mode": "cascade"}]
+    규칙은 위에서부터 처음 일치하는 것이 적용됩니다.
+    """
+    if raw is None:
+        raw = os.getenv("LLM_CASCADE_ROUTES", "")
+    if not raw.strip():
+        return DEFAULT_CASCADE_ROUTES
+
+    try:
+        items = json.loads(raw)
+        routes = tuple(
+            CascadeRoute(
+                mode=item["mode"],
+                problem_type=item.get("problem_type", "*"),
+                difficulty=item.get("difficulty", "*"),
+            )
+            for item in items
+        )
+    except (json.JSONDecodeError, TypeError, KeyError, AttributeError) as e:
+        print(f"[경고] LLM_CASCADE_ROUTES 파싱 실패, 기본값 사용: {e}", file=sys.stderr)
+        return DEFAULT_CASCADE_ROUTES
+
+    invalid = [r.mode for r in routes if r.mode not in CASCADE_MODES]
+    if invalid:
+        print(f"[경고] 알 수 없는 캐스케이드 모드 {invalid}, 기본값 사용", file=sys.stderr)
+        return DEFAULT_CASCADE_ROUTES
+    return routes
+
+
+CASCADE_ROUTES: Tuple[CascadeRoute, ...] = load_cascade_routes()
+
+
+def resolve_cascade_mode(problem_type: str, difficulty: str,
+                         routes: Optional[Sequence[CascadeRoute]] = None,
+                         fast_model: Optional[str] = None) -> str:
+    """문제에 적용할 캐스케이드 모드를 반환합니다. 빠른 모델이 없으면 항상 "single"입니다.
+
+    fast_model을 주지 않으면 설정된 FAST_MODEL을 봅니다. (재채점처럼 모델을 따로 고른 경우에 지정)
+    """
+    if not (FAST_MODEL if fast_model is None else fast_model):
+        return "single"
+    for route in (CASCADE_ROUTES if routes is None else routes):
+        if route.matches(problem_type, difficulty):
+            return route.mode
+    return "single"
+
+
+# ===== 프롬프트 압축 =====
+
+def compact_schema(schema: str) -> str:
+    """스키마 문자열의 불필요한 공백/개행을 제거합니다.
+
+    예: "users(\n  name STRING,\n  age INT\n)" -> "users(name STRING,age INT)"
+    """
+    if not schema:
+        return ""
+    text = re.sub(r"\s+", " ", schema).strip()
+    return re.sub(r"\s*([(),])\s*", r"\1", text)
+
+
+def compact_sample_rows(rows: Sequence[Any], max_rows: int = 5) -> str:
+    """샘플 데이터를 파이썬 repr 대신 간결한 행 단위 텍스트로 렌더링합니다.
+
+    - 문자열 행: 그대로 한 줄씩
+    - dict 행: 첫 행의 키를 헤더로 한 번만 쓰고, 이후에는 값만 "|"로 연결
+    - max_rows를 넘는 행은 생략하고 개수만 표시
+    """
+    if not rows:
+        return ""
+
+    shown = list(rows[:max_rows])
+    lines: List[str] = []
+    header: Optional[List[str]] = None
+    for row in shown:
+        if isinstance(row, dict):
+            keys = list(row.keys())
+            if keys != header:
+                header = keys
+                lines.append("|".join(str(k) for k in keys))
+            lines.append("|".join(str(row[k]) for k in keys))
+        else:
+            header = None
+            lines.append(str(row).strip())
+
+    omitted = len(rows) - len(shown)
+    if omitted > 0:
+        lines.append(f"...(+{omitted}행)")
+    return "\n".join(lines)
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """긴 텍스트를 앞/뒤만 남기고 중간을 생략합니다."""
+    if not text or len(text) <= limit:
+        return text or ""
+    head = limit * 2 // 3
+    tail = limit - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n...(중략: {omitted}자)...\n{text[-tail:]}"
+
+
+# ===== 토큰 사용량 기록 =====
+
+@dataclass
+class UsageRecord:
+    """LLM 호출 1회의 토큰 사용량입니다. 응답의 usage 필드에서 가져옵니다."""
+    timestamp: str
+    profile: str
+    endpoint: str
+    prompt_tokens: int
+    completion_tokens: int
+    elapsed: float
+
+
+USAGE_HISTORY: Deque[UsageRecord] = deque(maxlen=USAGE_HISTORY_SIZE)
+
+
+def record_usage(profile: str, endpoint: str, usage: Optional[Dict], elapsed: float) -> Optional[UsageRecord]:
+    """응답 usage 필드를 메모리 기록과 사용량 로그 파일에 추가합니다.
+
+    서버가 usage를 보내지 않으면 아무것도 기록하지 않습니다.
+    """
+    if not usage:
+        return None
+
+    record = UsageRecord(
+        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        profile=profile,
+        endpoint=endpoint,
+        prompt_tokens=int(usage.get("prompt_tokens", 0) or 0),
+        completion_tokens=int(usage.get("completion_tokens", 0) or 0),
+        elapsed=round(elapsed, 3),
+    )
+    USAGE_HISTORY.append(record)
+
+    try:
+        USAGE_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(USAGE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(record), ensure_ascii=False, separators=(",", ":")) + "\n")
+    except OSError as e:
+        print(f"[경고] 사용량 로그 기록 실패: {e}", file=sys.stderr)
+
+    return record
+
+
+def load_usage_log(path: Path = USAGE_LOG_PATH) -> List[UsageRecord]:
+    """사용량 로그 파일에서 기록을 읽습니다. 손상된 라인은 건너뜁니다."""
+    if not path.exists():
+        return []
+
+    records: List[UsageRecord] = []
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(UsageRecord(**json.loads(line)))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return records
+
+
+def format_usage_report(records: Optional[Sequence[UsageRecord]] = None, limit: int = 20) -> str:
+    """호출별 prompt/completion 토큰과 프로필별 합계를 Markdown 표로 반환합니다."""
+    if records is None:
+        records = list(USAGE_HISTORY)
+    if not records:
+        return "아직 기록된 LLM 호출이 없습니다."
+
+    lines = [
+        "| 시각 | 프로필 | prompt | completion | 소요(초) |",
+        "|---|---|---:|---:|---:|",
+    ]
+    for r in list(records)[-limit:]:
+        lines.append(f"| {r.timestamp} | {r.profile} | {r.prompt_tokens} | {r.completion_tokens} | {r.elapsed:.1f} |")
+
+    totals: Dict[str, List[int]] = {}
+    for r in records:
+        bucket = totals.setdefault(r.profile, [0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += r.prompt_tokens
+        bucket[2] += r.completion_tokens
+
+    lines += [
+        "",
+        "| 프로필 | 호출 수 | 평균 prompt | 평균 completion |",
+        "|---|---:|---:|---:|",
+    ]
+    for name, (count, prompt_sum, completion_sum) in totals.items():
+        lines.append(f"| {name} | {count} | {prompt_sum // count} | {completion_sum // count} |")
+
+    return "\n".join(lines)
+
+
+# ===== LLM 호출 =====
+
+# (endpoint, model)별 마지막 성공 호출 시각 (time.time()). 예열/keep-alive가 참고합니다.
+ENDPOINT_LAST_USED: Dict[Tuple[str, str], float] = {}
+
+
+def configured_models() -> List[Tuple[str, str]]:
+    """설정된 (endpoint, model) 목록을 반환합니다. 빠른 모델이 없으면 큰 모델만 반환합니다."""
+    targets = [(LM_STUDIO_ENDPOINT, LM_STUDIO_MODEL)]
+    if FAST_MODEL and (FAST_MODEL_ENDPOINT, FAST_MODEL) not in targets:
+        targets.append((FAST_MODEL_ENDPOINT, FAST_MODEL))
+    return targets
+
+
+def clean_llm_output(text: str) -> str:
+    # 일부 모델이 생성하는 <think>...</think> 태그 제거
+    # (Gradio Markdown 렌더링 방해 방지)
+    # 스트리밍 중에는 아직 닫히지 않은 <think> 블록도 숨김
+    text = re.sub(r'<think>.*?(?:</think>|$)', '', text, flags=re.DOTALL)
+    return text.strip()
+
+
+def build_payload(system_prompt: str, user_prompt: str, gen: GenerationProfile,
+                  model: str, stream: bool) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "stream": stream,
+        "temperature": gen.temperature,
+        "max_tokens": gen.max_tokens,
+    }
+    if gen.stop:
+        payload["stop"] = list(gen.stop)
+    if PROMPT_CACHE_ENABLED:
+        payload.update(PROMPT_CACHE_HINTS)
+    if stream:
+        # 스트리밍 응답에서도 마지막 청크로 usage를 받기 위한 옵션
+        payload["stream_options"] = {"include_usage": True}
+    return payload
+
+
+def connection_error_message(endpoint: str, exc: Exception) -> str:
+    return (
+        "LLM 서버에 연결하지 못했습니다.\n"
+        f"로컬 엔드포인트({endpoint})를 확인하세요.\n"
+        f"네트워크를 확인하거나 나중에 다시 시도하세요. ({exc})"
+    )
+
+
+def call_llm(system_prompt: str, user_prompt: str,
+             endpoint: str = LM_STUDIO_ENDPOINT,
+             profile: GenerationProfile | str = "coding_feedback",
+             model: str = LM_STUDIO_MODEL) -> str:
+    gen = get_profile(profile)
+    payload = build_payload(system_prompt, user_prompt, gen, model, stream=False)
+    try:
+        started = time.perf_counter()
+        response = requests.post(endpoint, json=payload, timeout=180)
+        response.raise_for_status()
+        content = response.json()
+        result = content["choices"][0]["message"]["content"]
+        record_usage(gen.name, endpoint, content.get("usage"), time.perf_counter() - started)
+        ENDPOINT_LAST_USED[(endpoint, model)] = time.time()
+        return clean_llm_output(result)
+    except (requests.RequestException, KeyError, ValueError, IndexError) as exc:
+        return connection_error_message(endpoint, exc)
+
+
+def stream_llm(system_prompt: str, user_prompt: str,
+               endpoint: str = LM_STUDIO_ENDPOINT,
+               profile: GenerationProfile | str = "coding_feedback",
+               model: str = LM_STUDIO_MODEL) -> Iterator[str]:
+    """SSE 스트리밍으로 LLM을 호출하고, 지금까지 누적된 응답을 차례로 yield합니다."""
+    gen = get_profile(profile)
+    payload = build_payload(system_prompt, user_prompt, gen, model, stream=True)
+    text = ""
+    usage = None
+    try:
+        started = time.perf_counter()
+        with requests.post(endpoint, json=payload, timeout=180, stream=True) as response:
+            response.raise_for_status()
+            # SSE 응답은 charset이 없는 경우가 많아 한글이 깨지지 않도록 지정
+            response.encoding = "utf-8"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                choices = chunk.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    text += delta
+                    yield clean_llm_output(text)
+        record_usage(gen.name, endpoint, usage, time.perf_counter() - started)
+        ENDPOINT_LAST_USED[(endpoint, model)] = time.time()
+    except (requests.RequestException, KeyError, ValueError, IndexError) as exc:
+        yield connection_error_message(endpoint, exc)
+
+
+def embed_texts(texts: Sequence[str],
+                endpoint: str = EMBEDDING_ENDPOINT,
+                model: str = EMBEDDING_MODEL) -> List[List[float]]:
+    """/v1/embeddings로 여러 텍스트를 한 번에 임베딩합니다.
+
+    채점과 달리 호출한 쪽에서 재시도/상태 표시를 하므로 실패 시 예외를 그대로 올립니다.
+    """
+    started = time.perf_counter()
+    response = requests.post(endpoint, json={"model": model, "input": list(texts)}, timeout=180)
+    response.raise_for_status()
+    content = response.json()
+    data = sorted(content["data"], key=lambda item: item.get("index", 0))
+    if len(data) != len(texts):
+        raise ValueError(f"임베딩 개수가 맞지 않습니다: 요청 {len(texts)}개, 응답 {len(data)}개")
+    record_usage("embedding", endpoint, content.get("usage"), time.perf_counter() - started)
+    ENDPOINT_LAST_USED[(endpoint, model)] = time.time()
+    return [item["embedding"] for item in data]
+
+
+# ===== 비동기 LLM 호출 =====
+# Gradio 핸들러용 비동기 버전입니다. 채점 대기 중에 워커 스레드를 점유하지 않으므로
+# 한 프로세스가 수백 건의 채점을 동시에 기다릴 수 있습니다.
+
+LLM_TIMEOUT = httpx.Timeout(180.0, connect=10.0)
+# 동시 채점 수만큼 연결을 열 수 있도록 연결 수 제한을 둡니다 (대기열은 서버가 관리).
+ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=512, max_keepalive_connections=32)
+
+_async_clients: Dict[int, httpx.AsyncClient] = {}
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프에 묶인 공유 AsyncClient를 반환합니다 (연결 재사용)."""
+    loop_id = id(asyncio.get_running_loop())
+    client = _async_clients.get(loop_id)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=LLM_TIMEOUT, limits=ASYNC_CLIENT_LIMITS)
+        _async_clients[loop_id] = client
+    return client
+
+
+async def arequest_llm(system_prompt: str, user_prompt: str,
+                       endpoint: str = LM_STUDIO_ENDPOINT,
+                       profile: GenerationProfile | str = "coding_feedback",
+                       model: str = LM_STUDIO_MODEL) -> str:
+    """acall_llm과 같지만 연결/응답 오류를 메시지로 바꾸지 않고 그대로 올립니다.
+
+    일괄 재채점처럼 실패한 요청을 결과로 남기지 않고 다시 시도해야 하는 곳에서 씁니다.
+    """
+    gen = get_profile(profile)
+    payload = build_payload(system_prompt, user_prompt, gen, model, stream=False)
+    started = time.perf_counter()
+    response = await get_async_client().post(endpoint, json=payload)
+    response.raise_for_status()
+    content = response.json()
+    result = content["choices"][0]["message"]["content"]
+    record_usage(gen.name, endpoint, content.get("usage"), time.perf_counter() - started)
+    ENDPOINT_LAST_USED[(endpoint, model)] = time.time()
+    return clean_llm_output(result)
+
+
+async def acall_llm(system_prompt: str, user_prompt: str,
+                    endpoint: str = LM_STUDIO_ENDPOINT,
+                    profile: GenerationProfile | str = "coding_feedback",
+                    model: str = LM_STUDIO_MODEL) -> str:
+    """call_llm의 비동기 버전입니다."""
+    try:
+        return await arequest_llm(system_prompt, user_prompt, endpoint, profile, model)
+    except (httpx.HTTPError, KeyError, ValueError, IndexError) as exc:
+        return connection_error_message(endpoint, exc)
+
+
+async def astream_llm(system_prompt: str, user_prompt: str,
+                      endpoint: str = LM_STUDIO_ENDPOINT,
+                      profile: GenerationProfile | str = "coding_feedback",
+                      model: str = LM_STUDIO_MODEL) -> AsyncIterator[str]:
+    """stream_llm의 비동기 버전입니다. 누적된 응답을 차례로 yield합니다."""
+    gen = get_profile(profile)
+    payload = build_payload(system_prompt, user_prompt, gen, model, stream=True)
+    text = ""
+    usage = None
+    try:
+        started = time.perf_counter()
+        async with get_async_client().stream("POST", endpoint, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or usage
+                choices = chunk.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    text += delta
+                    yield clean_llm_output(text)
+        record_usage(gen.name, endpoint, usage, time.perf_counter() - started)
+        ENDPOINT_LAST_USED[(endpoint, model)] = time.time()
+    except (httpx.HTTPError, KeyError, ValueError, IndexError) as exc:
+        yield connection_error_message(endpoint, exc)
+
+
+if __name__ == "__main__":
+    # 사용량 로그 리포트 출력: python llm_client.py
+    print(format_usage_report(load_usage_log(), limit=50))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import bisect
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+from search_index import tokenize
+
+# 오답노트/즐겨찾기 드롭다운용 서버 측 검색 + 페이지 나누기
+# - 항목마다 검색 텍스트(제목, 별명, 유형, 난이도)를 search_index.tokenize로 자른 토큰과
+#   한글 낱글자를 역색인에 넣습니다. 질의 토큰은 접두어로 찾으므로 입력 중인 단어도 맞습니다.
+#   ("pys" → pyspark, "데" → 데이터)
+# - 질의 토큰은 모두 맞아야 하며(AND), 결과는 원래 목록 순서를 따릅니다.
+# - 드롭다운에는 한 쪽(PICKER_PAGE_SIZE개)만 보내므로 항목이 늘어도 전송량과 렌더링 비용이 일정합니다.
+PICKER_PAGE_SIZE = int(os.getenv("PICKER_PAGE_SIZE", "50"))
+
+_HANGUL_CHAR = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+T = TypeVar("T")
+
+
+def picker_tokens(text: str) -> List[str]:
+    """색인용 토큰: tokenize 결과 + 한글 낱글자 (한 글자 질의가 단어 중간 글자에도 맞도록)"""
+    normalized = unicodedata.normalize("NFKC", text or "").lower()
+    return tokenize(text) + _HANGUL_CHAR.findall(normalized)
+
+
+@dataclass
+class PickerPage:
+    """검색 결과 한 쪽입니다. page는 0부터 셉니다."""
+    choices: List[Tuple[str, str]]
+    page: int
+    pages: int
+    total: int
+    page_size: int = PICKER_PAGE_SIZE
+
+    def info(self) -> str:
+        """드롭다운 info 문구 (예: "1,234개 중 51-100 · 2/25쪽")"""
+        if not self.total:
+            return "검색 결과가 없습니다."
+        start = self.page * self.page_size
+        return f"{self.total:,}개 중 {start + 1}-{start + len(self.choices)} · {self.page + 1}/{self.pages}쪽"
+
+
+class PickerIndex:
+    """(label, value) 목록과 검색 텍스트의 역색인입니다. 만든 뒤에는 바뀌지 않습니다."""
+
+    def __init__(self, labels: List[str], values: List[str], texts: Sequence[str]):
+        self.labels = labels
+        self.values = values
+        postings: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            for token in set(picker_tokens(text)):
+                postings.setdefault(token, []).append(i)
+        self._postings = postings
+        self._vocab = sorted(postings)
+
+    @classmethod
+    def build(cls, items: Sequence[T],
+              label_fn: Callable[[T], str],
+              value_fn: Callable[[T], str],
+              text_fn: Callable[[T], str]) -> "PickerIndex":
+        return cls([label_fn(item) for item in items],
+                   [value_fn(item) for item in items],
+                   [text_fn(item) for item in items])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _prefix_ids(self, prefix: str) -> set:
+        ids: set = set()
+        start = bisect.bisect_left(self._vocab, prefix)
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            ids.update(self._postings[token])
+        return ids
+
+    def match(self, query: str) -> List[int]:
+        """질의의 모든 토큰(접두어)에 맞는 항목 번호를 원래 순서로 반환합니다."""
+        tokens = sorted(set(tokenize(query)), key=len, reverse=True)  # 긴 토큰이 후보를 더 빨리 줄임
+        if not tokens:
+            return list(range(len(self)))
+        ids = self._prefix_ids(tokens[0])
+        for token in tokens[1:]:
+            if not ids:
+                break
+            ids &= self._prefix_ids(token)
+        return sorted(ids)
+
+    def search(self, query: str = "", page: int = 0, page_size: int = PICKER_PAGE_SIZE) -> PickerPage:
+        """질의 결과의 page쪽을 반환합니다. 범위를 벗어난 page는 첫/마지막 쪽으로 맞춥니다."""
+        ids = self.match(query)
+        pages = max(1, -(-len(ids) // page_size))
+        page = min(max(page, 0), pages - 1)
+        window = ids[page * page_size:(page + 1) * page_size]
+        return PickerPage(
+            choices=[(self.labels[i], self.values[i]) for i in window],
+            page=page,
+            pages=pages,
+            total=len(ids),
+            page_size=page_size,
+        )
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
 
-# 제외할 파일 목록 (문제 파일이 아닌 JSON 파일들)
-EXCLUDED_FILES = {"favorites.json"}
+# data 폴더 바로 아래의 .json / .jsonl 파일은 모두 문제 파일로 봅니다.
+# 앱이 쓰는 파일은 data/review/, data/grading_jobs/처럼 하위 폴더에 두세요. (이 목록에 추가하지 말 것)
+# EXCLUDED_FILES는 하위 폴더로 옮기기 전의 옛 위치입니다. 각 모듈이 처음 불러올 때 새 위치로 옮기며,
+# 그 전에(앱을 띄우지 않고 CLI만 실행한 경우 등) 문제 파일로 보이지 않도록 남겨 둡니다.
+# - favorites.json → data/favorites/favorites.json (app.FAVORITES_PATH)
+# - llm_usage.jsonl → data/usage/llm_usage.jsonl (llm_client.USAGE_LOG_PATH)
+# - learner_results.jsonl → data/stats/learner_results.jsonl (learner_stats.RESULTS_PATH)
+EXCLUDED_FILES = frozenset({"favorites.json", "llm_usage.jsonl", "learner_results.jsonl"})
 DEFAULT_PROBLEM_FILE = "problems.json"
 
 # Gradio Code 컴포넌트가 지원하는 언어 목록
@@ -28,6 +35,7 @@ class Problem:
     schema: str = ""
     sample_rows: List[str] = field(default_factory=list)
     problem_type: str = "코딩"  # "코딩", "개념문제", "빈칸채우기"
+    reference: str = ""  # 참고 답안 (선택, 채점 프롬프트에만 사용)
 
     @property
     def language(self) -> str:
@@ -70,38 +78,321 @@ def unique_preserve_order(items: Sequence[str]) -> List[str]:
     return ordered
 
 
-def load_problem_bank(path: Path | str = Path("data/problems.json")) -> List[Problem]:
+# 스트리밍 로더 설정
+# 파일 전체 텍스트와 JSON 트리를 한꺼번에 메모리에 올리지 않도록, 문제 파일을 조각 단위로 읽어
+# 레코드를 하나씩 Problem으로 바꿉니다. 최대 메모리는 (Problem 목록 + 조각 하나 + 레코드 하나) 수준입니다.
+# - JSON 배열 (.json): [ {...}, {...} ]
+# - JSON Lines (.jsonl, 또는 첫 글자가 '{'인 파일): 한 줄에 문제 하나
+STREAM_CHUNK_CHARS = 1 << 20
+MAX_RECORD_CHARS = 16 << 20  # 레코드 하나가 이보다 크면 문법 오류로 봅니다 (버퍼가 끝없이 커지지 않도록)
+MAX_REPORTED_ERRORS = 5
+
+_REQUIRED_FIELDS = ("pid", "title", "body", "difficulty", "kind")
+_OPTIONAL_TEXT_FIELDS = ("hint", "schema", "problem_type", "reference")
+_WHITESPACE = " \t\r\n"
+
+
+@dataclass
+class RecordError:
+    """건너뛴 문제 레코드 하나의 오류입니다.
+
+    Attributes:
+        position: JSON 배열이면 0부터 시작하는 항목 번호, JSONL이면 1부터 시작하는 줄 번호
+        pid: 레코드에서 읽을 수 있었던 pid (없으면 빈 문자열)
+        message: 오류 내용
+    """
+    position: int
+    pid: str
+    message: str
+
+
+def problem_from_record(item: Any) -> Problem:
+    """JSON 레코드 하나를 검증해 Problem으로 만듭니다. 형식이 틀리면 ValueError를 발생시킵니다."""
+    if not isinstance(item, dict):
+        raise ValueError(f"객체가 아닙니다: {type(item).__name__}")
+    missing = [key for key in _REQUIRED_FIELDS if key not in item]
+    if missing:
+        raise ValueError(f"필수 필드 누락: {', '.join(missing)}")
+    for key in _REQUIRED_FIELDS:
+        if not isinstance(item[key], str):
+            raise ValueError(f"{key} 필드가 문자열이 아닙니다: {type(item[key]).__name__}")
+    for key in _OPTIONAL_TEXT_FIELDS:
+        if item.get(key) is not None and not isinstance(item[key], str):
+            raise ValueError(f"{key} 필드가 문자열이 아닙니다: {type(item[key]).__name__}")
+    # 샘플 데이터는 문자열 외에 객체 행도 쓰는 문제 파일이 있어 리스트인지만 확인합니다
+    sample_rows = item.get("sample_rows") or []
+    if not isinstance(sample_rows, list):
+        raise ValueError(f"sample_rows 필드는 리스트여야 합니다: {type(sample_rows).__name__}")
+
+    # 난이도/영역/유형은 값 종류가 적으므로 intern해 문제 수만큼 문자열을 복제하지 않습니다
+    return Problem(
+        pid=item["pid"],
+        title=item["title"],
+        body=item["body"],
+        difficulty=sys.intern(item["difficulty"]),
+        kind=sys.intern(item["kind"]),
+        hint=item.get("hint") or "",
+        schema=item.get("schema") or "",
+        sample_rows=sample_rows,
+        problem_type=sys.intern(item.get("problem_type") or "코딩"),
+        reference=item.get("reference") or "",
+    )
+
+
+def _iter_json_array(f: TextIO, chunk_chars: int) -> Iterator[Tuple[int, Any]]:
+    """JSON 배열 파일에서 (항목 번호, 항목)을 하나씩 읽습니다. 문법 오류는 복구할 수 없어 ValueError."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_chars)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("JSON 배열이 아닙니다")
+    pos += 1
+
+    index = 0
+    skip_ws()
+    if pos < len(buf) and buf[pos] == "]":
+        return
+    while True:
+        skip_ws()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError:
+                # 레코드가 조각 경계에 걸친 경우: 더 읽어서 다시 시도
+                if eof or len(buf) - pos > MAX_RECORD_CHARS or not fill():
+                    raise
+        pos = end
+        yield index, item
+        index += 1
+
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError(f"JSON 배열이 닫히지 않았습니다 (항목 {index}개 이후)")
+        if buf[pos] == ",":
+            pos += 1
+        elif buf[pos] == "]":
+            return
+        else:
+            raise ValueError(f"항목 {index} 뒤에 ',' 또는 ']'가 필요합니다")
+
+
+def _iter_json_lines(f: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """JSONL 파일에서 (줄 번호, 레코드)를 읽습니다. 파싱에 실패한 줄은 ValueError 객체로 전달합니다."""
+    for line_no, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, ValueError(f"JSON 파싱 실패: {exc.msg} (열 {exc.colno})")
+
+
+def is_jsonl_bank(path: Path) -> bool:
+    """확장자가 .jsonl이거나 첫 글자가 '{'이면 JSON Lines 문제 파일로 봅니다."""
+    if path.suffix == ".jsonl":
+        return True
+    with path.open(encoding="utf-8") as f:
+        while True:
+            ch = f.read(1)
+            if not ch or ch not in _WHITESPACE + "\ufeff":
+                return ch == "{"
+
+
+def iter_bank_records(path: Path | str, chunk_chars: int = STREAM_CHUNK_CHARS) -> Iterator[Tuple[int, Any]]:
+    """문제 파일(JSON 배열 또는 JSONL)의 원본 레코드를 (위치, 레코드)로 하나씩 읽습니다.
+
+    JSONL에서 파싱에 실패한 줄은 레코드 대신 ValueError 객체로 전달합니다.
+    """
     data_path = Path(path)
     if not data_path.exists():
         raise FileNotFoundError(f"Problem data file not found: {data_path}")
 
-    raw = json.loads(data_path.read_text(encoding="utf-8"))
-    problems: List[Problem] = []
-    for item in raw:
-        problems.append(
-            Problem(
-                pid=item["pid"],
-                title=item["title"],
-                body=item["body"],
-                difficulty=item["difficulty"],
-                kind=item["kind"],
-                hint=item.get("hint", ""),
-                schema=item.get("schema", ""),
-                sample_rows=item.get("sample_rows", []),
-                problem_type=item.get("problem_type", "코딩"),
-            )
-        )
+    jsonl = is_jsonl_bank(data_path)
+    with data_path.open(encoding="utf-8-sig") as f:
+        yield from (_iter_json_lines(f) if jsonl else _iter_json_array(f, chunk_chars))
+
+
+def iter_problems(path: Path | str, errors: Optional[List[RecordError]] = None,
+                  chunk_chars: int = STREAM_CHUNK_CHARS) -> Iterator[Problem]:
+    """문제 파일(JSON 배열 또는 JSONL)에서 Problem을 하나씩 만듭니다.
+
+    형식이 틀린 레코드는 건너뛰고 errors에 기록합니다. (errors가 None이면 기록하지 않음)
+    JSON 배열의 문법 오류처럼 이후 레코드를 찾을 수 없는 경우에만 ValueError를 발생시킵니다.
+    """
+    for position, item in iter_bank_records(path, chunk_chars):
+        try:
+            if isinstance(item, ValueError):
+                raise item
+            yield problem_from_record(item)
+        except ValueError as exc:
+            if errors is not None:
+                pid = item.get("pid") if isinstance(item, dict) else ""
+                errors.append(RecordError(position, pid if isinstance(pid, str) else "", str(exc)))
+
+
+def changelog_path_for(bank_path: Path | str) -> Path:
+    """문제 파일 옆의 변경 로그 경로입니다. (예: data/problems.json → data/problems.json.changes)
+
+    .json/.jsonl로 끝나지 않으므로 문제 파일 목록에는 나타나지 않습니다.
+    """
+    bank_path = Path(bank_path)
+    return bank_path.with_name(bank_path.name + ".changes")
+
+
+def change_log_pid(entry: Any) -> str:
+    """변경 로그 항목이 가리키는 pid입니다. (알 수 없으면 빈 문자열)"""
+    if not isinstance(entry, dict):
+        return ""
+    pid = entry["problem"].get("pid") if isinstance(entry.get("problem"), dict) else entry.get("pid")
+    return pid if isinstance(pid, str) else ""
+
+
+def apply_change_log(problems: List[Problem], log_lines: Iterable[str],
+                     errors: Optional[List[RecordError]] = None) -> List[Problem]:
+    """변경 로그 줄(upsert/delete)을 순서대로 적용한 문제 목록을 반환합니다.
+
+    기존 pid의 upsert는 제자리에서 교체하고, 새 pid는 끝에 추가합니다.
+    같은 로그를 여러 번 적용해도 결과가 같으므로 압축 도중에 중단되어도 안전합니다.
+    """
+    merged: List[Optional[Problem]] = list(problems)
+    positions: Dict[str, int] = {p.pid: i for i, p in enumerate(problems)}
+    for line_no, entry in _iter_json_lines(log_lines):
+        try:
+            if isinstance(entry, ValueError):
+                raise entry
+            if not isinstance(entry, dict) or entry.get("op") not in ("upsert", "delete"):
+                raise ValueError("op가 upsert/delete인 객체가 아닙니다")
+            if entry["op"] == "upsert":
+                problem = problem_from_record(entry.get("problem"))
+                if problem.pid in positions:
+                    merged[positions[problem.pid]] = problem
+                else:
+                    positions[problem.pid] = len(merged)
+                    merged.append(problem)
+            else:
+                position = positions.pop(entry.get("pid"), None)
+                if position is not None:
+                    merged[position] = None
+        except ValueError as exc:
+            if errors is not None:
+                errors.append(RecordError(line_no, change_log_pid(entry), f"변경 로그: {exc}"))
+    return [p for p in merged if p is not None]
+
+
+def load_problem_bank(path: Path | str = Path("data/problems.json"),
+                      errors: Optional[List[RecordError]] = None) -> List[Problem]:
+    """문제 파일을 스트리밍으로 읽고, 변경 로그가 있으면 합쳐서 Problem 목록을 반환합니다.
+
+    errors를 넘기지 않으면 건너뛴 레코드를 stderr에 요약해 출력합니다.
+    """
+    report: List[RecordError] = [] if errors is None else errors
+    problems = list(iter_problems(path, report))
+    log_path = changelog_path_for(path)
+    if log_path.exists():
+        with log_path.open(encoding="utf-8") as f:
+            problems = apply_change_log(problems, f, report)
+    if errors is None and report:
+        print(f"[경고] {Path(path).name}: 형식이 잘못된 문제 {len(report)}개를 건너뛰었습니다.", file=sys.stderr)
+        for error in report[:MAX_REPORTED_ERRORS]:
+            print(f"  - #{error.position} {error.pid or '(pid 없음)'}: {error.message}", file=sys.stderr)
     return problems
 
 
-PROBLEM_BANK: List[Problem] = load_problem_bank()
-DIFFICULTY_OPTIONS: List[str] = unique_preserve_order([p.difficulty for p in PROBLEM_BANK])
+# 파일별 공유 문제 캐시: filename -> (파일/변경 로그의 (mtime_ns, size), problems, pid 인덱스)
+# 세션 state는 Problem 객체 대신 (source_file, pid) 핸들만 들고, 이 캐시로 찾습니다.
+# 항목은 튜플 하나로 통째로 교체되므로 읽는 쪽은 항상 한 버전의 문제 목록만 봅니다.
+_BANK_CACHE: Dict[str, Tuple[Tuple[int, ...], List[Problem], Dict[str, Problem]]] = {}
+
+
+def _stat_signature(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def bank_signature(file_path: Path) -> Tuple[int, ...]:
+    """파일 변경 감지용 (mtime_ns, size, 변경 로그 mtime_ns, 변경 로그 size). 없는 파일은 -1."""
+    return _stat_signature(file_path) + _stat_signature(changelog_path_for(file_path))
+
+
+def get_problem_bank(filename: str = DEFAULT_PROBLEM_FILE) -> List[Problem]:
+    """data 폴더의 문제 파일을 캐시에서 반환합니다. 파일이 바뀌었으면 다시 읽습니다.
+
+    저장 중인 파일처럼 JSON이 깨져 있으면 파일이 다시 바뀔 때까지 캐시에 있던 이전 버전을 계속 사용합니다.
+    """
+    file_path = Path("data") / filename
+    signature = bank_signature(file_path)
+    cached = _BANK_CACHE.get(filename)
+    if cached is None or cached[0] != signature:
+        try:
+            problems = load_problem_bank(file_path)
+        except (ValueError, KeyError, TypeError) as exc:
+            if cached is None:
+                raise
+            print(f"[경고] 문제 파일을 읽지 못해 이전 버전을 사용합니다 ({filename}): {exc}", file=sys.stderr)
+            # 실패한 시그니처를 기억해 파일이 다시 바뀔 때까지 매 호출마다 다시 파싱하지 않음
+            # (목록 객체는 그대로라 검색 인덱스/큐브 캐시도 그대로 쓰임)
+            _BANK_CACHE[filename] = (signature,) + cached[1:]
+            return cached[1]
+        cached = (signature, problems, {p.pid: p for p in problems})
+        _BANK_CACHE[filename] = cached
+    return cached[1]
+
+
+def forget_problem_bank(filename: str) -> None:
+    """삭제된 문제 파일을 캐시에서 제거합니다. (검색/개수/임베딩 캐시는 각 모듈의 forget_*)"""
+    _BANK_CACHE.pop(filename, None)
+
+
+def find_problem(source_file: str, pid: str) -> Optional[Problem]:
+    """(source_file, pid) 핸들로 문제를 찾습니다. 파일이나 문제가 없으면 None을 반환합니다."""
+    try:
+        get_problem_bank(source_file)
+    except FileNotFoundError:
+        return None
+    return _BANK_CACHE[source_file][2].get(pid)
+
+
+def __getattr__(name: str):
+    """PROBLEM_BANK / DIFFICULTY_OPTIONS는 처음 접근할 때 기본 문제 파일에서 읽습니다.
+
+    이 모듈을 불러오기만 하는 프로세스(예: 오답노트 파싱 워커)는 문제 은행 파일을 읽지 않습니다.
+    """
+    if name in ("PROBLEM_BANK", "DIFFICULTY_OPTIONS"):
+        reload_problem_bank(DEFAULT_PROBLEM_FILE)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_available_problem_files(data_dir: Path | str = Path("data")) -> List[str]:
     """data 폴더에서 사용 가능한 문제 파일 목록을 반환합니다.
 
-    favorites.json 등 제외 파일을 제외한 모든 .json 파일을 반환합니다.
+    하위 폴더를 제외한 data 폴더 바로 아래의 .json / .jsonl 파일을 반환합니다. (EXCLUDED_FILES는 옛 위치라 제외)
 
     Args:
         data_dir: 데이터 디렉토리 경로
@@ -114,7 +405,7 @@ def get_available_problem_files(data_dir: Path | str = Path("data")) -> List[str
         return [DEFAULT_PROBLEM_FILE]
 
     files = [
-        f.name for f in data_path.glob("*.json")
+        f.name for pattern in ("*.json", "*.jsonl") for f in data_path.glob(pattern)
         if f.name not in EXCLUDED_FILES
     ]
 
@@ -139,8 +430,7 @@ def reload_problem_bank(filename: str = DEFAULT_PROBLEM_FILE) -> tuple[List[Prob
     """
     global PROBLEM_BANK, DIFFICULTY_OPTIONS
 
-    file_path = Path("data") / filename
-    PROBLEM_BANK = load_problem_bank(file_path)
+    PROBLEM_BANK = get_problem_bank(filename)
     DIFFICULTY_OPTIONS = unique_preserve_order([p.difficulty for p in PROBLEM_BANK])
 
     # 언어 옵션도 함께 반환
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import re
+from typing import Tuple
+
+from llm_client import (
+    GenerationProfile,
+    compact_sample_rows,
+    compact_schema,
+    get_profile,
+    truncate_text,
+)
+from problem_bank import Problem
+
+# 프롬프트 배치 원칙 (서버 측 KV 캐시 재사용)
+# - system 메시지: 지시문 → 문제 → 스키마 → 샘플 → 참고답안 순서의 "문제별 고정 접두어"
+# - user 메시지: 학습자의 답변(및 피드백)만
+# 같은 문제에 여러 번 제출해도 system 메시지가 바이트 단위로 동일하므로
+# llama.cpp 호환 서버가 접두어의 KV 캐시를 그대로 재사용할 수 있습니다.
+# 접두어에 시간, 닉네임 등 제출마다 달라지는 값을 넣지 마세요.
+
+CONCEPT_TYPES = ("빈칸채우기", "개념문제")
+
+CONCEPT_FEEDBACK_INSTRUCTIONS = (
+    "당신은 주어진 문제에 대한 사용자의 답변을 채점하는 조교입니다."
+    "문제를 맞췄는지 간결하게 답변하세요. 그 다음 해설을 제공하세요."
+    "정답 여부, 핵심 개념, 관련 개념들과 관계, 실제 적용 사례, 작성자의 의도 추정 및 약점분석을 포함합니다.\n"
+    "다음 사항을 포함하여 평가에 대한 해설을 Markdown으로 읽기 편하게 제공하세요:\n"
+    "- 1) 답변 평가 및 해설\n"
+    "- 2) 핵심 개념, 핵심개념의 상위개념, 헷갈리기 쉬운 유사개념, 반대개념 및 각각의 설명\n"
+    "- 3) 실제 적용 사례 또는 예시\n"
+    "- 4) 답변을 이렇게 쓴 이유/의도 추측 및 약점분석\n"
+)
+
+CODING_FEEDBACK_INSTRUCTIONS = (
+    "당신은 주어진 문제에 대한 사용자의 답변을 채점하는 조교입니다. "
+    "문제를 맞췄는지 간결하게 답변하세요. 그 다음 해설은 제공하세요."
+    "정답 여부, 놓친 부분, 작성자의 의도 추정 및 약점분석, 효율/논리 개선안을 포함합니다.\n"
+    "다음 사항을 포함하여 평가에 대한 해설을 Markdown으로 읽기 편하게 제공하세요:\n"
+    "- 1) 코드 분석 및 평가\n"
+    "- 2) 보완이 필요한 부분\n"
+    "- 3) 답변을 이렇게 쓴 이유/의도 추측 및 약점분석\n"
+    "- 4) 더 효율적이거나 간결한 방법\n"
+)
+
+VERDICT_INSTRUCTIONS = (
+    "당신은 채점기입니다. 사용자의 답변이 문제의 요구를 충족하는지만 판정하세요. "
+    "첫 줄에는 '정답' 또는 '오답'만 쓰고, 둘째 줄에 이유를 한 문장으로 쓰세요.\n"
+)
+
+HINT_SUMMARY_INSTRUCTIONS = (
+    "당신은 학습 도우미입니다. 제출 코드와 피드백을 바탕으로 "
+    "학생이 이 문제를 틀린 핵심 이유를 50자 이내로 간결하게 요약하세요.\n"
+)
+
+
+def is_concept_problem(problem: Problem) -> bool:
+    return problem.problem_type in CONCEPT_TYPES
+
+
+def render_problem_context(problem: Problem, schema: bool = True, samples: bool = True) -> str:
+    """문제별 고정 접두어의 문제 부분을 렌더링합니다.
+
+    스키마/샘플은 압축 렌더링하고, 비어 있으면 줄 자체를 생략합니다.
+    """
+    context = f"(출제자)문제: {problem.body}\n"
+    if schema and problem.schema:
+        context += f"(출제자)스키마: {compact_schema(problem.schema)}\n"
+    if samples and problem.sample_rows:
+        context += f"(출제자)샘플데이터:\n{compact_sample_rows(problem.sample_rows)}\n"
+    if problem.reference:
+        context += f"(출제자)참고답안:\n{problem.reference}\n"
+    return context
+
+
+def build_feedback_prompts(
+    problem: Problem, code: str
+) -> Tuple[str, str, GenerationProfile]:
+    """문제 유형에 맞는 피드백 프롬프트와 생성 프로필을 반환합니다.
+
+    Returns:
+        Tuple[str, str, GenerationProfile]: (system_prompt, user_prompt, profile)
+    """
+    # 빈칸채우기 또는 개념문제인 경우 다른 프롬프트 사용
+    if is_concept_problem(problem):
+        profile = get_profile("concept_feedback")
+        system_prompt = CONCEPT_FEEDBACK_INSTRUCTIONS + render_problem_context(problem, schema=False, samples=False)
+        answer = truncate_text(code, profile.max_submission_chars)
+        user_prompt = f"(사용자)답변: {answer}\n"
+    else:
+        # 일반 코딩 문제
+        profile = get_profile("coding_feedback")
+        system_prompt = CODING_FEEDBACK_INSTRUCTIONS + render_problem_context(problem)
+        answer = truncate_text(code, profile.max_submission_chars)
+        user_prompt = f"(사용자)답변:```{answer}\n```\n"
+
+    return system_prompt, user_prompt, profile
+
+
+def build_verdict_prompts(
+    problem: Problem, code: str
+) -> Tuple[str, str, GenerationProfile]:
+    """빠른 모델용 정답/오답 판정 프롬프트를 반환합니다."""
+    profile = get_profile("verdict")
+    system_prompt = VERDICT_INSTRUCTIONS + render_problem_context(problem, samples=False)
+    user_prompt = f"(사용자)답변:\n{truncate_text(code, profile.max_submission_chars)}"
+    return system_prompt, user_prompt, profile
+
+
+# 판정 줄 맨 앞의 "정답"/"오답" 토큰. 꾸밈(**, #, 따옴표, "판정:")은 건너뛰고,
+# 토큰에 붙은 한글(suffix)은 따로 받아 "정답입니다"와 "정답이 아닙니다"를 구분합니다.
+_VERDICT_HEAD = re.compile(r"^[\s*#>\"'`\[(]*(?:판정\s*[:：]\s*)?[*\"'`]*(정답|오답)([가-힣]*)")
+_VERDICT_SUFFIXES = ("", "입니다", "임")
+# "정답이 아닙니다", "정답 아님", "정답은 아닙니다" 처럼 토큰을 부정하는 표현
+_VERDICT_NEGATION = re.compile(r"^(?:이|은|는|가)?\s*(?:아님|아니|아닙|아닌)")
+_VERDICT_BADGES = {"정답": "✅ **정답**", "오답": "❌ **오답**"}
+_VERDICT_OPPOSITE = {"정답": "오답", "오답": "정답"}
+
+
+def format_verdict(reply: str) -> str:
+    """빠른 모델의 응답을 판정 배지와 코멘트로 정리합니다.
+
+    첫 줄이 "정답"/"오답" 토큰으로 시작해야 판정으로 봅니다. 부정 표현을 먼저 확인해
+    "정답이 아닙니다"는 오답으로, 토큰 뒤에 다른 말이 붙은 "정답률은..." 같은 줄은 판정 불가로 둡니다.
+    """
+    lines = [line.strip() for line in reply.strip().splitlines() if line.strip()]
+    if not lines:
+        return "❔ **판정 불가**"
+
+    head = lines[0]
+    # 이유는 둘째 줄 한 문장만 (중단 시퀀스 없이 받으므로 뒤에 덧붙인 말은 버림)
+    note = lines[1] if len(lines) > 1 else ""
+    match = _VERDICT_HEAD.match(head)
+    if match is None:
+        # 형식을 따르지 않은 응답은 통째로 코멘트로 표시
+        return f"❔ **판정 불가** — {reply.strip()}"
+
+    keyword, suffix = match.groups()
+    rest = head[match.end():]
+    negation = _VERDICT_NEGATION.match(suffix + rest)
+    if negation:
+        keyword = _VERDICT_OPPOSITE[keyword]
+        rest = (suffix + rest)[negation.end():]
+        rest = re.sub(r"^[가-힣]*", "", rest)  # "아닙니다", "아니다" 등의 나머지 어미
+    elif suffix not in _VERDICT_SUFFIXES:
+        return f"❔ **판정 불가** — {reply.strip()}"
+
+    # "정답: 이유" 처럼 한 줄에 함께 쓴 경우
+    rest = rest.lstrip(" :：-—.,!*\"'`)]")
+    note = f"{rest} {note}".strip()
+    badge = _VERDICT_BADGES[keyword]
+    return f"{badge} — {note}" if note else badge
+
+
+def build_hint_summary_prompts(
+    problem: Problem, code: str, feedback: str
+) -> Tuple[str, str, GenerationProfile]:
+    """오답노트 재도전 힌트(50자 요약)용 프롬프트를 반환합니다."""
+    profile = get_profile("hint_summary")
+    system_prompt = HINT_SUMMARY_INSTRUCTIONS + render_problem_context(problem, schema=False, samples=False)
+    user_prompt = (
+        f"제출 코드: {truncate_text(code, profile.max_submission_chars)}\n"
+        f"피드백: {truncate_text(feedback, profile.max_submission_chars)}\n"
+    )
+    return system_prompt, user_prompt, profile
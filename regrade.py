@@ -0,0 +1,449 @@
+"""오답노트 기록 일괄 재채점.
+
+모델이나 피드백 프롬프트(build_feedback_prompts)를 바꾼 뒤, 쌓여 있는 기록을 UI에서 하나씩
+다시 제출하지 않고 한꺼번에 다시 채점합니다.
+
+- 오답노트를 파일(세그먼트) 하나씩 읽어 흘려보내고(iter_attempts), 문제 은행에서 문제를 찾아
+  지금의 프롬프트로 다시 만듭니다. 문제 은행에서 사라진 문제의 기록은 건너뜁니다.
+- 엔드포인트마다 --concurrency개의 작업자가 공유 대기열에서 기록을 가져가므로
+  빠른 서버가 더 많이 처리합니다. 대기열 크기가 작업자 수의 두 배라 메모리 사용량이 일정합니다.
+- 기본 대상은 UI와 같은 설정(configured_models)입니다. 상세 해설은 큰 모델에,
+  cascade 모드의 빠른 판정은 빠른 모델(LM_STUDIO_FAST_ENDPOINT/LM_STUDIO_FAST_MODEL)에 보내고,
+  문제마다 판정/해설 여부는 UI처럼 캐스케이드 라우팅(LLM_CASCADE_ROUTES)으로 정합니다.
+- 실행마다 data/regrade/v<N>/ 새 디렉터리에 씁니다.
+    meta.json      모드, 엔드포인트(해설/판정), 프롬프트 digest
+    results.jsonl  기록별 결과 (체크포인트 겸용)
+    summary-<n>.json  실행(이어서 하기 포함)마다 하나씩 남기는 처리량과 지연 통계
+- 중단된 실행은 --resume v<N>으로 이어서 합니다. results.jsonl에 이미 있는 기록은 건너뛰고,
+  실패한 요청은 결과에 남기지 않으므로 이어서 할 때 다시 시도합니다.
+  기록 키(regrade_key)는 오답노트 키에 제출 코드와 피드백의 digest를 붙인 것이라,
+  같은 분에 저장된 서로 다른 기록도 각각 채점합니다.
+
+사용법 (저장소 루트에서):
+    python regrade.py run                           # 설정된 엔드포인트로 전체 기록 재채점
+    python regrade.py run --mode cascade --concurrency 8 --limit 100   # 빠른 모델 설정 필요
+    python regrade.py run --endpoint http://127.0.0.1:1234/v1/chat/completions \\
+                          --endpoint http://127.0.0.1:1235/v1/chat/completions
+    python regrade.py run --resume v3               # 중단된 실행 이어서 하기
+    python regrade.py status                        # 실행 목록과 진행 상황
+
+실제 모델 없이 시험할 때는 다른 터미널에서 대역 서버를 띄웁니다.
+    python benchmarks/stub_llm_server.py --port 1234
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+import httpx
+import numpy as np
+
+from llm_client import (
+    FAST_MODEL,
+    FAST_MODEL_ENDPOINT,
+    arequest_llm,
+    configured_models,
+    get_async_client,
+    get_profile,
+    resolve_cascade_mode,
+)
+from problem_bank import find_problem
+from prompts import (
+    CODING_FEEDBACK_INSTRUCTIONS,
+    CONCEPT_FEEDBACK_INSTRUCTIONS,
+    VERDICT_INSTRUCTIONS,
+    build_feedback_prompts,
+    build_verdict_prompts,
+    format_verdict,
+)
+from review_scheduler import attempt_note_key
+from wrong_notes import Attempt, iter_attempts
+
+REGRADE_DIR = Path("data/regrade")
+REGRADE_MODES = ("feedback", "cascade")  # cascade: 캐스케이드 라우팅대로 빠른 판정 + 상세 해설
+REGRADE_RETRY_DELAYS = (1.0, 2.0)  # 실패한 요청을 다시 보내기 전 대기 시간(초), 길이가 곧 다시 시도 횟수
+PROGRESS_EVERY = 50  # 처리한 기록이 이만큼 늘 때마다 진행 상황 출력
+
+_RUN_NAME = re.compile(r"^v(\d+)$")
+_SUMMARY_NAME = re.compile(r"^summary-(\d+)\.json$")
+
+
+@dataclass(frozen=True)
+class RegradeTarget:
+    """재채점 요청을 보낼 (endpoint, model)입니다."""
+    endpoint: str
+    model: str
+
+
+def default_targets() -> List[RegradeTarget]:
+    """설정된 큰 모델입니다. (configured_models의 첫 항목, UI의 상세 해설과 같은 대상)"""
+    endpoint, model = configured_models()[0]
+    return [RegradeTarget(endpoint, model)]
+
+
+def default_verdict_target() -> Optional[RegradeTarget]:
+    """설정된 빠른 모델입니다. (UI의 build_verdict와 같은 대상) 없으면 None."""
+    return RegradeTarget(FAST_MODEL_ENDPOINT, FAST_MODEL) if FAST_MODEL else None
+
+
+@dataclass
+class RegradeStats:
+    """이번 실행의 집계입니다. 지연은 기록 하나를 채점하는 데 걸린 시간(ms)입니다."""
+    graded: int = 0
+    resumed: int = 0        # 이전 실행에서 이미 채점해 건너뛴 기록
+    missing: int = 0        # 문제 은행에서 문제를 찾지 못해 건너뛴 기록
+    errors: int = 0         # 다시 시도해도 실패한 기록 (결과에 남기지 않음)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # endpoint -> 지연 목록
+
+    def add(self, target: RegradeTarget, latency_ms: float) -> None:
+        self.graded += 1
+        self.latencies.setdefault(target.endpoint, []).append(latency_ms)
+
+    def summary(self, elapsed: float) -> Dict[str, object]:
+        every = [ms for values in self.latencies.values() for ms in values]
+        return {
+            "graded": self.graded,
+            "resumed": self.resumed,
+            "missing": self.missing,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(self.graded / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency_ms": latency_summary(every),
+            "endpoints": {endpoint: latency_summary(values) for endpoint, values in self.latencies.items()},
+        }
+
+
+def latency_summary(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    array = np.asarray(values, dtype=np.float64)
+    return {
+        "count": int(array.size),
+        "mean": round(float(array.mean()), 1),
+        "p50": round(float(np.percentile(array, 50)), 1),
+        "p95": round(float(np.percentile(array, 95)), 1),
+        "max": round(float(array.max()), 1),
+    }
+
+
+def prompt_digest() -> str:
+    """재채점 결과에 영향을 주는 지시문과 생성 프로필의 digest입니다. 이어서 할 때 같은지 확인합니다."""
+    parts = [CODING_FEEDBACK_INSTRUCTIONS, CONCEPT_FEEDBACK_INSTRUCTIONS, VERDICT_INSTRUCTIONS]
+    parts += [repr(get_profile(name)) for name in ("coding_feedback", "concept_feedback", "verdict")]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# ----- 실행 디렉터리 -----
+def run_dirs(root: Path = REGRADE_DIR) -> List[Path]:
+    """v<N> 실행 디렉터리를 번호 순으로 반환합니다."""
+    if not root.exists():
+        return []
+    runs = [path for path in root.iterdir() if path.is_dir() and _RUN_NAME.match(path.name)]
+    return sorted(runs, key=lambda path: int(_RUN_NAME.match(path.name).group(1)))
+
+
+def next_run_dir(root: Path = REGRADE_DIR) -> Path:
+    runs = run_dirs(root)
+    number = int(_RUN_NAME.match(runs[-1].name).group(1)) + 1 if runs else 1
+    return root / f"v{number}"
+
+
+def summary_paths(run_dir: Path) -> List[Path]:
+    """실행 디렉터리의 summary-<n>.json을 번호 순으로 반환합니다. (--resume마다 하나씩 늘어남)"""
+    paths = [path for path in run_dir.glob("summary-*.json") if _SUMMARY_NAME.match(path.name)]
+    return sorted(paths, key=lambda path: int(_SUMMARY_NAME.match(path.name).group(1)))
+
+
+def next_summary_path(run_dir: Path) -> Path:
+    paths = summary_paths(run_dir)
+    number = int(_SUMMARY_NAME.match(paths[-1].name).group(1)) + 1 if paths else 1
+    return run_dir / f"summary-{number}.json"
+
+
+def _write_json(path: Path, data: Dict[str, object]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load_done_keys(results_path: Path) -> Set[str]:
+    """이미 채점한 기록의 키입니다. 중단되며 잘린 마지막 줄은 잘라내 이어 쓸 수 있게 합니다."""
+    if not results_path.exists():
+        return set()
+    data = results_path.read_bytes()
+    end = data.rfind(b"\n") + 1
+    if end < len(data):
+        with results_path.open("r+b") as f:
+            f.truncate(end)
+    keys: Set[str] = set()
+    for line in data[:end].splitlines():
+        try:
+            keys.add(json.loads(line)["key"])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return keys
+
+
+def regrade_key(attempt: Attempt) -> str:
+    """재채점 결과의 기록 키입니다.
+
+    오답노트 키(attempt_note_key)는 분 단위 시각이라 같은 분에 저장된 기록끼리 겹치므로
+    제출 코드와 피드백의 digest를 붙입니다. 둘 다 같은 기록은 같은 입력이라 한 번만 채점합니다.
+    """
+    content = f"{attempt.text('submitted') or attempt.text('code')}\0{attempt.text('feedback')}"
+    return f"{attempt_note_key(attempt)}:{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}"
+
+
+# ----- 채점 -----
+async def _request(target: RegradeTarget, system_prompt: str, user_prompt: str, profile) -> str:
+    for delay in REGRADE_RETRY_DELAYS:
+        try:
+            return await arequest_llm(system_prompt, user_prompt, target.endpoint, profile, target.model)
+        except (httpx.HTTPError, KeyError, ValueError, IndexError):
+            await asyncio.sleep(delay)
+    return await arequest_llm(system_prompt, user_prompt, target.endpoint, profile, target.model)
+
+
+async def grade_attempt(attempt: Attempt, target: RegradeTarget, mode: str,
+                        verdict_target: Optional[RegradeTarget] = None) -> Optional[Dict[str, object]]:
+    """기록 하나를 지금의 프롬프트로 다시 채점합니다. 문제를 찾지 못하면 None.
+
+    cascade 모드에서는 UI처럼 문제마다 캐스케이드 모드를 정해, 빠른 판정은 verdict_target에,
+    상세 해설은 target에 보냅니다. (verdict_only 문제는 해설 없이 판정만)
+    """
+    problem = find_problem(attempt.source_file, attempt.pid)
+    if problem is None:
+        return None
+    code = attempt.text("submitted") or attempt.text("code")
+    route = "single"
+    if mode == "cascade" and verdict_target is not None:
+        route = resolve_cascade_mode(problem.problem_type, problem.difficulty, fast_model=verdict_target.model)
+
+    started = time.perf_counter()
+    verdict = feedback = ""
+    if route in ("cascade", "verdict_only"):
+        verdict = format_verdict(await _request(verdict_target, *build_verdict_prompts(problem, code)))
+    if route != "verdict_only":
+        feedback = await _request(target, *build_feedback_prompts(problem, code))
+    return {
+        "key": regrade_key(attempt),
+        "source_file": attempt.source_file,
+        "pid": attempt.pid,
+        "nickname": attempt.nickname,
+        "timestamp": attempt.timestamp,
+        "previous_score": attempt.score,
+        "route": route,
+        "endpoint": target.endpoint,
+        "model": target.model,
+        "verdict": verdict,
+        "feedback": feedback,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def select_attempts(source_file: Optional[str] = None) -> Iterator[Attempt]:
+    for attempt in iter_attempts():
+        if source_file is None or attempt.source_file == source_file:
+            yield attempt
+
+
+async def regrade(run_dir: Path, targets: Sequence[RegradeTarget], mode: str, concurrency: int,
+                  limit: Optional[int] = None, source_file: Optional[str] = None,
+                  verdict_target: Optional[RegradeTarget] = None) -> Dict[str, object]:
+    """run_dir에 결과를 이어 쓰며 재채점합니다. 이번 실행의 요약을 반환합니다.
+
+    targets는 상세 해설을 보낼 대상(작업자를 나누는 단위)이고, cascade 모드의 빠른 판정은
+    모두 verdict_target에 보냅니다.
+    """
+    results_path = run_dir / "results.jsonl"
+    done = load_done_keys(results_path)
+    stats = RegradeStats()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency * len(targets))
+    started = time.perf_counter()
+
+    async def produce() -> None:
+        attempts = select_attempts(source_file)
+        queued = 0
+        while limit is None or queued < limit:
+            # 파일을 읽고 파싱하는 동안 작업자가 멈추지 않도록 스레드에서 다음 기록을 꺼냄
+            attempt = await asyncio.to_thread(next, attempts, None)
+            if attempt is None:
+                break
+            key = regrade_key(attempt)
+            if key in done:
+                stats.resumed += 1
+                continue
+            done.add(key)  # 같은 기록이 오답노트에 두 번 있으면 한 번만 채점
+            await queue.put(attempt)
+            queued += 1
+
+    with results_path.open("a", encoding="utf-8") as out:
+        async def work(target: RegradeTarget) -> None:
+            while True:
+                attempt = await queue.get()
+                try:
+                    if attempt is None:
+                        return
+                    try:
+                        record = await grade_attempt(attempt, target, mode, verdict_target)
+                    except (httpx.HTTPError, KeyError, ValueError, IndexError) as exc:
+                        stats.errors += 1
+                        print(f"[경고] 재채점 실패 ({attempt_note_key(attempt)}, {target.endpoint}): {exc}",
+                              file=sys.stderr)
+                        continue
+                    if record is None:
+                        stats.missing += 1
+                        continue
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    stats.add(target, float(record["latency_ms"]))
+                    if stats.graded % PROGRESS_EVERY == 0:
+                        elapsed = time.perf_counter() - started
+                        print(f"  {stats.graded:,}개 채점 ({stats.graded / elapsed:.2f}개/초)")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(work(target)) for target in targets for _ in range(concurrency)]
+        try:
+            await produce()
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await get_async_client().aclose()
+
+    summary = stats.summary(time.perf_counter() - started)
+    summary["total_results"] = len(load_done_keys(results_path))
+    _write_json(next_summary_path(run_dir), summary)
+    return summary
+
+
+# ----- CLI -----
+def _format_summary(summary: Dict[str, object]) -> str:
+    latency = summary["latency_ms"]
+    lines = [
+        f"채점 {summary['graded']:,}개 (이전 실행분 {summary['resumed']:,}개 건너뜀, "
+        f"문제 없음 {summary['missing']:,}개, 실패 {summary['errors']:,}개), 누적 결과 {summary['total_results']:,}개",
+        f"소요 {summary['elapsed_s']}초, 처리량 {summary['throughput_per_s']}개/초",
+    ]
+    if latency.get("count"):
+        lines.append(f"지연(ms): 평균 {latency['mean']}, p50 {latency['p50']}, p95 {latency['p95']}, 최대 {latency['max']}")
+    for endpoint, values in summary["endpoints"].items():
+        lines.append(f"  {endpoint}: {values['count']:,}개, p50 {values['p50']}ms, p95 {values['p95']}ms")
+    return "\n".join(lines)
+
+
+def _run(args: argparse.Namespace) -> int:
+    digest = prompt_digest()
+    if args.resume:
+        run_dir = REGRADE_DIR / args.resume
+        meta_path = run_dir / "meta.json"
+        if not meta_path.exists():
+            print(f"실행을 찾을 수 없습니다: {run_dir}", file=sys.stderr)
+            return 1
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("prompt_digest") != digest and not args.force:
+            print("프롬프트가 이 실행을 시작할 때와 다릅니다. 새 실행으로 시작하거나 --force를 주세요.",
+                  file=sys.stderr)
+            return 1
+        mode = meta["mode"]
+        targets = [RegradeTarget(**target) for target in meta["targets"]]
+        verdict_target = RegradeTarget(**meta["verdict_target"]) if meta.get("verdict_target") else None
+        source_file = meta.get("source_file")
+    else:
+        mode = args.mode
+        source_file = args.source_file
+        targets = default_targets()
+        if args.endpoint or args.model:
+            targets = [RegradeTarget(endpoint, args.model or targets[0].model)
+                       for endpoint in (args.endpoint or [targets[0].endpoint])]
+        verdict_target = None
+        if mode == "cascade":
+            verdict_target = default_verdict_target()
+            if args.verdict_endpoint or args.verdict_model:
+                base = verdict_target or RegradeTarget(FAST_MODEL_ENDPOINT, "")
+                verdict_target = RegradeTarget(args.verdict_endpoint or base.endpoint,
+                                               args.verdict_model or base.model)
+            if verdict_target is None or not verdict_target.model:
+                print("cascade 모드에는 빠른 모델이 필요합니다. LM_STUDIO_FAST_MODEL 또는 --verdict-model을 지정하세요.",
+                      file=sys.stderr)
+                return 1
+        run_dir = next_run_dir()
+        run_dir.mkdir(parents=True)
+        _write_json(run_dir / "meta.json", {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "mode": mode,
+            "targets": [{"endpoint": t.endpoint, "model": t.model} for t in targets],
+            "verdict_target": {"endpoint": verdict_target.endpoint, "model": verdict_target.model}
+            if verdict_target else None,
+            "prompt_digest": digest,
+            "source_file": source_file,
+        })
+
+    print(f"{run_dir.name}: {mode} 모드, 엔드포인트 {len(targets)}개 x 동시 {args.concurrency}개")
+    if verdict_target is not None:
+        print(f"  빠른 판정: {verdict_target.endpoint} ({verdict_target.model})")
+    summary = asyncio.run(regrade(run_dir, targets, mode, args.concurrency, args.limit, source_file,
+                                  verdict_target))
+    print(_format_summary(summary))
+    print(f"결과: {run_dir / 'results.jsonl'}")
+    return 1 if summary["errors"] else 0
+
+
+def _status() -> int:
+    runs = run_dirs()
+    if not runs:
+        print("재채점 실행이 없습니다.")
+    for run_dir in runs:
+        meta = json.loads((run_dir / "meta.json").read_text(encoding="utf-8"))
+        results = len(load_done_keys(run_dir / "results.jsonl"))
+        line = f"{run_dir.name}: {meta['created']}, {meta['mode']}, 결과 {results:,}개, 프롬프트 {meta['prompt_digest']}"
+        summaries = [json.loads(path.read_text(encoding="utf-8")) for path in summary_paths(run_dir)]
+        if summaries:
+            # 이어서 한 실행은 남은 기록만 채점하므로 처리량은 모든 실행을 합쳐 계산합니다
+            graded = sum(summary["graded"] for summary in summaries)
+            elapsed = sum(summary["elapsed_s"] for summary in summaries)
+            throughput = round(graded / elapsed, 3) if elapsed > 0 else 0.0
+            line += (f", {len(summaries)}회 실행 평균 {throughput}개/초"
+                     f" (마지막 실행 실패 {summaries[-1]['errors']}개)")
+        print(line)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오답노트 기록 일괄 재채점")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="새 실행으로 재채점 (또는 --resume으로 이어서)")
+    p_run.add_argument("--mode", choices=REGRADE_MODES, default="feedback", help="feedback: 상세 해설만, cascade: 빠른 판정 포함")
+    p_run.add_argument("--endpoint", action="append", help="상세 해설 엔드포인트 (여러 번 지정 가능, 기본: LM_STUDIO_ENDPOINT)")
+    p_run.add_argument("--model", help="상세 해설 요청에 넣을 모델 이름 (기본: LM_STUDIO_MODEL)")
+    p_run.add_argument("--verdict-endpoint", help="cascade 모드의 빠른 판정 엔드포인트 (기본: LM_STUDIO_FAST_ENDPOINT)")
+    p_run.add_argument("--verdict-model", help="cascade 모드의 빠른 판정 모델 이름 (기본: LM_STUDIO_FAST_MODEL)")
+    p_run.add_argument("--concurrency", type=int, default=4, help="엔드포인트별 동시 요청 수")
+    p_run.add_argument("--limit", type=int, help="이번 실행에서 채점할 최대 기록 수")
+    p_run.add_argument("--source-file", help="이 문제 파일의 기록만 재채점 (예: problems.json)")
+    p_run.add_argument("--resume", metavar="vN", help="중단된 실행 이어서 하기 (모드/엔드포인트는 그 실행의 것을 사용)")
+    p_run.add_argument("--force", action="store_true", help="프롬프트가 바뀌었어도 이어서 하기")
+    sub.add_parser("status", help="실행 목록과 진행 상황")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        return _status()
+    if args.concurrency < 1:
+        parser.error("--concurrency는 1 이상이어야 합니다.")
+    return _run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
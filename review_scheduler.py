@@ -0,0 +1,354 @@
+"""오답노트 복습 일정 (SM-2 간격 반복).
+
+(source_file, pid)마다 복습 카드(난이도 계수, 간격, 반복 횟수, 다음 복습 시각)를 두고,
+다음 복습 시각 순의 힙으로 "지금 복습할 문제"를 O(log n)에 꺼냅니다.
+
+- 오답노트에 기록이 저장될 때마다 해당 카드만 갱신합니다. (점수 → SM-2 품질 0~5)
+- 복습으로 불러온 문제를 제출하면 판정으로 카드를 갱신합니다. (정답 4, 오답 1)
+  판정을 받지 못한 제출은 카드를 바꾸지 않습니다.
+- 카드 변경과 삭제(기록이나 문제가 없어진 카드)는 data/review/journal.jsonl에 한 줄씩 덧붙이고,
+  REVIEW_COMPACT_LINES줄을 넘으면 스냅샷(data/review/queue.json)을 힙 순서로 다시 쓰고 저널을 비웁니다.
+- 힙은 지연 삭제 방식입니다. 카드가 바뀌면 새 항목을 넣고, 꺼낼 때 낡은 항목을 버립니다.
+
+사용법 (저장소 루트에서):
+    python review_scheduler.py status
+    python review_scheduler.py next       # 지금 복습할 문제
+    python review_scheduler.py rebuild    # 오답노트 전체 기록으로 다시 만들기
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from wrong_notes import PASS_SCORE, Attempt, note_key, scan_attempt_fields
+
+REVIEW_DIR = Path("data/review")
+REVIEW_COMPACT_LINES = int(os.getenv("REVIEW_COMPACT_LINES", "500"))
+REVIEW_VERSION = 1
+
+DAY_SECONDS = 24 * 60 * 60
+EASE_DEFAULT = 2.5
+EASE_MIN = 1.3
+QUALITY_PASS = 3  # 이 미만이면 반복 횟수를 0으로 되돌리고 하루 뒤 다시 복습
+
+
+@dataclass
+class ReviewCard:
+    """문제 하나의 복습 상태입니다.
+
+    Attributes:
+        source_file / pid: 문제 식별자
+        ease: SM-2 난이도 계수 (EASE_MIN 이상)
+        interval: 현재 복습 간격 (일)
+        repetitions: 연속으로 통과한 복습 횟수
+        lapses: 통과하지 못한 횟수 (오답노트 저장 포함)
+        due: 다음 복습 시각 (epoch 초)
+        last_key: 복습 시 불러올 최근 오답 기록의 복합 키 (source_file:pid:nickname:timestamp)
+    """
+    source_file: str
+    pid: str
+    ease: float = EASE_DEFAULT
+    interval: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+    due: float = 0.0
+    last_key: str = ""
+
+    @property
+    def key(self) -> str:
+        return note_key(self.source_file, self.pid)
+
+
+_CARD_FIELDS = {f.name for f in fields(ReviewCard)}
+
+
+def quality_from_score(score: float) -> int:
+    """채점 점수(0~100)를 SM-2 품질(0~5)로 바꿉니다."""
+    return max(0, min(5, int(round(float(score) / 20))))
+
+
+def apply_sm2(card: ReviewCard, quality: int, now: float) -> ReviewCard:
+    """SM-2 규칙으로 간격/계수/다음 복습 시각을 갱신합니다."""
+    if quality < QUALITY_PASS:
+        card.repetitions = 0
+        card.interval = 1.0
+        card.lapses += 1
+    else:
+        card.repetitions += 1
+        if card.repetitions == 1:
+            card.interval = 1.0
+        elif card.repetitions == 2:
+            card.interval = 6.0
+        else:
+            card.interval = round(card.interval * card.ease, 1)
+    card.ease = max(EASE_MIN, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    card.due = now + card.interval * DAY_SECONDS
+    return card
+
+
+def attempt_time(timestamp: str, default: float) -> float:
+    """'YYYY-MM-DD HH:MM (요일)' 형식의 기록 시각을 epoch 초로 바꿉니다. 읽을 수 없으면 default."""
+    try:
+        return datetime.strptime(timestamp[:16], "%Y-%m-%d %H:%M").timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+def attempt_note_key(attempt: Attempt) -> str:
+    """load_from_notes가 받는 복합 키입니다."""
+    return f"{attempt.source_file}:{attempt.pid}:{attempt.nickname}:{attempt.timestamp}"
+
+
+class ReviewQueue:
+    """복습 카드와 다음 복습 시각 순의 힙입니다."""
+
+    def __init__(self, root: Path | str = REVIEW_DIR, compact_lines: int = REVIEW_COMPACT_LINES):
+        self.root = Path(root)
+        self.compact_lines = compact_lines
+        self.cards: Dict[str, ReviewCard] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._journal_lines = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self.root / "queue.json"
+
+    @property
+    def journal_path(self) -> Path:
+        return self.root / "journal.jsonl"
+
+    # ----- 저장/불러오기 -----
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.snapshot_path.exists() and not self.journal_path.exists():
+            # 처음 쓰는 경우: 지금까지의 오답노트 기록으로 만듭니다
+            self._rebuild_locked(_scan_note_rows())
+            return
+        cards: Dict[str, ReviewCard] = {}
+        if self.snapshot_path.exists():
+            try:
+                data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+                for item in data.get("cards", []):
+                    card = ReviewCard(**{k: v for k, v in item.items() if k in _CARD_FIELDS})
+                    cards[card.key] = card
+            except (OSError, ValueError, TypeError) as exc:
+                print(f"[경고] 복습 일정 스냅샷을 읽지 못했습니다: {exc}", file=sys.stderr)
+        if self.journal_path.exists():
+            with self.journal_path.open(encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    self._journal_lines += 1
+                    try:
+                        item = json.loads(line)
+                        if item.get("deleted"):
+                            cards.pop(note_key(item["source_file"], item["pid"]), None)
+                            continue
+                        card = ReviewCard(**{k: v for k, v in item.items() if k in _CARD_FIELDS})
+                    except (ValueError, TypeError, KeyError):
+                        continue  # 쓰는 도중 끊긴 마지막 줄
+                    cards[card.key] = card
+        self.cards = cards
+        self._heap = [(card.due, key) for key, card in cards.items()]
+        heapq.heapify(self._heap)
+
+    def _save_card_locked(self, card: ReviewCard) -> None:
+        self._journal_locked(asdict(card))
+
+    def _journal_locked(self, item: Dict[str, object]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self._journal_lines += 1
+        if self._journal_lines >= self.compact_lines:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """낡은 힙 항목을 버리고 스냅샷을 힙 순서로 다시 쓴 뒤 저널을 비웁니다."""
+        self._heap = [(due, key) for due, key in self._heap
+                      if key in self.cards and self.cards[key].due == due]
+        heapq.heapify(self._heap)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        payload = {"version": REVIEW_VERSION, "cards": [asdict(self.cards[key]) for _, key in self._heap]}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.snapshot_path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_lines = 0
+
+    def compact(self) -> None:
+        with self._lock:
+            self._load_locked()
+            self._compact_locked()
+
+    # ----- 갱신 -----
+    def _update_locked(self, source_file: str, pid: str, quality: int, now: float,
+                       last_key: Optional[str] = None) -> ReviewCard:
+        self._load_locked()
+        key = note_key(source_file, pid)
+        card = self.cards.get(key) or ReviewCard(source_file=source_file, pid=pid)
+        apply_sm2(card, quality, now)
+        if last_key:
+            card.last_key = last_key
+        self.cards[key] = card
+        heapq.heappush(self._heap, (card.due, key))
+        return card
+
+    def record_attempt(self, attempt: Attempt, now: Optional[float] = None) -> Optional[ReviewCard]:
+        """오답노트에 저장된 기록으로 카드를 갱신합니다.
+
+        복습할 오답 기록이 없는 문제(합격 점수 이상의 기록만 있는 경우)는 카드를 만들지 않고 None.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load_locked()
+            card = self._apply_attempt_locked(attempt, now)
+            if card is not None:
+                self._save_card_locked(card)
+            return card
+
+    def _apply_attempt_locked(self, attempt: Attempt, now: float) -> Optional[ReviewCard]:
+        last_key = attempt_note_key(attempt) if attempt.score < PASS_SCORE else None
+        existing = self.cards.get(note_key(attempt.source_file, attempt.pid))
+        if existing is None and last_key is None:
+            return None
+        if existing is not None and last_key and existing.last_key == last_key:
+            return None  # 이미 반영된 기록 (처음 불러올 때 오답노트에서 만든 경우 등)
+        return self._update_locked(attempt.source_file, attempt.pid,
+                                   quality_from_score(attempt.score), now, last_key)
+
+    def record_review(self, source_file: str, pid: str, quality: int,
+                      now: Optional[float] = None) -> Optional[ReviewCard]:
+        """복습 결과로 카드를 갱신합니다. 카드가 없는 문제면 None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load_locked()
+            if note_key(source_file, pid) not in self.cards:
+                return None
+            card = self._update_locked(source_file, pid, quality, now)
+            self._save_card_locked(card)
+            return card
+
+    def remove(self, source_file: str, pid: str) -> bool:
+        """카드를 일정에서 뺍니다. (기록이나 문제가 없어진 경우) 카드가 있었으면 True.
+
+        저널에 삭제 줄을 남기고, 힙의 항목은 꺼낼 때 버립니다.
+        """
+        with self._lock:
+            self._load_locked()
+            if self.cards.pop(note_key(source_file, pid), None) is None:
+                return False
+            self._journal_locked({"source_file": source_file, "pid": pid, "deleted": True})
+            return True
+
+    # ----- 조회 -----
+    def _head_locked(self) -> Optional[ReviewCard]:
+        self._load_locked()
+        while self._heap:
+            due, key = self._heap[0]
+            card = self.cards.get(key)
+            if card is not None and card.due == due:
+                return card
+            heapq.heappop(self._heap)  # 갱신되어 낡은 항목
+        return None
+
+    def peek(self) -> Optional[ReviewCard]:
+        """다음 복습 시각이 가장 이른 카드입니다. (아직 때가 아니어도 반환)"""
+        with self._lock:
+            return self._head_locked()
+
+    def next_due(self, now: Optional[float] = None) -> Optional[ReviewCard]:
+        """지금 복습할 카드입니다. 복습할 때가 된 카드가 없으면 None."""
+        now = time.time() if now is None else now
+        card = self.peek()
+        return card if card is not None and card.due <= now else None
+
+    def stats(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """(카드 수, 지금 복습할 카드 수)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load_locked()
+            return len(self.cards), sum(1 for card in self.cards.values() if card.due <= now)
+
+    def rebuild(self, attempts: List[Dict[str, object]]) -> int:
+        """오답노트 기록(오래된 순)으로 카드를 처음부터 다시 만들고 스냅샷을 씁니다."""
+        with self._lock:
+            self._loaded = True
+            self._rebuild_locked(attempts)
+            return len(self.cards)
+
+    def _rebuild_locked(self, attempts: List[Dict[str, object]]) -> None:
+        self.cards = {}
+        self._heap = []
+        now = time.time()
+        for row in attempts:
+            attempt = Attempt(**{**_EMPTY_ATTEMPT, **row})
+            self._apply_attempt_locked(attempt, attempt_time(attempt.timestamp, now))
+        self._compact_locked()
+
+
+_EMPTY_ATTEMPT = dict(pid="", title="", difficulty="", score=0, status="", submitted="", feedback="",
+                      improvement="", reasoning="", question="", code="", kind="", timestamp="")
+
+
+def _scan_note_rows() -> List[Dict[str, object]]:
+    return scan_attempt_fields(("pid", "source_file", "nickname", "timestamp", "score"), max_score=None)
+
+
+REVIEW_QUEUE = ReviewQueue()
+
+
+def rebuild_review_queue(queue: ReviewQueue = REVIEW_QUEUE) -> int:
+    """오답노트 전체 기록으로 복습 일정을 다시 만듭니다. 카드 수를 반환합니다."""
+    return queue.rebuild(_scan_note_rows())
+
+
+def format_due(card: ReviewCard, now: Optional[float] = None) -> str:
+    """다음 복습 시각을 '오늘'/'N일 후'와 함께 표시합니다."""
+    now = time.time() if now is None else now
+    when = datetime.fromtimestamp(card.due).strftime("%Y-%m-%d %H:%M")
+    days = (card.due - now) / DAY_SECONDS
+    return f"{when} (지금)" if days <= 0 else f"{when} ({days:.1f}일 후)"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오답노트 복습 일정 (SM-2)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="카드 수와 지금 복습할 문제 수")
+    sub.add_parser("next", help="지금 복습할 문제")
+    sub.add_parser("rebuild", help="오답노트 전체 기록으로 다시 만들기")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        print(f"복습 카드 {rebuild_review_queue()}개를 만들었습니다.")
+        return 0
+
+    if args.command == "status":
+        total, due = REVIEW_QUEUE.stats()
+        print(f"복습 카드 {total}개, 지금 복습할 문제 {due}개")
+        return 0
+
+    card = REVIEW_QUEUE.peek()
+    if card is None:
+        print("복습 카드가 없습니다. (python review_scheduler.py rebuild)")
+        return 1
+    print(f"{card.key} | 다음 복습 {format_due(card)} | 간격 {card.interval}일, 계수 {card.ease:.2f}, "
+          f"연속 통과 {card.repetitions}회, 실패 {card.lapses}회")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+# 이벤트 스케줄링 설정
+# - grading: LLM을 호출하는 제출/상세 해설/오답노트 추가 이벤트. 모델 서버가 감당할 수 있는
+#   수만큼만 동시에 실행하고 나머지는 대기열에서 기다립니다.
+# - ui: 상태/화면만 바꾸는 가벼운 이벤트. 한도 없이 즉시 실행되어 채점 대기열 뒤에 서지 않습니다.
+GRADING_CONCURRENCY_LIMIT = int(os.getenv("GRADING_CONCURRENCY_LIMIT", "4"))
+
+
+class Lane:
+    """동시 실행 한도와 대기열 지표를 가진 이벤트 그룹입니다.
+
+    Gradio의 concurrency_limit 대신 직접 세마포어로 한도를 걸어
+    그룹별 대기 수/실행 수/평균 대기 시간을 측정할 수 있게 합니다.
+
+    Attributes:
+        name: 그룹 이름 (Gradio concurrency_id로도 사용)
+        limit: 동시 실행 한도 (None이면 무제한)
+    """
+
+    def __init__(self, name: str, limit: Optional[int] = None):
+        self.name = name
+        self.limit = limit
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.max_waiting = 0
+        self.total_wait = 0.0
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def event_kwargs(self) -> Dict[str, Any]:
+        """이벤트 리스너 등록 시 넘길 Gradio 인자입니다.
+
+        한도는 Lane이 직접 관리하므로 Gradio 쪽은 무제한으로 둡니다.
+        """
+        return {"concurrency_limit": None, "concurrency_id": self.name}
+
+    def is_saturated(self) -> bool:
+        return self.limit is not None and self.running >= self.limit
+
+    def _enter_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def _leave_wait(self, started: float, acquired: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.running += 1
+                self.total_wait += time.perf_counter() - started
+
+    def _start(self) -> None:
+        with self._lock:
+            self.running += 1
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """그룹의 실행 슬롯 하나를 차지합니다. 한도가 찼으면 빌 때까지 기다립니다."""
+        started = time.perf_counter()
+        self._enter_wait()
+        semaphore = None
+        try:
+            if self.limit is not None:
+                if self._semaphore is None:
+                    self._semaphore = asyncio.Semaphore(self.limit)
+                semaphore = self._semaphore
+                await semaphore.acquire()
+        except BaseException:
+            # 대기 중 연결이 끊겨 취소된 경우
+            self._leave_wait(started, acquired=False)
+            raise
+        self._leave_wait(started, acquired=True)
+        try:
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            self._finish()
+
+    def track(self, fn: Callable) -> Callable:
+        """한도 없는 그룹의 핸들러를 감싸 실행 수/완료 수만 집계합니다.
+
+        functools.wraps로 시그니처를 유지하므로 Gradio의 입력 매칭에 영향이 없습니다.
+        """
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                self._start()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self._finish()
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            self._start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._finish()
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "running": self.running,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "completed": self.completed,
+                "avg_wait_ms": (self.total_wait / started * 1000) if started else 0.0,
+            }
+
+
+GRADING_LANE = Lane("grading", GRADING_CONCURRENCY_LIMIT)
+UI_LANE = Lane("ui", None)
+LANES: List[Lane] = [GRADING_LANE, UI_LANE]
+
+
+def format_lane_metrics(lanes: Optional[List[Lane]] = None) -> str:
+    """그룹별 대기열 지표를 Markdown 표로 반환합니다."""
+    lines = [
+        "| 그룹 | 동시 실행 한도 | 실행 중 | 대기 | 최대 대기 | 완료 | 평균 대기(ms) |",
+        "|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for lane in (LANES if lanes is None else lanes):
+        m = lane.snapshot()
+        limit = "무제한" if m["limit"] is None else m["limit"]
+        lines.append(
+            f"| {m['name']} | {limit} | {m['running']} | {m['waiting']} | "
+            f"{m['max_waiting']} | {m['completed']} | {m['avg_wait_ms']:.0f} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from problem_bank import Problem, changelog_path_for, get_problem_bank
+
+# 전문 검색 인덱스 설정
+# - 한글: 연속된 한글 구간을 글자 2-gram으로 자릅니다. 조사가 붙거나 띄어쓰기가 달라도
+#   "데이터프레임" / "데이터 프레임" 같은 질의가 서로 맞도록 하기 위함입니다. (한 글자 구간은 1-gram)
+# - 영문/숫자: 소문자 단어 단위 (select, groupby, np 등)
+# - 검색 대상: title(가중치 TITLE_BOOST), body, hint, schema
+# - 랭킹: BM25 (k1, b). 문서별 가중치를 인덱스를 만들 때 미리 계산해 두고
+#   질의 시에는 질의 토큰의 posting 가중치만 더합니다.
+INDEX_VERSION = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2
+
+_HANGUL_RUN = re.compile(r"[가-힣ㄱ-ㆎ]+")
+_WORD = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """한글은 글자 2-gram, 영문/숫자는 단어 단위로 토큰화합니다."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens: List[str] = []
+    for run in _HANGUL_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(_WORD.findall(text))
+    return tokens
+
+
+def problem_tokens(problem: Problem) -> List[str]:
+    return (tokenize(problem.title) * TITLE_BOOST
+            + tokenize(problem.body) + tokenize(problem.hint) + tokenize(problem.schema))
+
+
+def index_path_for(bank_path: Path) -> Path:
+    """문제 파일 옆에 저장되는 인덱스 경로입니다. (예: data/problems.json → data/problems.json.search.npz)
+
+    확장자까지 넣어 problems.json과 problems.jsonl이 서로의 인덱스를 덮어쓰지 않게 합니다.
+    """
+    return bank_path.with_name(f"{bank_path.name}.search.npz")
+
+
+def file_digest(path: Path) -> str:
+    """문제 파일과 변경 로그 내용의 해시입니다. 큰 파일도 조각 단위로 읽습니다."""
+    digest = hashlib.sha1()
+    for part in (path, changelog_path_for(path)):
+        if not part.exists():
+            continue
+        with part.open("rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class SearchHit:
+    problem: Problem
+    score: float
+
+
+@dataclass
+class SearchResult:
+    """검색 결과입니다.
+
+    Attributes:
+        hits: 점수 내림차순 상위 결과
+        total: 필터를 통과한 전체 매칭 수
+        facets: 매칭 결과의 (difficulty, kind, problem_type)별 개수
+    """
+    hits: List[SearchHit]
+    total: int
+    facets: Dict[Tuple[str, str, str], int] = field(default_factory=dict)
+
+
+class FacetCodes:
+    """문제별 (difficulty, kind, problem_type) 조합 코드입니다.
+
+    matches_filters 같은 필터 함수는 이 세 값만 보므로, 조합마다 대표 문제로 한 번만
+    평가한 뒤 문제별 코드로 펼치면 문제 수와 관계없이 필터 마스크를 만들 수 있습니다.
+    """
+
+    def __init__(self, problems: List[Problem], codes: np.ndarray, combos: List[Tuple[str, str, str]]):
+        self.codes = codes
+        self.combos = combos
+        self._reps: List[Problem] = [None] * len(combos)  # type: ignore[list-item]
+        for problem, code in zip(problems, codes.tolist()):
+            if self._reps[code] is None:
+                self._reps[code] = problem
+
+    @classmethod
+    def build(cls, problems: List[Problem]) -> "FacetCodes":
+        combo_index: Dict[Tuple[str, str, str], int] = {}
+        codes = np.fromiter(
+            (combo_index.setdefault((p.difficulty, p.kind, p.problem_type), len(combo_index)) for p in problems),
+            dtype=np.int32, count=len(problems))
+        return cls(problems, codes, list(combo_index))
+
+    def mask(self, predicate: Optional[Callable[[Problem], bool]]) -> Optional[np.ndarray]:
+        """문제별 필터 통과 여부. predicate는 조합마다 한 번만 호출됩니다."""
+        if predicate is None:
+            return None
+        allowed = np.array([predicate(rep) for rep in self._reps], dtype=bool)
+        return allowed[self.codes]
+
+    def counts(self, indices: Optional[np.ndarray] = None) -> Dict[Tuple[str, str, str], int]:
+        """indices(없으면 전체) 문제의 조합별 개수입니다."""
+        codes = self.codes if indices is None else self.codes[indices]
+        counts = np.bincount(codes, minlength=len(self.combos))
+        return {self.combos[i]: int(c) for i, c in enumerate(counts) if c}
+
+
+class SearchIndex:
+    """문제 파일 하나에 대한 BM25 역색인입니다.
+
+    posting은 CSR 형태로 보관합니다: 토큰 t의 문서 번호와 BM25 가중치는
+    doc_ids[offsets[t]:offsets[t+1]], weights[offsets[t]:offsets[t+1]] 입니다.
+    """
+
+    def __init__(self, problems: List[Problem], vocab: Dict[str, int], offsets: np.ndarray,
+                 doc_ids: np.ndarray, weights: np.ndarray, facets: FacetCodes, digest: str = ""):
+        self.problems = problems
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.facets = facets
+        self.digest = digest
+
+    @classmethod
+    def build(cls, problems: List[Problem], digest: str = "") -> "SearchIndex":
+        n_docs = len(problems)
+        doc_terms: List[Counter] = [Counter(problem_tokens(p)) for p in problems]
+        doc_len = np.array([sum(c.values()) for c in doc_terms], dtype=np.float32)
+        avg_len = float(doc_len.mean()) if n_docs else 0.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, counts in enumerate(doc_terms):
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab: Dict[str, int] = {}
+        offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        doc_ids = np.empty(sum(len(p) for p in postings.values()), dtype=np.int32)
+        weights = np.empty(len(doc_ids), dtype=np.float32)
+        pos = 0
+        for term_id, (term, plist) in enumerate(postings.items()):
+            vocab[term] = term_id
+            ids = np.fromiter((d for d, _ in plist), dtype=np.int32, count=len(plist))
+            tfs = np.fromiter((tf for _, tf in plist), dtype=np.float32, count=len(plist))
+            idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len[ids] / (avg_len or 1.0))
+            doc_ids[pos:pos + len(plist)] = ids
+            weights[pos:pos + len(plist)] = idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+            pos += len(plist)
+            offsets[term_id + 1] = pos
+
+        return cls(problems, vocab, offsets, doc_ids, weights, FacetCodes.build(problems), digest)
+
+    def save(self, path: Path) -> None:
+        """인덱스를 npz로 저장합니다. 임시 파일에 쓴 뒤 교체하므로 중간에 끊겨도 깨지지 않습니다."""
+        meta = {
+            "version": INDEX_VERSION,
+            "digest": self.digest,
+            "pids": [p.pid for p in self.problems],
+            "vocab": list(self.vocab),
+            "combos": self.facets.combos,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)), offsets=self.offsets,
+                     doc_ids=self.doc_ids, weights=self.weights, combo_codes=self.facets.codes)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, problems: List[Problem], digest: str) -> Optional["SearchIndex"]:
+        """저장된 인덱스를 불러옵니다. 버전/내용 해시/문제 순서가 다르면 None을 반환합니다."""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if (meta.get("version") != INDEX_VERSION or meta.get("digest") != digest
+                        or meta.get("pids") != [p.pid for p in problems]):
+                    return None
+                return cls(
+                    problems,
+                    {term: i for i, term in enumerate(meta["vocab"])},
+                    data["offsets"], data["doc_ids"], data["weights"],
+                    FacetCodes(problems, data["combo_codes"], [tuple(c) for c in meta["combos"]]),
+                    digest,
+                )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def search(self, query: str, predicate: Optional[Callable[[Problem], bool]] = None,
+               limit: int = 20) -> SearchResult:
+        terms = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not terms or not self.problems:
+            return SearchResult([], 0)
+
+        scores = np.zeros(len(self.problems), dtype=np.float32)
+        for term_id in terms:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            # 한 토큰의 posting 안에서 문서 번호는 중복되지 않으므로 fancy-index 누적이 안전
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+
+        mask = scores > 0
+        filter_mask = self.facets.mask(predicate)
+        if filter_mask is not None:
+            mask &= filter_mask
+        matched = np.flatnonzero(mask)
+        if len(matched) > limit:
+            top = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        else:
+            top = matched
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = [SearchHit(self.problems[i], float(scores[i])) for i in top.tolist()]
+        return SearchResult(hits, len(matched), self.facets.counts(matched))
+
+
+# 파일별 인덱스 캐시: filename -> SearchIndex (문제 캐시의 리스트가 바뀌면 다시 확인)
+_INDEX_CACHE: Dict[str, SearchIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_search_index(filename: str) -> SearchIndex:
+    """문제 파일의 검색 인덱스를 반환합니다.
+
+    문제 파일 옆의 인덱스 파일이 현재 내용과 같으면 그대로 불러오고,
+    없거나 오래되었으면 새로 만들어 저장합니다.
+    """
+    problems = get_problem_bank(filename)
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(filename)
+        if cached is not None and cached.problems is problems:
+            return cached
+
+        bank_path = Path("data") / filename
+        digest = file_digest(bank_path)
+        index_path = index_path_for(bank_path)
+        index = SearchIndex.load(index_path, problems, digest) if index_path.exists() else None
+        if index is None:
+            index = SearchIndex.build(problems, digest)
+            try:
+                index.save(index_path)
+            except OSError:
+                pass  # 읽기 전용 디렉토리 등: 메모리 인덱스만 사용
+        _INDEX_CACHE[filename] = index
+        return index
+
+
+def forget_search_index(filename: str) -> None:
+    """삭제된 문제 파일의 검색 인덱스를 캐시에서 제거합니다."""
+    with _INDEX_LOCK:
+        _INDEX_CACHE.pop(filename, None)
+
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Dict, Optional
+
+# 세션 state에는 (source_file, pid) 핸들과 작은 값만 두고,
+# 피드백/제출 코드처럼 큰 텍스트는 이 저장소에 탭 state의 ref로 보관합니다.
+# - 총 크기가 FEEDBACK_STORE_MAX_MB를 넘으면 가장 오래 쓰지 않은 항목부터 제거
+# - SESSION_IDLE_SECONDS 동안 접근이 없는 항목은 제거
+# - 브라우저 탭이 닫혀 Gradio가 state를 지우면 delete_callback으로 즉시 제거
+FEEDBACK_STORE_MAX_BYTES = int(os.getenv("FEEDBACK_STORE_MAX_MB", "64")) * 1024 * 1024
+SESSION_IDLE_SECONDS = int(os.getenv("SESSION_IDLE_SECONDS", "3600"))
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """컨테이너와 dataclass를 따라가며 객체가 차지하는 대략적인 바이트 수를 계산합니다."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        size += sum(deep_sizeof(getattr(obj, f.name), _seen) for f in fields(obj))
+    return size
+
+
+@dataclass
+class SessionEntry:
+    """탭 state 하나에 딸린 서버 측 텍스트 묶음입니다.
+
+    Attributes:
+        values: last_feedback, last_verdict, last_code 등 큰 텍스트
+        last_access: 마지막 접근 시각 (time.monotonic())
+        value_bytes: values가 차지하는 바이트 수
+        state_bytes: 마지막으로 기록된 탭 state 자체의 바이트 수
+    """
+    values: Dict[str, str]
+    last_access: float
+    value_bytes: int = 0
+    state_bytes: int = 0
+
+
+class FeedbackStore:
+    """크기 한도와 유휴 만료가 있는 서버 측 피드백 저장소입니다."""
+
+    def __init__(self, max_bytes: int = FEEDBACK_STORE_MAX_BYTES,
+                 idle_seconds: int = SESSION_IDLE_SECONDS):
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.evicted = 0
+        self._entries: "OrderedDict[str, SessionEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_ref() -> str:
+        return uuid.uuid4().hex
+
+    def get(self, ref: Optional[str]) -> Dict[str, str]:
+        """ref의 텍스트를 반환합니다. 없거나 만료되었으면 빈 딕셔너리를 반환합니다."""
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            entry = self._entries.get(ref) if ref else None
+            if entry is None:
+                return {}
+            entry.last_access = time.monotonic()
+            self._entries.move_to_end(ref)
+            return dict(entry.values)
+
+    def update(self, ref: str, values: Dict[str, str], state: Optional[Dict] = None) -> None:
+        """ref의 텍스트를 갱신합니다. state를 넘기면 state 크기도 함께 기록합니다."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ref)
+            if entry is None:
+                entry = SessionEntry(values={}, last_access=now)
+                self._entries[ref] = entry
+            self._total_bytes -= entry.value_bytes
+            entry.values.update(values)
+            entry.value_bytes = deep_sizeof(entry.values)
+            entry.last_access = now
+            if state is not None:
+                entry.state_bytes = deep_sizeof(state)
+            self._total_bytes += entry.value_bytes
+            self._entries.move_to_end(ref)
+            self._evict_idle(now)
+            self._evict_over_budget(keep=ref)
+
+    def discard(self, ref: Optional[str]) -> None:
+        with self._lock:
+            entry = self._entries.pop(ref, None) if ref else None
+            if entry is not None:
+                self._total_bytes -= entry.value_bytes
+
+    def _evict_idle(self, now: float) -> None:
+        # OrderedDict는 접근 순서이므로 앞쪽부터 만료된 항목만 확인
+        while self._entries:
+            ref, entry = next(iter(self._entries.items()))
+            if now - entry.last_access < self.idle_seconds:
+                break
+            self._drop(ref)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            ref = next(iter(self._entries))
+            if ref == keep:
+                break
+            self._drop(ref)
+
+    def _drop(self, ref: str) -> None:
+        entry = self._entries.pop(ref)
+        self._total_bytes -= entry.value_bytes
+        self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            count = len(self._entries)
+            state_bytes = sum(e.state_bytes for e in self._entries.values())
+            return {
+                "sessions": count,
+                "value_bytes": self._total_bytes,
+                "state_bytes": state_bytes,
+                "max_bytes": self.max_bytes,
+                "evicted": self.evicted,
+                "bytes_per_session": (self._total_bytes + state_bytes) / count if count else 0.0,
+            }
+
+
+FEEDBACK_STORE = FeedbackStore()
+
+
+def discard_session_state(state: Optional[Dict]) -> None:
+    """gr.State의 delete_callback: 탭 state가 지워질 때 딸린 텍스트도 제거합니다."""
+    if isinstance(state, dict):
+        FEEDBACK_STORE.discard(state.get("ref"))
+
+
+def format_session_memory_report(store: Optional[FeedbackStore] = None) -> str:
+    """세션 메모리 사용량을 Markdown으로 반환합니다."""
+    m = (store or FEEDBACK_STORE).stats()
+    return (
+        "| 활성 탭 state | 핸들 state 합계 | 피드백 저장소 | 저장소 한도 | 세션당 평균 | 제거된 항목 |\n"
+        "|---:|---:|---:|---:|---:|---:|\n"
+        f"| {m['sessions']} | {m['state_bytes'] / 1024:.1f} KB | {m['value_bytes'] / 1024:.1f} KB | "
+        f"{m['max_bytes'] / 1024 / 1024:.0f} MB | {m['bytes_per_session']:,.0f} B | {m['evicted']} |"
+    )
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+import llm_client
+from llm_client import GenerationProfile, build_payload, configured_models
+
+# 유휴 상태가 이 시간(초) 이상 지속되면 keep-alive 요청을 보냅니다.
+# LM Studio의 JIT 모델 TTL(기본 60분)보다 짧게 잡아야 모델이 언로드되지 않습니다.
+KEEPALIVE_SECONDS = int(os.getenv("LLM_KEEPALIVE_SECONDS", "240"))
+# 첫 요청은 모델 로드까지 포함하므로 일반 호출보다 넉넉하게 기다립니다.
+WARMUP_TIMEOUT = 300
+
+WARMUP_PROFILE = GenerationProfile(name="warmup", max_tokens=1)
+
+STATE_LABELS = {
+    "cold": "⚪ 대기",
+    "warming": "🟡 예열 중",
+    "warm": "🟢 준비됨",
+    "error": "🔴 연결 실패",
+}
+
+
+@dataclass
+class EndpointStatus:
+    """(endpoint, model) 하나의 예열 상태입니다.
+
+    Attributes:
+        endpoint: chat completions 엔드포인트
+        model: 요청에 넣는 모델 이름
+        state: cold / warming / warm / error
+        last_ok: 마지막 성공 시각 (time.time())
+        latency: 마지막 예열/keep-alive 응답 시간(초)
+        error: 마지막 실패 메시지
+    """
+    endpoint: str
+    model: str
+    state: str = "cold"
+    last_ok: float = 0.0
+    latency: float = 0.0
+    error: str = ""
+
+
+class ModelWarmer:
+    """설정된 모든 엔드포인트를 백그라운드에서 예열하고 유휴 중에는 keep-alive 요청을 보냅니다."""
+
+    def __init__(self, targets: Sequence[Tuple[str, str]], keepalive_seconds: int = KEEPALIVE_SECONDS):
+        self.keepalive_seconds = keepalive_seconds
+        self.statuses: Dict[Tuple[str, str], EndpointStatus] = {
+            (endpoint, model): EndpointStatus(endpoint, model) for endpoint, model in targets
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        for status in self.statuses.values():
+            self.ping(status)
+
+        # 실패한 엔드포인트는 다음 주기에 재시도하도록 keep-alive보다 자주 확인
+        tick = min(30, self.keepalive_seconds)
+        while not self._stop.wait(tick):
+            for status in self.statuses.values():
+                if status.state == "error" or self.idle_seconds(status) >= self.keepalive_seconds:
+                    self.ping(status)
+
+    def idle_seconds(self, status: EndpointStatus) -> float:
+        """실제 채점 호출과 예열 요청 중 가장 최근 성공 이후 경과 시간입니다."""
+        last_used = llm_client.ENDPOINT_LAST_USED.get((status.endpoint, status.model), 0.0)
+        return time.time() - max(status.last_ok, last_used)
+
+    def ping(self, status: EndpointStatus) -> None:
+        """1토큰짜리 completion을 보내 모델을 메모리에 올려두고 상태를 갱신합니다."""
+        previous = status.state
+        if previous != "warm":
+            status.state = "warming"
+        payload = build_payload("ping", "ping", WARMUP_PROFILE, status.model, stream=False)
+        started = time.perf_counter()
+        try:
+            response = requests.post(status.endpoint, json=payload, timeout=WARMUP_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            # 재시도마다 같은 경고가 쌓이지 않도록 상태가 바뀔 때만 출력
+            if previous != "error":
+                print(f"[경고] 모델 예열 실패 ({status.model} @ {status.endpoint}): {exc}", file=sys.stderr)
+            status.state = "error"
+            status.error = type(exc).__name__
+            return
+
+        status.state = "warm"
+        status.latency = time.perf_counter() - started
+        status.last_ok = time.time()
+        status.error = ""
+
+    def format_status(self) -> str:
+        """UI 표시용 한 줄 상태 문자열을 반환합니다."""
+        parts: List[str] = []
+        for status in self.statuses.values():
+            label = STATE_LABELS.get(status.state, status.state)
+            text = f"{label} `{status.model}`"
+            if status.state == "warm":
+                text += f" (응답 {status.latency:.1f}초)"
+            elif status.state == "error":
+                text += f" — {status.error}"
+            parts.append(text)
+        return "**AI 모델 상태**: " + " · ".join(parts)
+
+
+MODEL_WARMER = ModelWarmer(configured_models())
+
+
+def start_model_warmer() -> ModelWarmer:
+    """앱 시작 시 호출합니다. 이미 실행 중이면 아무것도 하지 않습니다."""
+    MODEL_WARMER.start()
+    return MODEL_WARMER
@@ -0,0 +1,891 @@
+"""오답노트 저장소.
+
+오답노트는 JSON Lines 형식의 Attempt 레코드입니다. 새 기록은 활성 파일(data/wrong_notes.md)에
+덧붙이고, 활성 파일이 NOTE_SEGMENT_MAX_KB를 넘으면 data/wrong_notes/ 아래의 봉인된
+세그먼트 파일로 옮긴 뒤 매니페스트(manifest.json)에 기록합니다.
+
+- 봉인된 세그먼트는 다시 바뀌지 않으므로 한 번 파싱한 결과를 캐시해 두고,
+  매 요청마다 다시 읽는 것은 활성 파일뿐입니다.
+- 오프라인 압축기(python wrong_notes.py compact)는 세그먼트를 정규화된 JSON 줄로 다시 쓰고,
+  파싱할 수 없는 줄은 quarantine.jsonl로 옮기며, 세그먼트별 (source_file, pid) 색인을 만듭니다.
+  색인이 있는 세그먼트는 특정 문제의 기록을 찾을 때 해당 줄만 읽습니다.
+- 긴 제출 코드와 피드백, 문제 본문은 blob 저장소(blob_store)에 압축해 한 번만 저장하고 digest로
+  참조합니다. 같은 문제의 기록은 본문 blob 하나를 함께 쓰고, 문제 은행이 나중에 고쳐지거나
+  삭제되어도 저장할 때의 본문이 남습니다. 값은 Attempt.text()로 읽을 때 풉니다.
+
+사용법 (저장소 루트에서):
+    python wrong_notes.py status
+    python wrong_notes.py compact            # 봉인된 세그먼트 압축
+    python wrong_notes.py compact --rotate   # 활성 파일도 봉인한 뒤 압축
+    python wrong_notes.py migrate            # 기존 기록을 blob 참조 형식(v2)으로 변환
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import MISSING, asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from blob_store import BLOB_STORE, BlobStore, blob_digest
+from problem_bank import DEFAULT_PROBLEM_FILE, find_problem
+
+NOTE_PATH = Path("data/wrong_notes.md")
+NOTE_PATH.parent.mkdir(parents=True, exist_ok=True)
+SEGMENT_DIR = Path("data/wrong_notes")
+NOTE_SEGMENT_MAX_BYTES = int(os.getenv("NOTE_SEGMENT_MAX_KB", "1024")) * 1024
+MANIFEST_VERSION = 1
+# 기록 형식 v2: 긴 텍스트는 blob 저장소에, 문제 본문은 문제 은행 참조
+NOTE_FORMAT_VERSION = 2
+BLOB_FIELDS = ("submitted", "feedback", "code")
+BLOB_MIN_CHARS = 64  # 이보다 짧은 텍스트는 blob 파일을 만들지 않고 줄 안에 둡니다
+
+
+@dataclass
+class Attempt:
+    """오답노트에 저장되는 단일 채점 시도 레코드입니다.
+
+    Attributes:
+        pid: 문제 ID (problem_bank에서의 고유 식별자)
+        title: 문제 제목
+        difficulty: 난이도 (Lv1 입문 등)
+        score: 채점 점수 (0-100)
+        status: 상태 (통과/재도전)
+        submitted: 제출된 코드
+        feedback: LLM 피드백
+        improvement: 보완 포인트
+        reasoning: 해설/의도 추측
+        question: 문제 내용
+        code: 제출 코드
+        kind: 프로그래밍 언어 (sql/python, Gradio Code 컴포넌트 지원 언어)
+        timestamp: 제출 시간 (형식: "YYYY-MM-DD HH:MM (요일)")
+        rechallenge_hint: 재도전 시 참고할 힌트
+        nickname: 문제 별명 (사용자 지정)
+        source_file: 문제 출처 파일 (예: "problems.json")
+        blobs: blob 저장소로 옮긴 텍스트 필드 -> digest (해당 필드 값은 빈 문자열)
+    """
+    pid: str
+    title: str
+    difficulty: str
+    score: int
+    status: str
+    submitted: str
+    feedback: str
+    improvement: str
+    reasoning: str
+    question: str
+    code: str
+    kind: str
+    timestamp: str
+    rechallenge_hint: str = ""
+    nickname: str = ""
+    source_file: str = "problems.json"  # 하위 호환성을 위한 기본값
+    blobs: Dict[str, str] = field(default_factory=dict)
+
+    def text(self, name: str) -> str:
+        """submitted/feedback/code/question 값을 반환합니다.
+
+        blob 저장소로 옮긴 필드는 이때 처음 압축을 풉니다. 문제 본문은 blob 파일을 잃었을 때
+        문제 은행의 본문이 digest와 같으면 그것을 쓰고, 본문 digest가 없는 이전 기록
+        (문제 은행 참조만 저장한 v2 초기 형식)은 문제 은행에서 찾습니다.
+        """
+        value = getattr(self, name)
+        if value:
+            return value
+        digest = self.blobs.get(name)
+        if digest:
+            text = BLOB_STORE.get(digest)
+            if text is not None or name != "question":
+                return text or ""
+        if name == "question":
+            problem = find_problem(self.source_file, self.pid)
+            if problem is not None and (not digest or blob_digest(problem.body) == digest):
+                return problem.body
+        return ""
+
+
+def ensure_note_file() -> None:
+    """오답노트 파일을 초기화합니다.
+
+    JSON Lines 형식: 각 라인이 독립적인 JSON 객체
+    """
+    if not NOTE_PATH.exists():
+        NOTE_PATH.write_text("")  # 빈 파일로 시작 (헤더 없음)
+
+
+def serialize_attempt(attempt: Attempt, store: Optional[BlobStore] = None) -> str:
+    """Attempt를 JSON Lines 형식으로 직렬화합니다.
+
+    각 Attempt는 한 줄의 JSON으로 저장되어 강건한 파싱이 가능합니다.
+    - 멀티라인 텍스트는 JSON이 자동으로 이스케이프
+    - 마크다운 syntax 충돌 없음
+    - 손상된 한 줄만 무시, 나머지는 안전
+    - 긴 제출 코드/피드백은 blob 저장소에 한 번만 저장하고 digest로 참조 (submitted와 code는 같은 blob)
+    - 문제 본문도 blob으로 저장 (같은 문제의 기록끼리 공유). 문제 은행 참조만 두면
+      은행이 고쳐지거나 삭제된 뒤 엉뚱한 본문이나 빈 본문을 보여주게 됩니다
+    """
+    store = store or BLOB_STORE
+    record = asdict(attempt)
+    blobs: Dict[str, str] = dict(record.pop("blobs"))
+    for name in BLOB_FIELDS:
+        text = record[name]
+        if len(text) >= BLOB_MIN_CHARS:
+            blobs[name] = store.put(text)
+            del record[name]
+        elif not text and name in blobs:
+            del record[name]  # 이미 blob으로 옮겨진 필드
+    question = record.pop("question")
+    if question:
+        blobs["question"] = store.put(question)
+    record["blobs"] = blobs
+    record["v"] = NOTE_FORMAT_VERSION
+
+    meta = json.dumps(
+        record,
+        ensure_ascii=False,  # 한글 유지
+        separators=(',', ':')  # 공백 제거해서 한 줄 유지
+    )
+
+    # JSON이 유효한지 검증
+    try:
+        json.loads(meta)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON 직렬화 오류: {e}\n{meta[:200]}...")
+
+    return meta  # 순수 JSON 한 줄만 반환
+
+
+def safe_read_file(path: Path) -> str:
+    """다중 인코딩 시도로 안전하게 파일 읽기
+
+    Args:
+        path: 읽을 파일 경로
+
+    Returns:
+        str: 파일 내용 (UTF-8 BOM 제거됨)
+    """
+    encodings = ['utf-8-sig', 'utf-8', 'latin-1', 'cp1252']
+
+    for encoding in encodings:
+        try:
+            text = path.read_text(encoding=encoding, errors='ignore')
+            # UTF-8 BOM 제거 (utf-8-sig가 실패한 경우 대비)
+            if text.startswith('\ufeff'):
+                text = text[1:]
+            return text
+        except Exception:
+            continue
+
+    # 최후의 수단: 바이너리 읽기 후 디코드
+    return path.read_bytes().decode('utf-8', errors='replace')
+
+
+def sanitize_line(line: str) -> str:
+    """JSON 파싱 전 라인 정제
+
+    Args:
+        line: 정제할 라인
+
+    Returns:
+        str: 정제된 라인
+    """
+    # 제어 문자 제거 (탭/개행 제외)
+    line = ''.join(c for c in line if c >= ' ' or c in '\t\n')
+
+    # NULL 바이트 제거
+    line = line.replace('\x00', '')
+
+    # 유니코드 정규화 (NFKC)
+    line = unicodedata.normalize('NFKC', line)
+
+    # 양쪽 공백 제거
+    return line.strip()
+
+
+def is_likely_json(line: str) -> bool:
+    """라인이 JSON 객체일 가능성이 있는지 빠르게 체크
+
+    Args:
+        line: 체크할 라인
+
+    Returns:
+        bool: JSON 객체일 가능성이 있으면 True
+    """
+    line = line.strip()
+    # JSON 객체는 { 로 시작하고 } 로 끝남
+    return line.startswith('{') and line.endswith('}')
+
+
+def robust_json_parse(line: str) -> Optional[Dict]:
+    """여러 방법으로 JSON 파싱 시도
+
+    Args:
+        line: 파싱할 JSON 라인
+
+    Returns:
+        Optional[Dict]: 파싱된 딕셔너리 또는 None
+    """
+    # 1차: 기본 파싱
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        pass
+
+    # 2차: 손상된 이스케이프 시퀀스 복구
+    try:
+        # 백슬래시가 과도하게 이스케이프된 경우
+        fixed = line.replace('\\\\', '\\')
+        return json.loads(fixed)
+    except json.JSONDecodeError:
+        pass
+
+    # 3차: 중괄호 매칭으로 JSON 추출
+    try:
+        start = line.find('{')
+        end = line.rfind('}') + 1
+        if start >= 0 and end > start:
+            return json.loads(line[start:end])
+    except (json.JSONDecodeError, ValueError):
+        pass
+
+    return None
+
+
+def log_parse_error(line_idx: int, line: str, error: Exception) -> None:
+    """파싱 실패 시 상세 정보 출력
+
+    Args:
+        line_idx: 라인 번호
+        line: 실패한 라인 내용
+        error: 발생한 예외
+    """
+    # 라인 미리보기 (첫 100자)
+    preview = line[:100] + ('...' if len(line) > 100 else '')
+
+    # 에러 메시지
+    error_msg = str(error)[:80]
+
+    print(
+        f"[경고] 라인 {line_idx} 파싱 실패\n"
+        f"  오류: {error_msg}\n"
+        f"  내용: {repr(preview)}",
+        file=sys.stderr
+    )
+
+
+def parse_note_line(line: str) -> Optional[Attempt]:
+    """오답노트 한 줄을 Attempt로 만듭니다.
+
+    빈 줄이나 마크다운 헤더처럼 JSON이 아닌 줄은 None을 반환하고,
+    JSON처럼 보이지만 복구할 수 없는 줄은 ValueError/TypeError를 발생시킵니다.
+    """
+    # 라인 정제 (제어 문자, NULL 바이트 제거)
+    line = sanitize_line(line)
+
+    # 빈 라인, JSON이 아닌 라인 건너뛰기 (마크다운 헤더, 주석 등)
+    if not line or not is_likely_json(line):
+        return None
+
+    # 강건한 JSON 파싱 (다단계 재시도)
+    data = robust_json_parse(line)
+    if data is None:
+        raise ValueError("JSON 파싱 불가")
+
+    # 하위 호환성: source_file 필드가 없으면 기본값 추가
+    if "source_file" not in data:
+        data["source_file"] = DEFAULT_PROBLEM_FILE
+
+    # v2: blob으로 옮기거나 문제 은행으로 참조한 텍스트 필드는 빈 값으로 두고 필요할 때 풉니다
+    if data.pop("v", 1) >= 2:
+        for name in BLOB_FIELDS + ("question",):
+            data.setdefault(name, "")
+
+    return Attempt(**data)
+
+
+def _parse_lines(lines: List[str], first_line_idx: int = 1
+                 ) -> Tuple[List[Attempt], List[Tuple[int, str, str]]]:
+    """줄 목록을 파싱해 (기록, [(라인 번호, 내용, 오류)])를 반환합니다."""
+    entries: List[Attempt] = []
+    errors: List[Tuple[int, str, str]] = []
+    for line_idx, line in enumerate(lines, first_line_idx):
+        try:
+            entry = parse_note_line(line)
+        except Exception as e:
+            # Attempt 필드 부족, 파싱 불가 등: 해당 라인 무시, 계속 진행
+            errors.append((line_idx, line.strip(), str(e)))
+            continue
+        if entry is not None:
+            entries.append(entry)
+    return entries, errors
+
+
+def parse_note_text(text: str) -> List[Attempt]:
+    """오답노트 파일 내용 전체를 파싱합니다. 손상된 라인은 경고만 출력하고 건너뜁니다."""
+    if not text.strip():
+        return []
+    entries, errors = _parse_lines(text.split("\n"))
+    for line_idx, line, error in errors:
+        log_parse_error(line_idx, line, ValueError(error))
+    return entries
+
+
+# ===== 병렬 파싱 =====
+# 여러 학생의 기록을 모은 큰 파일은 줄 경계에서 조각으로 나눠 프로세스 풀에서 파싱합니다.
+# 조각마다 parse_note_line(sanitize_line → robust_json_parse)을 그대로 쓰므로 복구 규칙이 같고,
+# 결과와 경고는 파일 순서대로 합칩니다.
+NOTE_PARALLEL_THRESHOLD_BYTES = int(float(os.getenv("NOTE_PARALLEL_THRESHOLD_MB", "8")) * 1024 * 1024)
+NOTE_PARSE_WORKERS = int(os.getenv("NOTE_PARSE_WORKERS", "0")) or (os.cpu_count() or 1)
+NOTE_CHUNK_MIN_BYTES = 1 << 20
+
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_WORKERS = 0
+_PARSE_POOL_LOCK = threading.Lock()
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    """파싱용 프로세스 풀을 한 번만 만들어 재사용합니다.
+
+    앱에는 백그라운드 스레드가 있으므로 fork 대신 spawn으로 워커를 띄웁니다.
+    """
+    global _PARSE_POOL, _PARSE_POOL_WORKERS
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is None or _PARSE_POOL_WORKERS != workers:
+            if _PARSE_POOL is not None:
+                _PARSE_POOL.shutdown(wait=False)
+            _PARSE_POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _PARSE_POOL_WORKERS = workers
+        return _PARSE_POOL
+
+
+def chunk_boundaries(path: Path, chunks: int, min_bytes: int = NOTE_CHUNK_MIN_BYTES) -> List[Tuple[int, int]]:
+    """파일을 줄 경계에서 최대 chunks개의 (시작, 끝) 바이트 구간으로 나눕니다."""
+    size = path.stat().st_size
+    step = max(min_bytes, -(-size // max(1, chunks)))
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    with path.open("rb") as f:
+        while start < size:
+            end = min(size, start + step)
+            if end < size:
+                f.seek(end)
+                f.readline()  # 다음 줄 시작까지
+                end = f.tell()
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _parse_chunk(path: str, start: int, end: int) -> Tuple[List[Attempt], List[Tuple[int, str, str]], int]:
+    """워커: 바이트 구간 하나를 파싱합니다. 라인 번호는 구간 안에서 1부터 셉니다.
+
+    Returns:
+        (기록, 오류, 구간의 줄 수)
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if start == 0 and data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    lines = data.decode("utf-8", errors="ignore").split("\n")
+    if lines and lines[-1] == "" and data.endswith(b"\n"):
+        lines.pop()  # 다음 구간이 이어서 셀 줄
+    entries, errors = _parse_lines(lines)
+    return entries, errors, len(lines)
+
+
+def parse_note_file_parallel(path: Path, workers: int = NOTE_PARSE_WORKERS) -> List[Attempt]:
+    """파일을 줄 경계 조각으로 나눠 프로세스 풀에서 파싱하고 파일 순서대로 합칩니다."""
+    bounds = chunk_boundaries(path, workers * 4)
+    pool = _parse_pool(workers)
+    futures = [pool.submit(_parse_chunk, str(path), start, end) for start, end in bounds]
+
+    entries: List[Attempt] = []
+    line_offset = 0
+    for future in futures:
+        chunk_entries, errors, line_count = future.result()
+        entries.extend(chunk_entries)
+        for line_idx, line, error in errors:
+            log_parse_error(line_offset + line_idx, line, ValueError(error))
+        line_offset += line_count
+    return entries
+
+
+def parse_note_file(path: Path) -> List[Attempt]:
+    """오답노트 파일을 파싱합니다. NOTE_PARALLEL_THRESHOLD_MB 이상이고 코어가 여럿이면 병렬로 처리합니다."""
+    if NOTE_PARSE_WORKERS > 1 and path.stat().st_size >= NOTE_PARALLEL_THRESHOLD_BYTES:
+        try:
+            return parse_note_file_parallel(path)
+        except (OSError, BrokenProcessPool) as exc:
+            print(f"[경고] 병렬 파싱 실패, 단일 프로세스로 다시 읽습니다: {exc}", file=sys.stderr)
+    return parse_note_text(safe_read_file(path))
+
+
+# ===== 세그먼트 =====
+
+@dataclass
+class SegmentInfo:
+    """봉인된 오답노트 세그먼트 하나의 매니페스트 항목입니다.
+
+    Attributes:
+        name: SEGMENT_DIR 안의 파일명 (예: segment-000001.jsonl)
+        lines: 줄 수
+        bytes: 파일 크기
+        compacted: 압축기가 정규화했는지 여부
+        index: (source_file, pid) 색인 파일명 (압축 후에만 있음)
+    """
+    name: str
+    lines: int = 0
+    bytes: int = 0
+    compacted: bool = False
+    index: str = ""
+
+
+_NOTES_LOCK = threading.Lock()
+# 봉인된 세그먼트 파싱 캐시: 파일명 -> ((mtime_ns, size), entries)
+_SEGMENT_CACHE: Dict[str, Tuple[Tuple[int, int], List[Attempt]]] = {}
+
+
+def manifest_path(segment_dir: Path = SEGMENT_DIR) -> Path:
+    return segment_dir / "manifest.json"
+
+
+def read_manifest(segment_dir: Path = SEGMENT_DIR) -> List[SegmentInfo]:
+    """매니페스트의 세그먼트 목록을 순서대로 반환합니다.
+
+    세그먼트 파일을 옮긴 직후 매니페스트를 쓰기 전에 중단된 경우에도 기록이 빠지지 않도록,
+    매니페스트에 없는 segment-*.jsonl 파일도 이름 순서대로 덧붙입니다.
+    """
+    segments: List[SegmentInfo] = []
+    path = manifest_path(segment_dir)
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            segments = [SegmentInfo(**item) for item in data.get("segments", [])]
+        except (ValueError, TypeError) as exc:
+            print(f"[경고] 오답노트 매니페스트를 읽지 못했습니다: {exc}", file=sys.stderr)
+    known = {s.name for s in segments}
+    if segment_dir.exists():
+        for file in sorted(segment_dir.glob("segment-*.jsonl")):
+            if file.name not in known:
+                segments.append(SegmentInfo(file.name, bytes=file.stat().st_size))
+    return [s for s in segments if (segment_dir / s.name).exists()]
+
+
+def write_manifest(segments: List[SegmentInfo], segment_dir: Path = SEGMENT_DIR) -> None:
+    """매니페스트를 임시 파일에 쓴 뒤 교체합니다."""
+    path = manifest_path(segment_dir)
+    tmp = path.with_name(path.name + ".tmp")
+    payload = {"version": MANIFEST_VERSION, "segments": [asdict(s) for s in segments]}
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _next_segment_name(segments: List[SegmentInfo]) -> str:
+    numbers = [int(s.name[len("segment-"):-len(".jsonl")]) for s in segments
+               if s.name.startswith("segment-") and s.name[len("segment-"):-len(".jsonl")].isdigit()]
+    return f"segment-{max(numbers, default=0) + 1:06d}.jsonl"
+
+
+def rotate_active_file(segment_dir: Path = SEGMENT_DIR) -> Optional[SegmentInfo]:
+    """활성 파일을 봉인된 세그먼트로 옮기고 빈 활성 파일을 만듭니다. 비어 있으면 None."""
+    with _NOTES_LOCK:
+        return _rotate_locked(segment_dir)
+
+
+def _rotate_locked(segment_dir: Path) -> Optional[SegmentInfo]:
+    if not NOTE_PATH.exists() or not NOTE_PATH.read_text(encoding="utf-8", errors="ignore").strip():
+        return None
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    segments = read_manifest(segment_dir)
+    info = SegmentInfo(_next_segment_name(segments))
+    target = segment_dir / info.name
+    os.replace(NOTE_PATH, target)
+    NOTE_PATH.write_text("")
+    with target.open("rb") as f:
+        info.lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    info.bytes = target.stat().st_size
+    write_manifest(segments + [info], segment_dir)
+    return info
+
+
+def append_attempt(attempt: Attempt) -> None:
+    """Attempt를 활성 파일에 한 줄로 덧붙이고, 크기 한도를 넘으면 세그먼트로 옮깁니다."""
+    serialized = serialize_attempt(attempt)
+    with _NOTES_LOCK:
+        ensure_note_file()
+        # 파일이 비어있지 않으면 앞에 개행 추가 (안전하게 줄바꿈 보장)
+        prefix = '\n' if NOTE_PATH.stat().st_size > 0 else ''
+        with open(NOTE_PATH, 'a', encoding='utf-8') as f:
+            f.write(f'{prefix}{serialized}\n')
+        if NOTE_PATH.stat().st_size >= NOTE_SEGMENT_MAX_BYTES:
+            _rotate_locked(SEGMENT_DIR)
+
+
+def _segment_entries(path: Path) -> List[Attempt]:
+    """봉인된 세그먼트를 파싱합니다. 파일이 바뀌지 않았으면 캐시를 사용합니다."""
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _SEGMENT_CACHE.get(path.name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    entries = parse_note_file(path)
+    _SEGMENT_CACHE[path.name] = (signature, entries)
+    return entries
+
+
+def load_attempts() -> List[Attempt]:
+    """오답노트의 모든 Attempt를 오래된 순서로 로드합니다.
+
+    JSON Lines 형식: 각 라인이 하나의 JSON 객체
+    - 봉인된 세그먼트는 캐시된 파싱 결과를 쓰고, 활성 파일만 매번 다시 읽습니다
+    - 손상된 라인은 무시하고 나머지 계속 파싱 (라인 단위 오류 로깅)
+    - 다중 인코딩 지원, 제어 문자 제거, 다단계 파싱 시도
+    """
+    ensure_note_file()
+    entries: List[Attempt] = []
+    for info in read_manifest():
+        entries.extend(_segment_entries(SEGMENT_DIR / info.name))
+    entries.extend(parse_note_file(NOTE_PATH))
+    return entries
+
+
+def iter_attempts() -> Iterator[Attempt]:
+    """오답노트의 모든 Attempt를 오래된 순서로 파일 하나씩 읽어 yield합니다.
+
+    load_attempts와 달리 세그먼트 캐시를 채우지 않으므로, 일괄 재채점처럼 전체를 한 번
+    훑는 작업에서 메모리에 세그먼트 하나 분량만 둡니다.
+    """
+    ensure_note_file()
+    for info in read_manifest():
+        path = SEGMENT_DIR / info.name
+        if path.exists():
+            yield from parse_note_file(path)
+    yield from parse_note_file(NOTE_PATH)
+
+
+def note_key(source_file: str, pid: str) -> str:
+    return f"{source_file}:{pid}"
+
+
+def _read_index(info: SegmentInfo) -> Optional[Dict[str, List[int]]]:
+    if not info.index:
+        return None
+    try:
+        return json.loads((SEGMENT_DIR / info.index).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def load_attempts_for(source_file: str, pid: str) -> List[Attempt]:
+    """(source_file, pid) 문제의 Attempt만 로드합니다.
+
+    색인이 있는 세그먼트는 해당 줄의 위치로 바로 이동해 읽고, 색인이 없는 세그먼트와
+    활성 파일은 전체를 파싱해 걸러냅니다.
+    """
+    ensure_note_file()
+    key = note_key(source_file, pid)
+    matches: List[Attempt] = []
+    for info in read_manifest():
+        index = _read_index(info)
+        path = SEGMENT_DIR / info.name
+        if index is None:
+            matches.extend(a for a in _segment_entries(path) if note_key(a.source_file, a.pid) == key)
+            continue
+        offsets = index.get(key, [])
+        if not offsets:
+            continue
+        with path.open("rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                entry = parse_note_line(f.readline().decode("utf-8", errors="ignore"))
+                if entry is not None:
+                    matches.append(entry)
+    matches.extend(a for a in parse_note_file(NOTE_PATH)
+                   if note_key(a.source_file, a.pid) == key)
+    return matches
+
+
+# ===== 목록용 필드 추출 =====
+
+# 합격 점수: 이 점수 이상인 기록은 오답노트 목록에 나오지 않습니다
+PASS_SCORE = 80
+
+_SCORE_RE = re.compile(rb'"score"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}]')
+_FIELD_RES: Dict[str, "re.Pattern[bytes]"] = {}
+_ATTEMPT_DEFAULTS = {f.name: f.default for f in fields(Attempt) if f.default is not MISSING}
+
+
+def _field_re(name: str) -> "re.Pattern[bytes]":
+    # 문자열 값 안의 따옴표는 항상 이스케이프되므로 "name": 형태로 처음 나오는 것이 최상위 키입니다
+    pattern = _FIELD_RES.get(name)
+    if pattern is None:
+        pattern = re.compile(rb'"' + re.escape(name.encode()) + rb'"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)')
+        _FIELD_RES[name] = pattern
+    return pattern
+
+
+def _project_line(line: bytes, names: Sequence[str], max_score: Optional[float]) -> Optional[Dict[str, object]]:
+    """한 줄에서 필요한 필드만 꺼냅니다. 건너뛸 줄이면 None.
+
+    정규식으로 꺼내지 못한 줄(손상, 필드 누락 등)만 parse_note_line으로 전체 파싱해
+    load_attempts와 같은 복구 규칙을 따릅니다.
+    """
+    stripped = line.strip()
+    if stripped.startswith(b"{") and stripped.endswith(b"}"):
+        score_match = _SCORE_RE.search(stripped)
+        if score_match is not None:
+            score = float(score_match.group(1))
+            if max_score is not None and score >= max_score:
+                return None  # 나머지 필드는 보지도 않음
+            row: Dict[str, object] = {}
+            for name in names:
+                if name == "score":
+                    row[name] = int(score) if score.is_integer() else score
+                    continue
+                match = _field_re(name).search(stripped)
+                if match is None:
+                    if name not in _ATTEMPT_DEFAULTS:
+                        break
+                    row[name] = DEFAULT_PROBLEM_FILE if name == "source_file" else _ATTEMPT_DEFAULTS[name]
+                    continue
+                try:
+                    value = json.loads(match.group(1))
+                except ValueError:
+                    break
+                row[name] = unicodedata.normalize("NFKC", value) if isinstance(value, str) else value
+            else:
+                return row
+
+    try:
+        entry = parse_note_line(line.decode("utf-8", errors="ignore"))
+    except Exception:
+        return None
+    if entry is None or (max_score is not None and entry.score >= max_score):
+        return None
+    return {name: getattr(entry, name) for name in names}
+
+
+def _scan_file(path: Path, names: Sequence[str], max_score: Optional[float]) -> Iterator[Dict[str, object]]:
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 3 if mm[:3] == b"\xef\xbb\xbf" else 0  # UTF-8 BOM
+            size = len(mm)
+            while start < size:
+                end = mm.find(b"\n", start)
+                if end == -1:
+                    end = size
+                row = _project_line(mm[start:end], names, max_score)
+                if row is not None:
+                    yield row
+                start = end + 1
+
+
+def scan_attempt_fields(names: Sequence[str], max_score: Optional[float] = PASS_SCORE) -> List[Dict[str, object]]:
+    """모든 오답노트 기록에서 names 필드만 딕셔너리로 꺼냅니다. (오래된 순서)
+
+    파일을 메모리 매핑해 줄 단위로 훑고, score가 max_score 이상인 줄은 나머지 필드를
+    디코딩하기 전에 건너뜁니다. 피드백/코드 본문은 읽지 않으므로 목록 화면 비용이
+    기록의 메타데이터 크기에 비례합니다.
+    """
+    text_fields = set(names) & set(BLOB_FIELDS + ("question",))
+    if text_fields:
+        raise ValueError(f"본문 필드는 추출할 수 없습니다: {sorted(text_fields)} (Attempt.text() 사용)")
+    ensure_note_file()
+    rows: List[Dict[str, object]] = []
+    for info in read_manifest():
+        rows.extend(_scan_file(SEGMENT_DIR / info.name, names, max_score))
+    rows.extend(_scan_file(NOTE_PATH, names, max_score))
+    return rows
+
+
+# ===== 오프라인 압축기 =====
+
+def compact_segment(info: SegmentInfo, segment_dir: Path = SEGMENT_DIR,
+                    quarantine: Optional[Path] = None) -> Tuple[int, int, int]:
+    """세그먼트 하나를 정규화된 JSON 줄로 다시 쓰고 (source_file, pid) 색인을 만듭니다.
+
+    - 파싱할 수 없는 줄은 원문 그대로 quarantine 파일에 옮깁니다
+    - 정규화한 줄이 완전히 같은 기록만 중복으로 보고 하나만 남깁니다.
+      timestamp는 분 단위라 같은 분에 저장한 서로 다른 시도를 구별하지 못하므로 키로 쓰지 않습니다.
+    - 빈 줄과 마크다운 헤더는 버립니다
+
+    Returns:
+        (남은 기록 수, 격리한 줄 수, 제거한 중복 수)
+    """
+    path = segment_dir / info.name
+    quarantine = quarantine or segment_dir / "quarantine.jsonl"
+    text = safe_read_file(path)
+
+    kept: Dict[str, Attempt] = {}  # 정규화한 줄 -> 기록 (처음 나온 순서)
+    quarantined: List[Dict] = []
+    parsed = 0
+    for line_idx, line in enumerate(text.split("\n"), 1):
+        try:
+            entry = parse_note_line(line)
+        except Exception as e:
+            quarantined.append({"segment": info.name, "line": line_idx, "error": str(e)[:200], "raw": line})
+            continue
+        if entry is None:
+            continue
+        parsed += 1
+        kept.setdefault(serialize_attempt(entry), entry)
+
+    if quarantined:
+        with quarantine.open("a", encoding="utf-8") as f:
+            for item in quarantined:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    index: Dict[str, List[int]] = {}
+    tmp = path.with_name(path.name + ".tmp")
+    offset = 0
+    with tmp.open("wb") as f:
+        for serialized, entry in kept.items():
+            line = (serialized + "\n").encode("utf-8")
+            index.setdefault(note_key(entry.source_file, entry.pid), []).append(offset)
+            f.write(line)
+            offset += len(line)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+
+    info.index = info.name.replace(".jsonl", ".idx.json")
+    index_tmp = segment_dir / (info.index + ".tmp")
+    index_tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    index_tmp.replace(segment_dir / info.index)
+    info.lines = len(kept)
+    info.bytes = offset
+    info.compacted = True
+    _SEGMENT_CACHE.pop(info.name, None)
+    return len(kept), len(quarantined), parsed - len(kept)
+
+
+def compact_notes(rotate: bool = False, segment_dir: Path = SEGMENT_DIR) -> List[Tuple[str, int, int, int]]:
+    """압축되지 않은 세그먼트를 모두 압축합니다. rotate=True면 활성 파일부터 봉인합니다."""
+    if rotate:
+        rotate_active_file(segment_dir)
+    results = []
+    with _NOTES_LOCK:
+        segments = read_manifest(segment_dir)
+        for info in segments:
+            if info.compacted:
+                continue
+            results.append((info.name, *compact_segment(info, segment_dir)))
+        if segments:
+            write_manifest(segments, segment_dir)
+    return results
+
+
+# ===== v1 → v2 마이그레이션 =====
+
+def _migrate_file(path: Path) -> Tuple[int, int, Dict[str, List[int]]]:
+    """파일의 기록을 v2 형식으로 다시 씁니다. 헤더와 파싱할 수 없는 줄은 그대로 둡니다.
+
+    문제 은행 참조만 있고 본문 blob이 없는 기록은 지금의 문제 은행 본문을 blob으로 저장합니다.
+
+    Returns:
+        (변환한 기록 수, 새 파일 크기, (source_file, pid) -> 줄 시작 위치)
+    """
+    text = safe_read_file(path)
+    index: Dict[str, List[int]] = {}
+    converted = 0
+    offset = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        for line in text.split("\n"):
+            if not line.strip():
+                continue
+            try:
+                entry = parse_note_line(line)
+            except Exception:
+                entry = None  # 손상된 줄은 손대지 않음 (압축기가 격리)
+            if entry is not None:
+                if not entry.question and "question" not in entry.blobs:
+                    # 문제 은행 참조만 남은 기록은 지금의 본문을 blob으로 고정
+                    entry.question = entry.text("question")
+                index.setdefault(note_key(entry.source_file, entry.pid), []).append(offset)
+                line = serialize_attempt(entry)
+                converted += 1
+            data = (line.rstrip("\r") + "\n").encode("utf-8")
+            f.write(data)
+            offset += len(data)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+    return converted, offset, index
+
+
+def migrate_notes(segment_dir: Path = SEGMENT_DIR) -> List[Tuple[str, int, int, int]]:
+    """활성 파일과 모든 세그먼트를 v2 형식으로 변환합니다. 이미 v2인 기록은 그대로입니다.
+
+    Returns:
+        파일별 (파일명, 변환한 기록 수, 이전 크기, 새 크기)
+    """
+    results = []
+    with _NOTES_LOCK:
+        ensure_note_file()
+        before = NOTE_PATH.stat().st_size
+        converted, after, _ = _migrate_file(NOTE_PATH)
+        results.append((NOTE_PATH.name, converted, before, after))
+
+        segments = read_manifest(segment_dir)
+        for info in segments:
+            path = segment_dir / info.name
+            before = path.stat().st_size
+            converted, after, index = _migrate_file(path)
+            if info.index:
+                # 줄 위치가 바뀌었으므로 색인도 다시 씁니다
+                index_tmp = segment_dir / (info.index + ".tmp")
+                index_tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+                index_tmp.replace(segment_dir / info.index)
+            info.bytes = after
+            _SEGMENT_CACHE.pop(info.name, None)
+            results.append((info.name, converted, before, after))
+        if segments:
+            write_manifest(segments, segment_dir)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오답노트 세그먼트 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="세그먼트 목록과 크기")
+    p_compact = sub.add_parser("compact", help="봉인된 세그먼트 압축 및 색인 생성")
+    p_compact.add_argument("--rotate", action="store_true", help="활성 파일도 봉인한 뒤 압축")
+    sub.add_parser("migrate", help="기존 기록을 blob 참조 형식(v2)으로 변환")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        for name, converted, before, after in migrate_notes():
+            print(f"{name}: 기록 {converted}개 변환, {before / 1024:.1f} KB → {after / 1024:.1f} KB")
+        return 0
+
+    if args.command == "status":
+        for info in read_manifest():
+            state = "압축됨" if info.compacted else "미압축"
+            print(f"{info.name}: {info.lines}줄, {info.bytes / 1024:.1f} KB ({state})")
+        size = NOTE_PATH.stat().st_size if NOTE_PATH.exists() else 0
+        print(f"{NOTE_PATH.name} (활성): {size / 1024:.1f} KB / 봉인 기준 {NOTE_SEGMENT_MAX_BYTES // 1024} KB")
+        return 0
+
+    results = compact_notes(rotate=args.rotate)
+    if not results:
+        print("압축할 세그먼트가 없습니다.")
+    for name, kept, quarantined, duplicates in results:
+        print(f"{name}: 기록 {kept}개 유지, 격리 {quarantined}줄, 중복 제거 {duplicates}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())